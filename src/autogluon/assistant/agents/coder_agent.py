@@ -2,7 +2,7 @@ import logging
 
 from ..prompts import BashCoderPrompt, PythonCoderPrompt
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +48,7 @@ class CoderAgent(BaseAgent):
         self.manager.log_agent_start("CoderAgent: starting to build and send code-generation prompt to the LLM.")
 
         # Build prompt for evaluating execution results
-        prompt = self.coder_prompt.build()
+        prompt, profile_record = self.coder_prompt.build_with_profile()
 
         if not self.coder_llm_config.multi_turn:
             self.coder_llm = init_llm(
@@ -57,7 +57,9 @@ class CoderAgent(BaseAgent):
                 multi_turn=self.coder_llm_config.multi_turn,
             )
 
-        response = self.coder_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.coder_llm, prompt, self.coder_prompt, self.coder_llm_config, profile_record=profile_record
+        )
 
         generated_code = self.coder_prompt.parse(response)
 
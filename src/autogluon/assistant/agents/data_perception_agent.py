@@ -1,94 +1,23 @@
 import logging
 import os
 import random
-from collections import defaultdict
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from ..prompts import PythonReaderPrompt
 from .base_agent import BaseAgent
+from .data_profiler import DataProfiler, is_tabular_file
+from .directory_scanner import scan_file_groups
 from .executer_agent import ExecuterAgent
-from .utils import init_llm
+from .file_readers import read_file_natively
+from .utils import init_llm, query_llm
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def get_all_files(folder_path):
-    """
-    Recursively get all files in the folder and its subfolders.
-    Returns a list of tuples containing (relative_path, absolute_path).
-    """
-    all_files = []
-    abs_folder_path = os.path.abspath(folder_path)
-
-    for root, _, files in os.walk(abs_folder_path):
-        for file in files:
-            abs_path = os.path.join(root, file)
-            rel_path = os.path.relpath(abs_path, abs_folder_path)
-            all_files.append((rel_path, abs_path))
-
-    return all_files
-
-
-def group_similar_files(files):
-    """
-    Group files based on their folder structure and extensions.
-    Files are placed in the same group if they follow the same pattern at each level.
-    At each level, if there are 5 or fewer unique folders, the actual folder names are used,
-    otherwise a wildcard '*' is used.
-
-    Parameters:
-    files: List of tuples (relative_path, absolute_path)
-
-    Returns:
-    Dict mapping group keys to lists of tuples (relative_path, absolute_path)
-    """
-    # First, analyze folder counts at each depth level
-    depth_folders = defaultdict(set)
-    max_depth = 0
-
-    # Collect all unique folders at each depth
-    for rel_path, _ in files:
-        parts = os.path.normpath(rel_path).split(os.sep)
-        max_depth = max(max_depth, len(parts) - 1)  # -1 for filename
-
-        # Record folders at each depth
-        for depth, folder in enumerate(parts[:-1]):  # Exclude filename
-            depth_folders[depth].add(folder)
-
-    # Create groups
-    groups = defaultdict(list)
-    for rel_path, abs_path in files:
-        parts = os.path.normpath(rel_path).split(os.sep)
-        filename = parts[-1]
-        folders = parts[:-1]
-
-        # Get file extension (if any)
-        ext = os.path.splitext(filename)[1].lower()
-
-        # Build group key parts
-        group_key_parts = []
-
-        # Add folder pattern for each depth
-        for depth, folder in enumerate(folders):
-            unique_folders = depth_folders[depth]
-            if len(unique_folders) <= 5:
-                # Use actual folder name if 5 or fewer unique folders at this depth
-                group_key_parts.append(folder)
-            else:
-                # Use wildcard if more than 5 unique folders
-                group_key_parts.append("*")
-
-        # Add extension pattern
-        group_key_parts.append(ext if ext else "NO_EXT")
-
-        # Convert key to immutable tuple for dictionary
-        group_key = tuple(group_key_parts)
-        groups[group_key].append((rel_path, abs_path))
-
-    return groups
-
-
 def pattern_to_path(pattern, base_path):
     """
     Convert a group pattern tuple to an absolute path string.
@@ -136,12 +65,32 @@ class DataPerceptionAgent(BaseAgent):
         self.max_chars_per_file = self.config.max_chars_per_file
         self.max_file_group_size_to_show = self.config.max_file_group_size_to_show
         self.num_example_files_to_show = self.config.num_example_files_to_show
+        self.file_read_timeout = self.config.get("file_read_timeout", 600)
+        self.use_native_readers = self.config.get("use_native_readers", False)
+        # Stop scanning the folder once this many consecutive files fell into existing groups (0 never stops)
+        self.scan_stop_after_stable_files = self.config.get("scan_stop_after_stable_files", 0)
+
+        # Tabular files are profiled in full, beyond the first rows shown by their summaries
+        profiler_config = self.config.get("data_profiler", {})
+        self.data_profiler = None
+        if profiler_config.get("enabled", False):
+            self.data_profiler = DataProfiler(
+                chunk_rows=profiler_config.get("chunk_rows", 65536),
+                max_workers=profiler_config.get("max_workers", None),
+                max_chars=profiler_config.get("max_chars", 2048),
+                cache_dir=profiler_config.get("cache_dir", None),
+            )
 
         self.language = "python"
 
         self.reader_llm_config = reader_llm_config
         self.reader_prompt_template = reader_prompt_template
 
+        # Files are read concurrently, unless a multi-turn LLM (one shared conversation) is used
+        self.max_concurrent_file_reads = max(self.config.get("max_concurrent_file_reads", 1), 1)
+        if reader_llm_config.multi_turn or config.executer.multi_turn:
+            self.max_concurrent_file_reads = 1
+
         if self.reader_llm_config.multi_turn:
             self.reader_llm = init_llm(
                 llm_config=self.reader_llm_config,
@@ -160,31 +109,55 @@ class DataPerceptionAgent(BaseAgent):
             timeout=60,  # TODO: make it configurable
             executer_llm_config=config.executer,
             executer_prompt_template=None,
+            # Progress bars of concurrent executions cannot be shown at the same time
+            show_progress=self.max_concurrent_file_reads == 1,
         )
 
-    def read_file(self, file_path, max_chars):
-        # 0. init llm
-        if not self.reader_llm_config.multi_turn:
-            self.reader_llm = init_llm(
+    def read_file(self, file_path, max_chars, deadline=None):
+        """
+        Summarize a file, with a native reader or with reader code generated by the LLM.
+
+        deadline (time.monotonic) bounds the execution of the generated code, which is stopped when it passes.
+        """
+        # Common formats are summarized without the LLM
+        if self.use_native_readers:
+            result = read_file_natively(file_path, max_chars)
+            if result is not None:
+                logger.info(f"Read {file_path} with a native reader")
+                return result
+
+        # 0. init llm (a new one per file unless multi-turn, so that files can be read concurrently)
+        if self.reader_llm_config.multi_turn:
+            reader_llm = self.reader_llm
+        else:
+            reader_llm = init_llm(
                 llm_config=self.reader_llm_config,
                 agent_name=f"{self.language}_reader",
                 multi_turn=self.reader_llm_config.multi_turn,
             )
 
         # 1. generate prompt
-        prompt = self.python_reader_prompt.build(file_path=file_path, max_chars=max_chars)
+        prompt, profile_record = self.python_reader_prompt.build_with_profile(file_path=file_path, max_chars=max_chars)
 
         # 2. generate code
-        response = self.reader_llm.assistant_chat(prompt)
+        response = query_llm(
+            reader_llm, prompt, self.python_reader_prompt, self.reader_llm_config, profile_record=profile_record
+        )
         generated_python_code = self.python_reader_prompt.parse(response)
 
         # 3. execute code
         # TODO: add iterative calls if failed
+        timeout = self.executer.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return f"Error reading file: timed out after {self.file_read_timeout} seconds"
         planner_decision, planner_error_summary, _, planner_prompt, stderr, stdout = self.executer(
             code_to_execute=generated_python_code,
             code_to_analyze=generated_python_code,
             execution_task=prompt,  # use reader's task
             execution_data=f"file location: {file_path}",
+            timeout=timeout,
         )
 
         if stdout:
@@ -198,6 +171,71 @@ class DataPerceptionAgent(BaseAgent):
 
         return result
 
+    def _read_files(self, file_paths):
+        """
+        Read files with a bounded pool of workers.
+
+        Each file gets file_read_timeout seconds from the moment its worker starts, a file that takes
+        longer is reported as an error. The reader code of a worker only gets the time left, so its
+        process is stopped by then; the LLM call evaluating it finishes in the background, ignored.
+
+        Returns:
+            Dict mapping each file path to its content (or error message)
+        """
+        contents = {}
+        if not file_paths:
+            return contents
+
+        # Meta-prompting must be applied before the prompts are built from several threads at once
+        self.python_reader_prompt.maybe_apply_meta_prompting()
+        self.executer.executer_prompt.maybe_apply_meta_prompting()
+
+        num_workers = min(self.max_concurrent_file_reads, len(file_paths))
+        logger.info(f"Reading {len(file_paths)} files with {num_workers} workers")
+
+        start_times = {}
+        start_times_lock = threading.Lock()
+
+        def read(file_path):
+            start_time = time.monotonic()
+            with start_times_lock:
+                start_times[file_path] = start_time
+            logger.brief(f"Reading file: {file_path}")
+            return self.read_file(
+                file_path=file_path,
+                max_chars=self.max_chars_per_file,
+                deadline=start_time + self.file_read_timeout,
+            )
+
+        executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="file_reader")
+        try:
+            pending = {executor.submit(read, file_path): file_path for file_path in dict.fromkeys(file_paths)}
+            while pending:
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = pending.pop(future)
+                    try:
+                        contents[file_path] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error reading file {file_path}: {e}")
+                        contents[file_path] = f"Error reading file: {e}"
+
+                now = time.monotonic()
+                with start_times_lock:
+                    timed_out = [
+                        future
+                        for future, file_path in pending.items()
+                        if file_path in start_times and now - start_times[file_path] > self.file_read_timeout
+                    ]
+                for future in timed_out:
+                    file_path = pending.pop(future)
+                    logger.error(f"Timed out reading file {file_path} after {self.file_read_timeout} seconds")
+                    contents[file_path] = f"Error reading file: timed out after {self.file_read_timeout} seconds"
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return contents
+
     def __call__(
         self,
     ):
@@ -207,44 +245,81 @@ class DataPerceptionAgent(BaseAgent):
         abs_folder_path = os.path.abspath(self.input_data_folder)
         logger.brief(f"Analyzing folder: {abs_folder_path}")
 
-        # Get list of all files recursively
-        all_files = get_all_files(abs_folder_path)
-        logger.brief(f"Found {len(all_files)} files")
-
-        # Group similar files
-        file_groups = group_similar_files(all_files)
-        logger.brief(f"Grouped into {len(file_groups)} patterns")
-
-        # Process files based on their groups and types
-        file_contents = {}
-        for pattern, group_files in file_groups.items():
-            pattern_path = pattern_to_path(pattern, abs_folder_path)
-            logger.info(f"Processing pattern: {pattern_path} ({len(group_files)} files)")
+        perception_cache = getattr(self.manager, "perception_cache", None)
+
+        # Scan and group the files in one pass, keeping only a sample of the files of each group
+        scan = scan_file_groups(
+            abs_folder_path,
+            sample_size=max(self.max_file_group_size_to_show, self.num_example_files_to_show),
+            stop_after_stable_files=self.scan_stop_after_stable_files,
+            # Small groups are listed file by file, so they must be counted completely
+            min_counted_files=self.max_file_group_size_to_show,
+            # Same samples as long as the folder is unchanged, so that their summaries can be reused
+            seed=abs_folder_path if perception_cache is not None else None,
+        )
+        count_suffix = "+" if scan.stopped_early else ""
+        logger.brief(f"Found {scan.num_files}{count_suffix} files")
+        logger.brief(f"Grouped into {len(scan.groups)} patterns")
+
+        # Select the files to read per group, the data prompt is assembled in this order
+        sections = []
+        for group in scan.groups:
+            pattern_path = pattern_to_path(group.pattern, abs_folder_path)
+            # Only groups larger than the display threshold may have stopped being counted
+            is_lower_bound = scan.stopped_early and group.count > self.max_file_group_size_to_show
+            logger.info(f"Processing pattern: {pattern_path} ({group.count}{'+' if is_lower_bound else ''} files)")
 
             # TODO: ask LLM to decide if we want to show all examples or just one representitive.
-            if len(group_files) > self.max_file_group_size_to_show:
+            if group.count > self.max_file_group_size_to_show:
                 # For large groups, show specified number of examples
-                num_examples = min(self.num_example_files_to_show, len(group_files))
-                example_files = random.sample(group_files, num_examples)
-
-                group_info = f"Group pattern: {pattern_path} (total {len(group_files)} files)\nExample files:"
-
-                example_contents = []
-                for rel_path, abs_path in example_files:
-                    logger.brief(f"Reading example file: {abs_path}")
-                    content = self.read_file(file_path=abs_path, max_chars=self.max_chars_per_file)
-                    example_contents.append(f"Absolute path: {abs_path}\nContent:\n{content}")
-
-                file_contents[group_info] = "\n" + ("-" * 5) + "\n".join(example_contents)
+                num_examples = min(self.num_example_files_to_show, len(group.samples))
+                if perception_cache is not None:
+                    example_files = random.Random(pattern_path).sample(sorted(group.samples), num_examples)
+                else:
+                    example_files = random.sample(group.samples, num_examples)
+
+                total = f"at least {group.count}" if is_lower_bound else f"total {group.count}"
+                group_info = f"Group pattern: {pattern_path} ({total} files)\nExample files:"
+                sections.append((group_info, [abs_path for _, abs_path in example_files], True))
             else:
                 # For small groups, show all files
-                for rel_path, abs_path in group_files:
-                    file_info = f"Absolute path: {abs_path}"
+                for rel_path, abs_path in group.samples:
+                    sections.append((f"Absolute path: {abs_path}", [abs_path], False))
+
+        # Use LLM to read file contents, only for files changed since the last run if cached
+        file_paths = [abs_path for _, file_paths, _ in sections for abs_path in file_paths]
+        contents = {}
+        if perception_cache is not None:
+            contents = perception_cache.get_file_summaries(file_paths)
+            logger.brief(f"Reusing the cached summaries of {len(contents)} of {len(file_paths)} files")
+        new_contents = self._read_files([file_path for file_path in file_paths if file_path not in contents])
+        contents.update(new_contents)
+        if perception_cache is not None:
+            perception_cache.put_file_summaries(
+                {
+                    file_path: content
+                    for file_path, content in new_contents.items()
+                    if not content.startswith("Error reading file")
+                }
+            )
 
-                    # Use LLM to read file content
-                    logger.brief(f"Reading file: {abs_path}")
+        if self.data_profiler is not None:
+            for file_path in dict.fromkeys(file_paths):
+                if is_tabular_file(file_path):
+                    logger.brief(f"Profiling file: {file_path}")
+                    profile = self.data_profiler.profile(file_path)
+                    if profile is not None:
+                        contents[file_path] = f"{contents[file_path]}\nProfile of the full file:\n{profile}"
 
-                    file_contents[file_info] = self.read_file(file_path=abs_path, max_chars=self.max_chars_per_file)
+        file_contents = {}
+        for info, file_paths, is_group in sections:
+            if is_group:
+                example_contents = [
+                    f"Absolute path: {abs_path}\nContent:\n{contents[abs_path]}" for abs_path in file_paths
+                ]
+                file_contents[info] = "\n" + ("-" * 5) + "\n".join(example_contents)
+            else:
+                file_contents[info] = contents[file_paths[0]]
 
         # Generate the prompt
         prompt = f"Absolute path to the folder: {abs_folder_path}\n\nFiles structures:\n\n{'-' * 10}\n\n"
@@ -0,0 +1,411 @@
+"""
+Chunked profiling of large tabular files.
+
+The file summaries of the data perception only show the first rows of a file. For tabular files
+(CSV/TSV/Parquet) the DataProfiler scans the whole file in chunks, with pyarrow's streaming readers
+when available, and computes per-column types, null rates, cardinalities (HyperLogLog), numeric
+quantiles (t-digest) and value distributions in bounded memory. The sketches are mergeable, so
+chunks are profiled in parallel and combined. Profiles are cached by file path, size and mtime.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..constants import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+PROFILE_CACHE_SUBDIR = "profiles"
+# Bump when the profile format changes, to invalidate cached profiles
+PROFILE_VERSION = 1
+
+TABULAR_EXTENSIONS = {".csv": ",", ".tsv": "\t", ".parquet": None, ".pq": None}
+
+# Exact value counts are kept up to this many distinct values per column
+MAX_TRACKED_VALUES = 1000
+# Distributions are shown for columns with at most this many distinct values (e.g. labels)
+MAX_SHOWN_DISTRIBUTION_VALUES = 20
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length of an uint64 array."""
+    values = values.copy()
+    lengths = np.zeros(values.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        lengths[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    lengths += (values > 0).astype(np.uint8)
+    return lengths
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch over 64-bit hashes."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        num_rank_bits = 64 - self.precision
+        indices = (hashes >> np.uint64(num_rank_bits)).astype(np.intp)
+        remainders = hashes & np.uint64((1 << num_rank_bits) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        ranks = (num_rank_bits + 1 - _bit_length(remainders).astype(np.int16)).astype(np.uint8)
+        np.maximum.at(self.registers, indices, ranks)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        num_zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and num_zeros > 0:
+            # Linear counting for small cardinalities
+            estimate = m * np.log(m / num_zeros)
+        return float(estimate)
+
+
+class TDigest:
+    """Merging t-digest for streaming quantile estimation."""
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        values = values.astype(np.float64, copy=False)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: "TDigest") -> None:
+        if len(other.means) == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Centroids whose mid quantiles fall in the same unit interval of the k1 scale function are merged,
+        # which keeps the centroids small near the tails and bounds their number by the compression
+        mid_quantiles = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * mid_quantiles - 1)
+        clusters = np.floor(k - k.min()).astype(np.intp)
+        merged_weights = np.bincount(clusters, weights=weights)
+        keep = merged_weights > 0
+        self.means = (np.bincount(clusters, weights=means * weights)[keep] / merged_weights[keep]).astype(np.float64)
+        self.weights = merged_weights[keep]
+
+    def quantile(self, q: float) -> float:
+        if len(self.means) == 0:
+            return float("nan")
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return float(
+            np.interp(
+                q * self.weights.sum(),
+                np.concatenate([[0], positions, [self.weights.sum()]]),
+                np.concatenate([[self.min], self.means, [self.max]]),
+            )
+        )
+
+
+class ColumnProfile:
+    """Mergeable statistics of one column."""
+
+    def __init__(self, hll_precision: int, tdigest_compression: float):
+        self.types: List[str] = []
+        self.count = 0
+        self.nulls = 0
+        self.hll = HyperLogLog(hll_precision)
+        self.tdigest = TDigest(tdigest_compression)
+        self.numeric_sum = 0.0
+        # None once the column has more than MAX_TRACKED_VALUES distinct values
+        self.value_counts: Optional[Dict[str, int]] = {}
+
+    def update(self, series: pd.Series, type_name: str) -> None:
+        if type_name not in self.types:
+            self.types.append(type_name)
+        self.count += len(series)
+        non_null = series.dropna()
+        self.nulls += len(series) - len(non_null)
+        if len(non_null) == 0:
+            return
+
+        self.hll.add_hashes(pd.util.hash_pandas_object(non_null, index=False).to_numpy())
+        if pd.api.types.is_numeric_dtype(non_null) and not pd.api.types.is_bool_dtype(non_null):
+            values = non_null.to_numpy(dtype=np.float64)
+            values = values[np.isfinite(values)]
+            self.tdigest.update(values)
+            self.numeric_sum += float(values.sum())
+
+        if self.value_counts is not None:
+            for value, count in non_null.astype(str).value_counts(sort=False).items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + int(count)
+            if len(self.value_counts) > MAX_TRACKED_VALUES:
+                self.value_counts = None
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.types.extend(type_name for type_name in other.types if type_name not in self.types)
+        self.count += other.count
+        self.nulls += other.nulls
+        self.hll.merge(other.hll)
+        self.tdigest.merge(other.tdigest)
+        self.numeric_sum += other.numeric_sum
+        if self.value_counts is not None and other.value_counts is not None:
+            for value, count in other.value_counts.items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > MAX_TRACKED_VALUES:
+                self.value_counts = None
+        else:
+            self.value_counts = None
+
+    def render(self, name: str) -> str:
+        parts = [f"{name}: {'/'.join(self.types)}"]
+        null_rate = self.nulls / self.count if self.count else 0.0
+        parts.append(f"nulls {null_rate:.1%}")
+        if self.value_counts is not None:
+            parts.append(f"distinct {len(self.value_counts)}")
+        else:
+            parts.append(f"distinct ~{int(round(self.hll.estimate()))}")
+
+        numeric_count = self.tdigest.weights.sum()
+        if numeric_count > 0:
+            quantiles = ", ".join(
+                f"{label} {self.tdigest.quantile(q):.4g}" for label, q in (("p25", 0.25), ("p50", 0.5), ("p75", 0.75))
+            )
+            parts.append(
+                f"min {self.tdigest.min:.4g}, {quantiles}, max {self.tdigest.max:.4g}, "
+                f"mean {self.numeric_sum / numeric_count:.4g}"
+            )
+
+        if self.value_counts and len(self.value_counts) <= MAX_SHOWN_DISTRIBUTION_VALUES:
+            non_null = self.count - self.nulls
+            top_values = sorted(self.value_counts.items(), key=lambda item: -item[1])[:10]
+            distribution = ", ".join(f"{value[:30]!r} {count / non_null:.1%}" for value, count in top_values)
+            if len(self.value_counts) > len(top_values):
+                distribution += ", ..."
+            parts.append(f"values: {distribution}")
+        return "  " + " | ".join(parts)
+
+
+class TableProfile:
+    """Mergeable statistics of a table, column order is kept."""
+
+    def __init__(self, hll_precision: int, tdigest_compression: float):
+        self.hll_precision = hll_precision
+        self.tdigest_compression = tdigest_compression
+        self.num_rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+
+    def update(self, df: pd.DataFrame, type_names: Optional[Dict[str, str]] = None) -> None:
+        self.num_rows += len(df)
+        for column in df.columns:
+            name = str(column)
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(self.hll_precision, self.tdigest_compression)
+            type_name = (type_names or {}).get(name, str(df[column].dtype))
+            self.columns[name].update(df[column], type_name)
+
+    def merge(self, other: "TableProfile") -> None:
+        self.num_rows += other.num_rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+
+    def render(self, max_chars: int) -> str:
+        lines = [f"Rows: {self.num_rows}", f"Columns ({len(self.columns)}):"]
+        lines.extend(column.render(name) for name, column in self.columns.items())
+        result = "\n".join(lines)
+        if len(result) > max_chars:
+            result = result[: max_chars - 3] + "..."
+        return result
+
+
+def is_tabular_file(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in TABULAR_EXTENSIONS
+
+
+class DataProfiler:
+    """Profiles tabular files chunk by chunk, in parallel, with a persistent cache."""
+
+    def __init__(
+        self,
+        chunk_rows: int = 65536,
+        max_workers: Optional[int] = None,
+        max_chars: int = 2048,
+        hll_precision: int = 12,
+        tdigest_compression: float = 200,
+        cache_dir: Optional[Union[str, Path]] = None,
+        use_cache: bool = True,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            chunk_rows: Number of rows per chunk
+            max_workers: Number of threads profiling chunks, all cores if None
+            max_chars: Maximum number of characters of a rendered profile
+            hll_precision: Number of index bits of the HyperLogLog sketches (2^precision registers)
+            tdigest_compression: Compression of the t-digests, higher is more accurate
+            cache_dir: Root cache directory, DEFAULT_CACHE_DIR if None
+            use_cache: Whether to reuse the profiles of unchanged files
+        """
+        self.chunk_rows = chunk_rows
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_chars = max_chars
+        self.hll_precision = hll_precision
+        self.tdigest_compression = tdigest_compression
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR) / PROFILE_CACHE_SUBDIR
+        self.use_cache = use_cache
+
+    def profile(self, file_path: str) -> Optional[str]:
+        """
+        Profile a tabular file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            The rendered profile, or None if the file is not tabular or could not be profiled
+        """
+        if not is_tabular_file(file_path):
+            return None
+
+        cache_path = self._cache_path(file_path) if self.use_cache else None
+        if cache_path is not None and cache_path.exists():
+            try:
+                return cache_path.read_text(encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Ignoring unreadable profile cache entry {cache_path}: {e}")
+
+        try:
+            table_profile = self._profile_chunks(self._iter_chunks(file_path))
+        except Exception as e:
+            logger.warning(f"Failed to profile {file_path}: {e}")
+            return None
+        result = table_profile.render(self.max_chars)
+        if cache_path is not None:
+            self._write_cache(cache_path, result)
+        return result
+
+    def _cache_path(self, file_path: str) -> Optional[Path]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        key = json.dumps(
+            [
+                PROFILE_VERSION,
+                os.path.abspath(file_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                self.max_chars,
+                self.hll_precision,
+                self.tdigest_compression,
+            ]
+        )
+        return self.cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.txt"
+
+    def _write_cache(self, cache_path: Path, result: str) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(result)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write profile cache entry {cache_path}: {e}")
+
+    def _iter_chunks(self, file_path: str) -> Iterator[Union[pd.DataFrame, "pa.RecordBatch"]]:
+        separator = TABULAR_EXTENSIONS[os.path.splitext(file_path)[1].lower()]
+        if separator is None:
+            if pq is not None:
+                yield from pq.ParquetFile(file_path).iter_batches(batch_size=self.chunk_rows)
+            else:
+                yield pd.read_parquet(file_path)
+            return
+
+        if pa_csv is not None:
+            num_rows = 0
+            try:
+                reader = pa_csv.open_csv(file_path, parse_options=pa_csv.ParseOptions(delimiter=separator))
+                for batch in reader:
+                    num_rows += batch.num_rows
+                    yield batch
+                return
+            except pa.ArrowInvalid as e:
+                # The streaming reader infers the column types from the first block only, so a later block
+                # that does not fit them fails; pandas reads the rest of the file, after the profiled rows
+                logger.info(
+                    f"Streaming CSV reader failed on {file_path} after {num_rows} rows, continuing with pandas: {e}"
+                )
+            if num_rows > 0:
+                yield from pd.read_csv(
+                    file_path,
+                    sep=separator,
+                    chunksize=self.chunk_rows,
+                    skiprows=lambda row: 0 < row <= num_rows,
+                )
+                return
+        yield from pd.read_csv(file_path, sep=separator, chunksize=self.chunk_rows)
+
+    def _profile_chunk(self, chunk: Union[pd.DataFrame, "pa.RecordBatch"]) -> TableProfile:
+        table_profile = TableProfile(self.hll_precision, self.tdigest_compression)
+        if pa is not None and isinstance(chunk, pa.RecordBatch):
+            type_names = {field.name: str(field.type) for field in chunk.schema}
+            table_profile.update(chunk.to_pandas(), type_names)
+        else:
+            table_profile.update(chunk)
+        return table_profile
+
+    def _profile_chunks(self, chunks: Iterator) -> TableProfile:
+        result = TableProfile(self.hll_precision, self.tdigest_compression)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="data_profiler") as executor:
+            # At most two chunks per worker are in memory at once, merged in file order
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(self._profile_chunk, chunk))
+                if len(pending) >= 2 * self.max_workers:
+                    result.merge(pending.popleft().result())
+            while pending:
+                result.merge(pending.popleft().result())
+        return result
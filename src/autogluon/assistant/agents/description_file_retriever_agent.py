@@ -3,7 +3,7 @@ from typing import List
 
 from ..prompts import DescriptionFileRetrieverPrompt
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +43,7 @@ class DescriptionFileRetrieverAgent(BaseAgent):
         self.manager.log_agent_start("DescriptionFileRetrieverAgent: identifying description files from data prompt.")
 
         # Build prompt for identifying description files
-        prompt = self.description_file_retriever_prompt.build()
+        prompt, profile_record = self.description_file_retriever_prompt.build_with_profile()
 
         if not self.description_file_retriever_llm_config.multi_turn:
             self.description_file_retriever_llm = init_llm(
@@ -52,7 +52,13 @@ class DescriptionFileRetrieverAgent(BaseAgent):
                 multi_turn=self.description_file_retriever_llm_config.multi_turn,
             )
 
-        response = self.description_file_retriever_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.description_file_retriever_llm,
+            prompt,
+            self.description_file_retriever_prompt,
+            self.description_file_retriever_llm_config,
+            profile_record=profile_record,
+        )
 
         description_files = self.description_file_retriever_prompt.parse(response)
 
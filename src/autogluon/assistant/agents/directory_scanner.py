@@ -0,0 +1,188 @@
+"""
+Streaming directory scanner for data perception.
+
+scan_file_groups groups the files of a folder by pattern (same folder at each depth and same
+extension, with a wildcard at depths that have more than a few distinct folders) in a single
+os.scandir pass with bounded memory: only the group counts and a reservoir sample of files per
+group are kept, never the full file list.
+
+Folders are scanned breadth-first and every folder is listed. Once no new group has appeared for a
+given number of files, the scan stops counting and sampling the files of known groups that already
+have more than min_counted_files files, and only looks for new groups in the remaining files, so
+that a large folder cannot hide its siblings.
+"""
+
+import logging
+import os
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "*"
+
+
+@dataclass
+class FileGroup:
+    """Files sharing a pattern: their count and a uniform sample of (relative_path, absolute_path)."""
+
+    pattern: Tuple[str, ...]
+    count: int = 0
+    samples: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class ScanResult:
+    groups: List[FileGroup]
+    num_files: int
+    stopped_early: bool
+
+
+class _GroupReservoirs:
+    """Group counts and reservoir samples, re-keyed when a depth switches to the wildcard."""
+
+    def __init__(self, sample_size: int, max_unique_folders: int, rng: random.Random):
+        self.sample_size = sample_size
+        self.max_unique_folders = max_unique_folders
+        self.rng = rng
+        self.groups: Dict[Tuple[str, ...], FileGroup] = {}
+        # Distinct folder names per depth, None once the depth uses the wildcard
+        self.depth_folders: Dict[int, Optional[Set[str]]] = {}
+
+    def key(self, rel_parts: List[str]) -> Tuple[str, ...]:
+        """Pattern of a file, recording its folders."""
+        folders = rel_parts[:-1]
+        for depth, folder in enumerate(folders):
+            seen = self.depth_folders.setdefault(depth, set())
+            if seen is not None and folder not in seen:
+                seen.add(folder)
+                if len(seen) > self.max_unique_folders:
+                    self._collapse_depth(depth)
+
+        key_parts = [WILDCARD if self.depth_folders[depth] is None else folder for depth, folder in enumerate(folders)]
+        ext = os.path.splitext(rel_parts[-1])[1].lower()
+        key_parts.append(ext if ext else "NO_EXT")
+        return tuple(key_parts)
+
+    def add(self, rel_parts: List[str], rel_path: str, abs_path: str) -> bool:
+        """Add a file, returns True if it created a new group."""
+        key = self.key(rel_parts)
+        group = self.groups.get(key)
+        created = group is None
+        if created:
+            group = self.groups[key] = FileGroup(pattern=key)
+        group.count += 1
+        if len(group.samples) < self.sample_size:
+            group.samples.append((rel_path, abs_path))
+        else:
+            # Reservoir sampling (algorithm R)
+            index = self.rng.randrange(group.count)
+            if index < self.sample_size:
+                group.samples[index] = (rel_path, abs_path)
+        return created
+
+    def _collapse_depth(self, depth: int) -> None:
+        """Switch a depth to the wildcard and merge the groups that become identical."""
+        self.depth_folders[depth] = None
+        merged: Dict[Tuple[str, ...], FileGroup] = {}
+        for key, group in self.groups.items():
+            if depth < len(key) - 1:
+                key = key[:depth] + (WILDCARD,) + key[depth + 1 :]
+            if key in merged:
+                merged[key] = self._merge(merged[key], group)
+            else:
+                group.pattern = key
+                merged[key] = group
+        self.groups = merged
+
+    def _merge(self, a: FileGroup, b: FileGroup) -> FileGroup:
+        """Merge two groups, keeping a uniform sample of their union."""
+        samples = []
+        pool_a, pool_b = list(a.samples), list(b.samples)
+        remaining_a, remaining_b = a.count, b.count
+        while len(samples) < self.sample_size and (pool_a or pool_b):
+            # Draw from each group proportionally to the number of its files not drawn yet
+            from_a = pool_a and (not pool_b or self.rng.random() < remaining_a / (remaining_a + remaining_b))
+            if from_a:
+                samples.append(pool_a.pop(self.rng.randrange(len(pool_a))))
+                remaining_a -= 1
+            else:
+                samples.append(pool_b.pop(self.rng.randrange(len(pool_b))))
+                remaining_b -= 1
+        return FileGroup(pattern=a.pattern, count=a.count + b.count, samples=samples)
+
+
+def scan_file_groups(
+    folder_path: str,
+    sample_size: int,
+    max_unique_folders: int = 5,
+    stop_after_stable_files: int = 0,
+    min_counted_files: int = 0,
+    seed: Optional[Union[int, str]] = None,
+) -> ScanResult:
+    """
+    Group the files of a folder while scanning it.
+
+    Args:
+        folder_path: Folder to scan
+        sample_size: Number of files sampled per group; groups with at most this many files keep all of them
+        max_unique_folders: Depths with more distinct folders than this use a wildcard in the patterns
+        stop_after_stable_files: Once this many consecutive files did not create a new group, stop
+            counting and sampling the files of known groups (0 counts all files). All folders are
+            still listed to find new groups; counts are lower bounds if the scan stopped early.
+        min_counted_files: Groups are counted until they have more than this many files even after the
+            scan stopped early, so that the count of a group is exact if it is at most this value
+        seed: Seed of the reservoir sampling
+
+    Returns:
+        ScanResult with the groups in order of their first file
+    """
+    abs_folder_path = os.path.abspath(folder_path)
+    reservoirs = _GroupReservoirs(sample_size, max_unique_folders, random.Random(seed))
+
+    num_files = 0
+    files_since_new_group = 0
+    stopped_early = False
+    # Breadth-first traversal, so that the first levels are listed before deep folders
+    queue: deque = deque([(abs_folder_path, [])])
+    while queue:
+        dir_path, rel_dir_parts = queue.popleft()
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=True):
+                            subdirs.append((entry.path, rel_dir_parts + [entry.name]))
+                            continue
+                        if not entry.is_file(follow_symlinks=True):
+                            continue
+                    except OSError:
+                        continue
+
+                    rel_parts = rel_dir_parts + [entry.name]
+                    if stopped_early:
+                        group = reservoirs.groups.get(reservoirs.key(rel_parts))
+                        if group is not None and group.count > min_counted_files:
+                            # The groups are stable, only files of new or small groups are counted
+                            continue
+                    num_files += 1
+                    if reservoirs.add(rel_parts, os.path.join(*rel_parts), entry.path):
+                        files_since_new_group = 0
+                    else:
+                        files_since_new_group += 1
+                    if stop_after_stable_files and files_since_new_group >= stop_after_stable_files:
+                        stopped_early = True
+        except OSError as e:
+            logger.warning(f"Could not scan {dir_path}: {e}")
+        # Visit subdirectories in the order they were listed, like os.walk
+        queue.extend(subdirs)
+
+    if stopped_early:
+        logger.info(
+            f"Stopped counting the files of known groups in {abs_folder_path} after {num_files} files, "
+            "the groups are stable."
+        )
+    return ScanResult(groups=list(reservoirs.groups.values()), num_files=num_files, stopped_early=stopped_early)
@@ -2,7 +2,7 @@ import logging
 
 from ..prompts import ErrorAnalyzerPrompt
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +41,7 @@ class ErrorAnalyzerAgent(BaseAgent):
         )
 
         # Build prompt for evaluating execution results
-        prompt = self.error_analyzer_prompt.build()
+        prompt, profile_record = self.error_analyzer_prompt.build_with_profile()
 
         if not self.error_analyzer_llm_config.multi_turn:
             self.error_analyzer_llm = init_llm(
@@ -50,7 +50,13 @@ class ErrorAnalyzerAgent(BaseAgent):
                 multi_turn=self.error_analyzer_llm_config.multi_turn,
             )
 
-        response = self.error_analyzer_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.error_analyzer_llm,
+            prompt,
+            self.error_analyzer_prompt,
+            self.error_analyzer_llm_config,
+            profile_record=profile_record,
+        )
 
         error_analysis = self.error_analyzer_prompt.parse(response)
 
@@ -8,18 +8,19 @@ from rich.progress import (
 from ..prompts import ExecuterPrompt
 from ..rich_logging import show_progress_bar
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
 
-def execute_code(code, language, timeout):
+def execute_code(code, language, timeout, show_progress=True):
     """
     Execute code with real-time output streaming and timeout and show a linear timeout progress bar..
     Args:
         code (str): The code to execute (Python code or bash script)
         language (str): The language to execute ("python" or "bash")
         timeout (float): Maximum execution time in seconds before terminating the process.
+        show_progress (bool): Whether to show the progress bar, only one can be shown at a time.
     Returns:
         tuple: (success: bool, stdout: str, stderr: str)
     """
@@ -62,7 +63,7 @@ def execute_code(code, language, timeout):
             TextColumn("[bold green]{task.completed:.1f}s[/bold green] [dim](time limit: {task.total:.0f}s)[/dim]"),
             refresh_per_second=2,
             transient=False,
-            disable=not show_progress_bar(),
+            disable=not (show_progress and show_progress_bar()),
         ) as progress_context:
 
             task = progress_context.add_task("", total=timeout)
@@ -145,11 +146,14 @@ class ExecuterAgent(BaseAgent):
     Agent Output:
     """
 
-    def __init__(self, config, manager, language, timeout, executer_llm_config, executer_prompt_template):
+    def __init__(
+        self, config, manager, language, timeout, executer_llm_config, executer_prompt_template, show_progress=True
+    ):
         super().__init__(config=config, manager=manager)
         assert language in ["bash", "python"]
 
         self.timeout = timeout
+        self.show_progress = show_progress
         self.language = language
         self.executer_llm_config = executer_llm_config
 
@@ -171,24 +175,36 @@ class ExecuterAgent(BaseAgent):
             llm_config=self.executer_llm_config, manager=manager, template=self.executer_prompt_template
         )
 
-    def __call__(self, code_to_execute, code_to_analyze=None, execution_task=None, execution_data=None):
+    def __call__(self, code_to_execute, code_to_analyze=None, execution_task=None, execution_data=None, timeout=None):
+        """
+        Execute the code and let the LLM evaluate its output.
 
+        timeout overrides the execution timeout of the agent for this call.
+        """
         self.manager.log_agent_start("ExecuterAgent: executing code and collecting stdout/stderr for evaluation.")
 
         if code_to_analyze is None:
             code_to_analyze = code_to_execute
 
-        success, stdout, stderr = execute_code(code=code_to_execute, language=self.language, timeout=self.timeout)
+        success, stdout, stderr = execute_code(
+            code=code_to_execute,
+            language=self.language,
+            timeout=self.timeout if timeout is None else timeout,
+            show_progress=self.show_progress,
+        )
 
-        if not self.executer_llm_config.multi_turn:
-            self.executer_llm = init_llm(
+        # A new LLM per call unless multi-turn, so that the agent can be called from several threads
+        if self.executer_llm_config.multi_turn:
+            executer_llm = self.executer_llm
+        else:
+            executer_llm = init_llm(
                 llm_config=self.executer_llm_config,
                 agent_name=f"{self.language}_executer",
                 multi_turn=self.executer_llm_config.multi_turn,
             )
 
         # Build prompt for evaluating execution results
-        prompt = self.executer_prompt.build(
+        prompt, profile_record = self.executer_prompt.build_with_profile(
             stdout=stdout,
             stderr=stderr,
             code_to_analyze=code_to_analyze,
@@ -197,7 +213,9 @@ class ExecuterAgent(BaseAgent):
         )
 
         # Query the LLM
-        response = self.executer_llm.assistant_chat(prompt)
+        response = query_llm(
+            executer_llm, prompt, self.executer_prompt, self.executer_llm_config, profile_record=profile_record
+        )
 
         # Parse the LLM response to extract decision, error summary, and validation score
         decision, error_summary, validation_score = self.executer_prompt.parse(response)
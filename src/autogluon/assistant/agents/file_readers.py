@@ -0,0 +1,306 @@
+"""
+Native readers for common data formats.
+
+DataPerceptionAgent asks an LLM to write reader code for every file it inspects. For well-known
+formats (CSV, Parquet, JSON, Excel, images, audio, ...) the readers registered here produce an
+equivalent summary in milliseconds; the LLM path is only used for formats without a native
+reader or when a native reader fails. Readers are selected by file extension first and by the
+magic bytes at the start of the file otherwise, and only read headers or the first rows.
+"""
+
+import io
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+NUM_HEAD_ROWS = 5
+
+# Rows read to infer the column types of text tabular formats
+NUM_DTYPE_INFERENCE_ROWS = 1000
+
+# Rows of text tabular files up to this size are counted, larger files are estimated from their first bytes
+MAX_ROW_COUNT_BYTES = 64 * 1024 * 1024
+ROW_SAMPLE_BYTES = 1024 * 1024
+
+# JSON documents up to this size are parsed to describe their structure
+MAX_JSON_PARSE_BYTES = 16 * 1024 * 1024
+
+ReaderFunction = Callable[[str], str]
+
+_readers_by_extension: Dict[str, ReaderFunction] = {}
+_readers_by_magic: List[Tuple[bytes, int, ReaderFunction]] = []
+
+
+def register_reader(extensions: List[str], magic: Optional[List[Tuple[bytes, int]]] = None):
+    """
+    Register a native reader.
+
+    Args:
+        extensions: Lower-case file extensions (including the dot) handled by the reader
+        magic: Optional list of (signature, offset) of magic bytes identifying the format
+
+    Returns:
+        Decorator registering the reader function, which takes a file path and returns the summary
+    """
+
+    def decorator(func: ReaderFunction) -> ReaderFunction:
+        for extension in extensions:
+            _readers_by_extension[extension] = func
+        for signature, offset in magic or []:
+            _readers_by_magic.append((signature, offset, func))
+        return func
+
+    return decorator
+
+
+def get_native_reader(file_path: str) -> Optional[ReaderFunction]:
+    """Get the native reader of a file by its extension or magic bytes, None for unknown formats."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in _readers_by_extension:
+        return _readers_by_extension[extension]
+
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(16)
+    except OSError:
+        return None
+    for signature, offset, func in _readers_by_magic:
+        if header[offset : offset + len(signature)] == signature:
+            return func
+    return None
+
+
+def read_file_natively(file_path: str, max_chars: int) -> Optional[str]:
+    """
+    Summarize a file with a native reader.
+
+    Args:
+        file_path: Path to the file
+        max_chars: Maximum number of characters of the summary
+
+    Returns:
+        The summary, or None if there is no native reader for the format or it failed
+    """
+    reader = get_native_reader(file_path)
+    if reader is None:
+        return None
+    try:
+        result = reader(file_path)
+    except Exception as e:
+        logger.info(f"Native reader {reader.__name__} failed on {file_path}, falling back to the LLM reader: {e}")
+        return None
+
+    if len(result) > max_chars:
+        result = result[: max_chars - 3] + "..."
+    return result
+
+
+def _read_row_sample(file_path: str) -> bytes:
+    """The first ROW_SAMPLE_BYTES of a file, cut after its last line break."""
+    with open(file_path, "rb") as f:
+        sample = f.read(ROW_SAMPLE_BYTES)
+    return sample[: sample.rfind(b"\n") + 1]
+
+
+def _count_lines(file_path: str) -> Tuple[Optional[int], bool]:
+    """
+    Number of lines of a file, estimated from the average line size of its first bytes for large files.
+
+    Returns:
+        Tuple of (number of lines, None if no line ends in the sample, whether it is an estimate)
+    """
+    size = os.path.getsize(file_path)
+    if size > MAX_ROW_COUNT_BYTES:
+        sample = _read_row_sample(file_path)
+        if not sample:
+            return None, True
+        return round(size * sample.count(b"\n") / len(sample)), True
+
+    num_lines = 0
+    last_byte = b"\n"
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            num_lines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    # A last line without a trailing newline
+    return num_lines + (last_byte != b"\n"), False
+
+
+def _count_delimited_rows(file_path: str, separator: str) -> Tuple[Optional[int], bool]:
+    """
+    Number of data rows of a delimited file, estimated from the average row size of its first bytes for large files.
+
+    Rows are parsed (first column only) rather than lines counted, so that quoted values spanning
+    several lines count once.
+
+    Returns:
+        Tuple of (number of rows, None if no row ends in the sample, whether it is an estimate)
+    """
+    size = os.path.getsize(file_path)
+    if size <= MAX_ROW_COUNT_BYTES:
+        chunks = pd.read_csv(file_path, sep=separator, usecols=[0], chunksize=1024 * 1024)
+        return sum(len(chunk) for chunk in chunks), False
+
+    sample = _read_row_sample(file_path)
+    header_size = sample.find(b"\n") + 1
+    if len(sample) <= header_size:
+        return None, True
+    try:
+        num_sample_rows = len(pd.read_csv(io.BytesIO(sample), sep=separator, usecols=[0]))
+    except pd.errors.ParserError:
+        # The sample ends inside a quoted value spanning several lines
+        num_sample_rows = sample.count(b"\n") - 1
+    return round((size - header_size) * num_sample_rows / (len(sample) - header_size)), True
+
+
+def _describe_dataframe(df: pd.DataFrame, num_rows: Optional[int], extra: str = "", approximate: bool = False) -> str:
+    lines = []
+    if num_rows is not None:
+        lines.append(f"Rows: about {num_rows} (estimated from the first rows)" if approximate else f"Rows: {num_rows}")
+    lines.append(f"Columns ({len(df.columns)}):")
+    lines.extend(f"  {column}: {dtype}" for column, dtype in df.dtypes.items())
+    if extra:
+        lines.append(extra)
+    lines.append(f"First {min(NUM_HEAD_ROWS, len(df))} rows:")
+    with pd.option_context("display.max_columns", 50, "display.width", 200):
+        lines.append(df.head(NUM_HEAD_ROWS).to_string())
+    return "\n".join(lines)
+
+
+@register_reader([".csv", ".tsv"])
+def read_delimited(file_path: str) -> str:
+    separator = "\t" if file_path.lower().endswith(".tsv") else ","
+    df = pd.read_csv(file_path, sep=separator, nrows=NUM_DTYPE_INFERENCE_ROWS)
+    if len(df) < NUM_DTYPE_INFERENCE_ROWS:
+        # The whole file was read
+        num_rows, approximate = len(df), False
+    else:
+        num_rows, approximate = _count_delimited_rows(file_path, separator)
+    return f"Format: delimited text (separator {separator!r})\n" + _describe_dataframe(
+        df, num_rows, approximate=approximate
+    )
+
+
+@register_reader([".parquet", ".pq"], magic=[(b"PAR1", 0)])
+def read_parquet(file_path: str) -> str:
+    if pq is None:
+        df = pd.read_parquet(file_path)
+        return "Format: parquet\n" + _describe_dataframe(df, len(df))
+
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    head = next(parquet_file.iter_batches(batch_size=NUM_HEAD_ROWS), None)
+    df = head.to_pandas() if head is not None else parquet_file.schema_arrow.empty_table().to_pandas()
+    extra = f"Row groups: {metadata.num_row_groups}\nArrow schema:\n{parquet_file.schema_arrow}"
+    return "Format: parquet\n" + _describe_dataframe(df, metadata.num_rows, extra)
+
+
+@register_reader([".jsonl", ".ndjson"])
+def read_json_lines(file_path: str) -> str:
+    df = pd.read_json(file_path, lines=True, nrows=NUM_DTYPE_INFERENCE_ROWS)
+    num_rows, approximate = _count_lines(file_path)
+    return "Format: JSON lines\n" + _describe_dataframe(df, num_rows, approximate=approximate)
+
+
+def _describe_json(value, depth: int = 0, max_depth: int = 3) -> str:
+    indent = "  " * depth
+    if isinstance(value, dict):
+        if depth >= max_depth:
+            return f"{indent}object with {len(value)} keys"
+        lines = [f"{indent}object with {len(value)} keys:"]
+        for key in list(value)[:20]:
+            child = _describe_json(value[key], depth + 1, max_depth).strip()
+            lines.append(f"{indent}  {key!r}: {child}")
+        if len(value) > 20:
+            lines.append(f"{indent}  ... ({len(value) - 20} more keys)")
+        return "\n".join(lines)
+    if isinstance(value, list):
+        if not value or depth >= max_depth:
+            return f"{indent}array of {len(value)} items"
+        return f"{indent}array of {len(value)} items, first item:\n{_describe_json(value[0], depth + 1, max_depth)}"
+    return f"{indent}{type(value).__name__}: {str(value)[:80]!r}"
+
+
+@register_reader([".json"])
+def read_json(file_path: str) -> str:
+    size = os.path.getsize(file_path)
+    if size > MAX_JSON_PARSE_BYTES:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            return f"Format: JSON ({size} bytes, too large to parse)\nStart of the file:\n{f.read(2048)}"
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return f"Format: JSON ({size} bytes)\nStructure:\n{_describe_json(data)}"
+
+
+@register_reader([".xlsx", ".xls", ".xlsm"])
+def read_excel(file_path: str) -> str:
+    excel_file = pd.ExcelFile(file_path)
+    sections = [f"Format: Excel workbook\nSheets: {excel_file.sheet_names}"]
+    for sheet_name in excel_file.sheet_names[:5]:
+        df = excel_file.parse(sheet_name, nrows=NUM_DTYPE_INFERENCE_ROWS)
+        sections.append(f"Sheet {sheet_name!r}:\n" + _describe_dataframe(df, None))
+    return "\n".join(sections)
+
+
+@register_reader(
+    [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".webp"],
+    magic=[(b"\x89PNG", 0), (b"\xff\xd8\xff", 0), (b"GIF8", 0), (b"BM", 0), (b"II*\x00", 0), (b"MM\x00*", 0)],
+)
+def read_image(file_path: str) -> str:
+    if Image is None:
+        raise ImportError("Pillow is not installed")
+    # Image.open only reads the header, the pixel data is loaded lazily
+    with Image.open(file_path) as image:
+        width, height = image.size
+        frames = getattr(image, "n_frames", 1)
+        return (
+            f"Format: image ({image.format})\nWidth: {width}\nHeight: {height}\nMode: {image.mode}"
+            + (f"\nFrames: {frames}" if frames > 1 else "")
+            + f"\nFile size: {os.path.getsize(file_path)} bytes"
+        )
+
+
+@register_reader([".wav", ".flac", ".ogg", ".aiff", ".aif"], magic=[(b"fLaC", 0), (b"OggS", 0), (b"WAVE", 8)])
+def read_audio(file_path: str) -> str:
+    if soundfile is None:
+        raise ImportError("soundfile is not installed")
+    info = soundfile.info(file_path)
+    return (
+        f"Format: audio ({info.format}, {info.subtype})\nSample rate: {info.samplerate} Hz\n"
+        f"Channels: {info.channels}\nFrames: {info.frames}\nDuration: {info.duration:.3f} s"
+    )
+
+
+@register_reader([".npy"], magic=[(b"\x93NUMPY", 0)])
+def read_numpy(file_path: str) -> str:
+    import numpy as np
+
+    array = np.load(file_path, mmap_mode="r", allow_pickle=False)
+    return f"Format: NumPy array\nShape: {array.shape}\nDtype: {array.dtype}\nFirst values: {array.ravel()[:10]}"
+
+
+@register_reader([".txt", ".md", ".rst"])
+def read_text(file_path: str) -> str:
+    # The summary is truncated to max_chars afterwards, no need to read more than that
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read(64 * 1024)
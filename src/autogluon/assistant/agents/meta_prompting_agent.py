@@ -8,6 +8,7 @@ and dynamically rewrite a specific prompt to better suit the requirements.
 import logging
 
 from ..prompts import MetaPromptingPrompt
+from ..prompts.meta_prompt_cache import MetaPromptCache
 from .base_agent import BaseAgent
 from .utils import init_llm
 
@@ -55,6 +56,15 @@ class MetaPromptingAgent(BaseAgent):
         # Store rewritten templates in a dictionary keyed by prompt class name
         self._rewritten_templates = {}
 
+        # Rewritten templates are also cached across runs
+        cache_config = self.config.get("meta_prompt_cache", {})
+        self.cache = None
+        if cache_config.get("enabled", False):
+            self.cache = MetaPromptCache(
+                cache_dir=cache_config.get("cache_dir", None),
+                similarity_threshold=cache_config.get("similarity_threshold", 1.0),
+            )
+
     def __call__(self, target_prompt_instance, force_rewrite=False):
         """
         Generate a rewritten prompt template for the specified prompt class.
@@ -76,6 +86,23 @@ class MetaPromptingAgent(BaseAgent):
             self.manager.target_prompt_instance = None
             return self._rewritten_templates[prompt_name]
 
+        # Reuse the template rewritten in a previous run on the same (or a near-identical) task
+        original_template = target_prompt_instance.template
+        task_text = f"{self.manager.task_description}\n{self.manager.data_prompt}"
+        model = self.llm_config.get("model", None)
+        if self.cache is not None and not force_rewrite:
+            rewritten_template = self.cache.get(prompt_name, original_template, task_text, model)
+            if rewritten_template:
+                self._rewritten_templates[prompt_name] = rewritten_template
+                self.manager.save_and_log_states(
+                    content=rewritten_template,
+                    save_name=f"rewritten_{prompt_name}_template.txt",
+                    per_iteration=False,
+                    add_uuid=False,
+                )
+                self.manager.target_prompt_instance = None
+                return rewritten_template
+
         self.manager.log_agent_start(
             f"MetaPromptingAgent: starting to analyze task and rewrite {prompt_name} template."
         )
@@ -97,6 +124,8 @@ class MetaPromptingAgent(BaseAgent):
 
         # Cache the rewritten template
         self._rewritten_templates[prompt_name] = rewritten_template
+        if self.cache is not None and rewritten_template:
+            self.cache.put(prompt_name, original_template, task_text, model, rewritten_template)
 
         # Save the rewritten template for debugging
         self.manager.save_and_log_states(
@@ -1,13 +1,20 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from ..prompts import RerankerPrompt
 from ..tools_registry import TutorialInfo
+from ..tools_registry.cross_encoder import DEFAULT_CROSS_ENCODER_MODEL, get_cross_encoder
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
+RERANKER_MODES = ["llm", "local"]
+# Characters of a tutorial's content scored by the cross-encoder when it has no summary
+LOCAL_PASSAGE_CHARS = 2000
+# Characters of the task context used as the cross-encoder query
+LOCAL_QUERY_CHARS = 2048
+
 
 class RerankerAgent(BaseAgent):
     """
@@ -26,9 +33,17 @@ class RerankerAgent(BaseAgent):
             template=self.reranker_prompt_template,
         )
 
-        if self.reranker_llm_config.multi_turn:
+        # "llm" asks the reranker LLM, "local" scores the candidates with a cross-encoder on the CPU
+        self.mode = self.reranker_llm_config.get("mode", "llm")
+        if self.mode not in RERANKER_MODES:
+            raise ValueError(f"Unknown reranker mode {self.mode}, expected one of {RERANKER_MODES}")
+
+        self.reranker_llm = None
+        # Shared with the other agents of the process
+        self.cross_encoder = self._get_cross_encoder() if self.mode == "local" else None
+        if self.mode == "llm" and self.reranker_llm_config.multi_turn:
             self.reranker_llm = init_llm(
-                llm_config=self.rerankerl_llm_config,
+                llm_config=self.reranker_llm_config,
                 agent_name="reranker",
                 multi_turn=self.reranker_llm_config.multi_turn,
             )
@@ -37,39 +52,154 @@ class RerankerAgent(BaseAgent):
         """Select and rerank relevant tutorials from retrieved candidates."""
         self.manager.log_agent_start("RerankerAgent: reranking and selecting top tutorials from retrieved candidates.")
 
+        candidates = self.manager.tutorial_retrieval or []
+        skip_reason = self._get_skip_reason(candidates)
+        if skip_reason is None and self.mode == "local":
+            skip_reason = "local_cross_encoder"
+        retrieval_stats = getattr(self.manager, "retrieval_stats", None)
+        if retrieval_stats is not None:
+            retrieval_stats.record_rerank(
+                skipped=skip_reason is not None, num_candidates=len(candidates), reason=skip_reason
+            )
+
+        if skip_reason == "local_cross_encoder":
+            selected_tutorials = self.select_tutorials(candidates, mode="local")
+        elif skip_reason is not None:
+            logger.info(f"Skipping the reranker LLM call: {skip_reason}.")
+            selected_tutorials = self._select_top_by_score(candidates)
+        else:
+            selected_tutorials = self.select_tutorials(candidates, mode="llm")
+
+        # Generate tutorial prompt using selected tutorials
+        tutorial_prompt = self._generate_tutorial_prompt(selected_tutorials)
+
+        # Save reranking results for debugging
+        self.manager.save_and_log_states(
+            content=self._format_reranking_results(selected_tutorials),
+            save_name="tutorial_reranking_results.txt",
+            per_iteration=True,
+            add_uuid=False,
+        )
+
+        self.manager.log_agent_end(
+            f"RerankerAgent: selected {len(selected_tutorials)} tutorials and formatted prompt."
+        )
+        return tutorial_prompt
+
+    def select_tutorials(self, candidates: List[TutorialInfo], mode: Optional[str] = None) -> List[TutorialInfo]:
+        """
+        Select the most relevant of the retrieved tutorials.
+
+        Args:
+            candidates: Retrieved tutorials, the tutorial_retrieval of the manager the LLM prompt is built from
+            mode: "llm" or "local", the configured mode if None
+
+        Returns:
+            Up to max_num_tutorials selected tutorials, most relevant first
+        """
+        mode = mode or self.mode
+        if mode == "local":
+            try:
+                return self._select_with_cross_encoder(candidates)
+            except Exception as e:
+                logger.warning(
+                    f"Local tutorial reranking failed, falling back to top tutorials by retrieval score: {e}"
+                )
+                return self._select_top_by_score(candidates)
+
         # Build prompt for tutorial reranking
-        prompt = self.reranker_prompt.build()
+        prompt, profile_record = self.reranker_prompt.build_with_profile()
 
-        if not self.reranker_llm_config.multi_turn:
+        if not self.reranker_llm_config.multi_turn or self.reranker_llm is None:
             self.reranker_llm = init_llm(
                 llm_config=self.reranker_llm_config,
                 agent_name="reranker",
                 multi_turn=self.reranker_llm_config.multi_turn,
             )
 
-        response = self.reranker_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.reranker_llm, prompt, self.reranker_prompt, self.reranker_llm_config, profile_record=profile_record
+        )
         selected_tutorials = self.reranker_prompt.parse(response)
 
         # Fallback: if parsing fails or returns empty, use top tutorials by score
         if not selected_tutorials:
             logger.warning("Tutorial reranking failed, falling back to top tutorials by retrieval score.")
             selected_tutorials = self._select_top_by_score(self.reranker_prompt.tutorials)
+        return selected_tutorials
 
-        # Generate tutorial prompt using selected tutorials
-        tutorial_prompt = self._generate_tutorial_prompt(selected_tutorials)
+    def _get_cross_encoder(self):
+        local_config = self.reranker_llm_config.get("local", {})
+        return get_cross_encoder(
+            model_name=local_config.get("model", DEFAULT_CROSS_ENCODER_MODEL),
+            backend=local_config.get("backend", "torch"),
+            onnx_path=local_config.get("onnx_path", None),
+            device=local_config.get("device", "cpu"),
+            batch_size=local_config.get("batch_size", 16),
+            max_length=local_config.get("max_length", 512),
+        )
 
-        # Save reranking results for debugging
+    def _build_local_query(self) -> str:
+        """The task context the cross-encoder scores tutorials against."""
+        parts = [
+            getattr(self.manager, "task_description", "") or "",
+            getattr(self.manager, "user_input", "") or "",
+            getattr(self.manager, "error_analysis", "") or "",
+        ]
+        return "\n".join(part for part in parts if part)[:LOCAL_QUERY_CHARS]
+
+    def _select_with_cross_encoder(self, candidates: List[TutorialInfo]) -> List[TutorialInfo]:
+        """Select the candidates with the highest cross-encoder scores."""
+        if not candidates:
+            return []
+        if self.cross_encoder is None:
+            self.cross_encoder = self._get_cross_encoder()
+
+        use_tutorial_summary = self.config.get("use_tutorial_summary", True)
+        passages = []
+        for tutorial in candidates:
+            if use_tutorial_summary and tutorial.summary:
+                passages.append(f"{tutorial.title}\n{tutorial.summary}")
+            else:
+                passages.append(f"{tutorial.title}\n{(tutorial.content or '')[:LOCAL_PASSAGE_CHARS]}")
+        scores = self.cross_encoder.score(self._build_local_query(), passages)
+
+        ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)
         self.manager.save_and_log_states(
-            content=self._format_reranking_results(selected_tutorials),
-            save_name="tutorial_reranking_results.txt",
+            content="\n".join(f"{score:.4f}\t{tutorial.title}" for tutorial, score in ranked),
+            save_name="reranker_scores.txt",
             per_iteration=True,
             add_uuid=False,
         )
+        return [tutorial for tutorial, _ in ranked[: self.config.max_num_tutorials]]
 
-        self.manager.log_agent_end(
-            f"RerankerAgent: selected {len(selected_tutorials)} tutorials and formatted prompt."
-        )
-        return tutorial_prompt
+    def _get_skip_reason(self, candidates: List[TutorialInfo]) -> Optional[str]:
+        """
+        Decide whether the retrieval ranking is confident enough to skip the reranker LLM call.
+
+        The call is skipped when the dense cosine similarity of every tutorial that would be selected
+        by retrieval score exceeds the one of every other candidate by at least rerank_skip_margin.
+        Fused (RRF) scores are not used: they depend only on ranks, so their gaps say nothing about how
+        much better the top tutorials match. With no more candidates than tutorials to select, the
+        reranker is still queried, as it also drops irrelevant tutorials.
+
+        Returns:
+            The reason for skipping the call, or None if the reranker LLM should be queried
+        """
+        skip_margin = self.config.get("hybrid_retrieval", {}).get("rerank_skip_margin", None)
+        max_num_tutorials = self.config.max_num_tutorials
+        if skip_margin is None or len(candidates) <= max_num_tutorials:
+            return None
+
+        ranked = sorted(candidates, key=lambda t: t.score or 0.0, reverse=True)
+        selected_scores = [t.dense_score for t in ranked[:max_num_tutorials]]
+        if any(score is None for score in selected_scores):
+            return None
+        # Candidates without a dense score were only found by BM25, below all the dense candidates
+        rejected_scores = [t.dense_score for t in ranked[max_num_tutorials:] if t.dense_score is not None]
+        if rejected_scores and min(selected_scores) - max(rejected_scores) >= skip_margin:
+            return "confident_ranking"
+        return None
 
     def _select_top_by_score(self, tutorials: List[TutorialInfo]) -> List[TutorialInfo]:
         """Select top tutorials by retrieval score as fallback."""
@@ -84,8 +214,11 @@ class RerankerAgent(BaseAgent):
     ) -> str:
         """Format a single tutorial's content with truncation if needed."""
         try:
-            with open(tutorial.path, "r", encoding="utf-8") as f:
-                content = f.read()
+            # The retrieved content, which is only the matching sections with chunk retrieval
+            content = tutorial.content
+            if content is None:
+                with open(tutorial.path, "r", encoding="utf-8") as f:
+                    content = f.read()
 
             # Truncate if needed
             if len(content) > max_length:
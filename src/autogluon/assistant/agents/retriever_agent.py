@@ -1,12 +1,11 @@
 import logging
+import time
 from typing import Any, Dict, List
 
-from autogluon.assistant.tools_registry.indexing import TutorialIndexer
-
 from ..prompts import RetrieverPrompt
 from ..tools_registry import TutorialInfo
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_embedding_service, init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +29,9 @@ class RetrieverAgent(BaseAgent):
             template=self.retriever_prompt_template,
         )
 
-        # Initialize tutorial indexer
-        self.indexer = TutorialIndexer()
-        self._initialize_indexer()
+        # Shared embedding model and tutorial indices, loaded once per process (or served by a daemon)
+        self.chunk_config = self.config.get("chunk_retrieval", {})
+        self.indexer = init_embedding_service(self.config)
 
         if self.retriever_llm_config.multi_turn:
             self.retriever_llm = init_llm(
@@ -41,26 +40,13 @@ class RetrieverAgent(BaseAgent):
                 multi_turn=self.retriever_llm_config.multi_turn,
             )
 
-    def _initialize_indexer(self):
-        """Initialize the tutorial indexer, building indices if necessary."""
-        try:
-            loaded_successfully = self.indexer.load_indices()
-            if not loaded_successfully:
-                logger.info("Building tutorial indices...")
-                self.indexer.build_indices()
-                self.indexer.save_indices()
-                logger.info("Tutorial indices built and saved successfully.")
-        except Exception as e:
-            logger.error(f"Error initializing tutorial indexer: {e}")
-            raise
-
     def __call__(self) -> List[TutorialInfo]:
         """Retrieve relevant tutorials using LLM-generated search queries."""
         self.manager.log_agent_start("RetrieverAgent: generating search query and retrieving tutorials.")
 
         try:
             # Build prompt for search query generation
-            prompt = self.retriever_prompt.build()
+            prompt, profile_record = self.retriever_prompt.build_with_profile()
 
             if not self.retriever_llm_config.multi_turn:
                 self.retriever_llm = init_llm(
@@ -70,22 +56,52 @@ class RetrieverAgent(BaseAgent):
                 )
 
             # Get LLM response for search query
-            response = self.retriever_llm.assistant_chat(prompt)
+            response = query_llm(
+                self.retriever_llm,
+                prompt,
+                self.retriever_prompt,
+                self.retriever_llm_config,
+                profile_record=profile_record,
+            )
 
-            # Parse the search query from LLM response
-            search_query = self.retriever_prompt.parse(response)
+            # Parse the search query and its expansions from LLM response
+            search_queries = self.retriever_prompt.parse(response)
 
-            if not search_query:
+            if not search_queries:
                 logger.warning("Failed to generate search query, using fallback.")
-                search_query = self._get_fallback_query()
+                search_queries = [self._get_fallback_query()]
+            search_query = " | ".join(search_queries)
 
-            # Perform semantic search
-            results = self.indexer.search(
-                query=search_query,
-                tool_name=self.manager.selected_tool,
+            # Perform semantic search, fused with a BM25 search over titles, summaries and API names
+            hybrid_config = self.config.get("hybrid_retrieval", {})
+            hybrid = hybrid_config.get("enabled", True)
+            search_kwargs = dict(
                 condensed=self.config.condense_tutorials,
                 top_k=self.config.num_tutorial_retrievals,
+                hybrid=hybrid,
+                rrf_k=hybrid_config.get("rrf_k", 60),
+                # Only the matching sections of the tutorials (and their neighbours) are returned
+                chunked=self.chunk_config.get("enabled", False),
+                chunk_neighbours=self.chunk_config.get("neighbours", 1),
+                max_sections=self.chunk_config.get("max_sections", 3),
             )
+            search_start = time.perf_counter()
+            if len(search_queries) > 1:
+                # The queries are embedded in one batch and searched at once, their rankings fused
+                results = self.indexer.search_many(search_queries, [self.manager.selected_tool], **search_kwargs)
+            else:
+                results = self.indexer.search(
+                    query=search_queries[0], tool_name=self.manager.selected_tool, **search_kwargs
+                )
+            retrieval_stats = getattr(self.manager, "retrieval_stats", None)
+            if retrieval_stats is not None:
+                retrieval_stats.record_retrieval(
+                    tool_name=self.manager.selected_tool,
+                    hybrid=hybrid,
+                    num_results=len(results),
+                    latency=time.perf_counter() - search_start,
+                    num_queries=len(search_queries),
+                )
 
             # Convert results to tutorial info format
             retrieved_tutorials = self._convert_to_tutorial_info(results)
@@ -138,6 +154,9 @@ class RetrieverAgent(BaseAgent):
                     summary=summary,
                     score=score,
                     content=content,
+                    # Without fusion, the score is the cosine similarity
+                    dense_score=result.get("dense_score", score),
+                    bm25_score=result.get("bm25_score"),
                 )
 
                 tutorials.append(tutorial)
@@ -210,9 +229,5 @@ class RetrieverAgent(BaseAgent):
 
     def cleanup(self):
         """Clean up resources."""
-        if hasattr(self, "indexer"):
-            self.indexer.cleanup()
-
-    def __del__(self):
-        """Destructor to ensure cleanup."""
-        self.cleanup()
+        # The embedding service is shared with other agents and managers, it is released at exit
+        self.indexer = None
@@ -2,7 +2,7 @@ import logging
 
 from ..prompts import TaskDescriptorPrompt
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +58,7 @@ class TaskDescriptorAgent(BaseAgent):
         task_description = description_files_contents
 
         # Otherwise generate condensed task description
-        prompt = self.task_descriptor_prompt.build()
+        prompt, profile_record = self.task_descriptor_prompt.build_with_profile()
 
         if not self.task_descriptor_llm_config.multi_turn:
             self.task_descriptor_llm = init_llm(
@@ -67,7 +67,13 @@ class TaskDescriptorAgent(BaseAgent):
                 multi_turn=self.task_descriptor_llm_config.multi_turn,
             )
 
-        response = self.task_descriptor_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.task_descriptor_llm,
+            prompt,
+            self.task_descriptor_prompt,
+            self.task_descriptor_llm_config,
+            profile_record=profile_record,
+        )
 
         task_description = self.task_descriptor_prompt.parse(response)
 
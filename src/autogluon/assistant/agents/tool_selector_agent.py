@@ -1,9 +1,11 @@
 import logging
-from typing import List, Union
+from typing import Dict, List, Union
 
 from ..prompts import ToolSelectorPrompt
+from ..tools_registry import registry
+from ..tools_registry.lexical import extract_title
 from .base_agent import BaseAgent
-from .utils import init_llm
+from .utils import init_embedding_service, init_llm, query_llm
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ class ToolSelectorAgent(BaseAgent):
     Agent Input:
     - data_prompt: Text string containing data prompt
     - description: Description of the task/data from previous analysis
+    - Optionally, the tutorials of all tools that best match the task (tool_selector.tutorial_probe)
 
     Agent Output:
     - List[str]: Prioritized list of tool names
@@ -44,7 +47,7 @@ class ToolSelectorAgent(BaseAgent):
         self.manager.log_agent_start("ToolSelectorAgent: choosing and ranking ML libraries for the task.")
 
         # Build prompt for tool selection
-        prompt = self.tool_selector_prompt.build()
+        prompt, profile_record = self.tool_selector_prompt.build_with_profile(tutorial_matches=self._probe_tutorials())
 
         if not self.tool_selector_llm_config.multi_turn:
             self.tool_selector_llm = init_llm(
@@ -53,7 +56,13 @@ class ToolSelectorAgent(BaseAgent):
                 multi_turn=self.tool_selector_llm_config.multi_turn,
             )
 
-        response = self.tool_selector_llm.assistant_chat(prompt)
+        response = query_llm(
+            self.tool_selector_llm,
+            prompt,
+            self.tool_selector_prompt,
+            self.tool_selector_llm_config,
+            profile_record=profile_record,
+        )
 
         tools = self.tool_selector_prompt.parse(response)
         # Select only top #tools required
@@ -64,3 +73,50 @@ class ToolSelectorAgent(BaseAgent):
         self.manager.log_agent_end(f"ToolSelectorAgent: selected tools in priority order: {tools_str}")
 
         return tools
+
+    def _probe_tutorials(self) -> Dict[str, List[str]]:
+        """
+        Search the tutorials of all tools at once with the task description and user input.
+
+        Returns:
+            Titles of the best matching tutorials of each tool that has some, empty if the probe is disabled
+        """
+        probe_config = self.tool_selector_llm_config.get("tutorial_probe", {})
+        if not probe_config.get("enabled", False):
+            return {}
+        queries = [
+            text[:512]
+            for text in (getattr(self.manager, "task_description", None), getattr(self.manager, "user_input", None))
+            if text and text.strip()
+        ]
+        if not queries:
+            return {}
+
+        try:
+            hybrid_config = self.config.get("hybrid_retrieval", {})
+            results = init_embedding_service(self.config).search_many(
+                queries,
+                list(registry.tools),
+                condensed=self.config.condense_tutorials,
+                top_k=probe_config.get("top_k", 20),
+                hybrid=hybrid_config.get("enabled", True),
+                rrf_k=hybrid_config.get("rrf_k", 60),
+            )
+        except Exception as e:
+            logger.warning(f"Tutorial probe failed, selecting tools without it: {e}")
+            return {}
+
+        max_per_tool = probe_config.get("max_per_tool", 3)
+        matches: Dict[str, List[str]] = {}
+        for result in results:
+            titles = matches.setdefault(result["tool_name"], [])
+            if len(titles) < max_per_tool:
+                titles.append(extract_title(result["content"]) or result["relative_path"])
+
+        self.manager.save_and_log_states(
+            content="\n".join(f"{tool}: {'; '.join(titles)}" for tool, titles in matches.items()),
+            save_name="tool_selector_tutorial_probe.txt",
+            per_iteration=False,
+            add_uuid=False,
+        )
+        return matches
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 
 from ..llm import ChatLLMFactory
@@ -12,3 +13,46 @@ def init_llm(llm_config, agent_name, multi_turn):
     llm = ChatLLMFactory.get_chat_model(llm_config, session_name=session_name)
 
     return llm
+
+
+def init_embedding_service(config):
+    """
+    Get the embedding model and tutorial indices shared by the agents of a process (or served by a daemon).
+
+    The service is configured by the embedding_service, chunk_retrieval and ann_index sections of the config.
+    """
+    from ..tools_registry.embedding_service import get_embedding_service
+
+    service_config = config.get("embedding_service", {})
+    chunk_config = config.get("chunk_retrieval", {})
+    return get_embedding_service(
+        socket_path=service_config.get("socket_path", None),
+        max_batch_size=service_config.get("max_batch_size", 64),
+        max_wait_ms=service_config.get("max_wait_ms", 5.0),
+        chunk_size=chunk_config.get("chunk_size", 1500) if chunk_config.get("enabled", False) else None,
+        embedding_backend=service_config.get("backend", "torch"),
+        num_threads=service_config.get("num_threads", None),
+        warmup=service_config.get("warmup", True),
+        ann_config=config.get("ann_index", None),
+        update_indices=service_config.get("update_indices", None),
+    )
+
+
+def query_llm(llm, prompt, prompt_handler, llm_config, profile_record=None):
+    """
+    Send the prompt to the LLM and return its response.
+
+    If stream_early_stop is enabled in llm_config, the response is streamed and the stream is
+    stopped as soon as the prompt handler's incremental parser reports the response complete.
+    The latency of the call is attached to profile_record, as returned by build_with_profile().
+    """
+    start_time = time.perf_counter()
+    if llm_config.get("stream_early_stop", False):
+        response = llm.assistant_chat_streaming(prompt, stop_condition=prompt_handler.is_response_complete)
+    else:
+        response = llm.assistant_chat(prompt)
+
+    profiler = getattr(prompt_handler.manager, "prompt_profiler", None)
+    if profiler is not None:
+        profiler.record_llm_latency(profile_record, time.perf_counter() - start_time)
+    return response
@@ -43,7 +43,7 @@ def main(
     llm_provider: str = typer.Option(
         "bedrock",
         "--provider",
-        help="LLM provider to use (bedrock, openai, anthropic, sagemaker). Overrides config file.",
+        help="LLM provider to use (bedrock, openai, anthropic, sagemaker, mock). Overrides config file.",
     ),
     max_iterations: int = typer.Option(
         5,
@@ -115,7 +115,7 @@ def main(
     # 3) Invoke the core run_agent function
     # Override config path if provider is specified and config path is default
     provider_config_path = config_path
-    if llm_provider in ["bedrock", "openai", "anthropic", "sagemaker"] and config_path == DEFAULT_CONFIG_PATH:
+    if llm_provider in ["bedrock", "openai", "anthropic", "sagemaker", "mock"] and config_path == DEFAULT_CONFIG_PATH:
         provider_config_path = Path(DEFAULT_CONFIG_PATH).parent / f"{llm_provider}.yaml"
         if not provider_config_path.exists():
             provider_config_path = DEFAULT_CONFIG_PATH
@@ -159,7 +159,7 @@ def chat(
     llm_provider: str = typer.Option(
         "bedrock",
         "--provider",
-        help="LLM provider to use (bedrock, openai, anthropic, sagemaker). Overrides config file.",
+        help="LLM provider to use (bedrock, openai, anthropic, sagemaker, mock). Overrides config file.",
     ),
     session_id: str | None = typer.Option(
         None,
@@ -196,7 +196,7 @@ def chat(
         if chat_config_path.exists():
             provider_config_path = chat_config_path
 
-    if llm_provider in ["bedrock", "openai", "anthropic", "sagemaker"] and provider_config_path:
+    if llm_provider in ["bedrock", "openai", "anthropic", "sagemaker", "mock"] and provider_config_path:
         provider_specific = Path(provider_config_path).parent / f"{llm_provider}.yaml"
         if provider_specific.exists():
             provider_config_path = provider_specific
@@ -211,5 +211,87 @@ def chat(
     )
 
 
+@app.command("clear-cache")
+def clear_cache(
+    cache_dir: Path | None = typer.Option(
+        None,
+        "--cache-dir",
+        help="Cache directory (default: $MLZERO_CACHE_DIR or ~/.cache/autogluon-assistant)",
+    ),
+):
+    """
+    Remove the cached meta-prompted templates, data perception results and data profiles reused across runs.
+    """
+    import shutil
+
+    from autogluon.assistant.agents.data_profiler import PROFILE_CACHE_SUBDIR
+    from autogluon.assistant.managers.perception_cache import PERCEPTION_CACHE_SUBDIR
+    from autogluon.assistant.prompts.meta_prompt_cache import MetaPromptCache
+
+    cache = MetaPromptCache(cache_dir=cache_dir)
+    removed = cache.clear()
+    typer.echo(f"Removed {removed} cached meta-prompted templates from {cache.cache_dir}")
+
+    perception_cache_dir = cache.cache_dir.parent / PERCEPTION_CACHE_SUBDIR
+    if perception_cache_dir.exists():
+        shutil.rmtree(perception_cache_dir)
+        typer.echo(f"Removed cached data perception results from {perception_cache_dir}")
+
+    profile_cache_dir = cache.cache_dir.parent / PROFILE_CACHE_SUBDIR
+    if profile_cache_dir.exists():
+        shutil.rmtree(profile_cache_dir)
+        typer.echo(f"Removed cached data profiles from {profile_cache_dir}")
+
+
+@app.command("embedding-service")
+def embedding_service(
+    socket_path: Path = typer.Option(
+        ...,
+        "--socket",
+        help="Unix socket to listen on, set it as embedding_service.socket_path or MLZERO_EMBEDDING_SOCKET in runs",
+    ),
+    embedding_model_name: str = typer.Option("BAAI/bge-base-en-v1.5", "--model", help="Embedding model to serve"),
+    max_batch_size: int = typer.Option(64, "--max-batch-size", help="Maximum number of texts encoded in one batch"),
+    max_wait_ms: float = typer.Option(5.0, "--max-wait-ms", help="Time to wait for concurrent requests of a batch"),
+    chunk_size: int | None = typer.Option(
+        None, "--chunk-size", help="Also index tutorial sections of this size, for runs with chunk_retrieval enabled"
+    ),
+    embedding_backend: str = typer.Option(
+        "torch", "--backend", help="Embedding backend: torch, or onnx_int8 for an int8-quantized ONNX Runtime model"
+    ),
+    num_threads: int | None = typer.Option(None, "--num-threads", help="Threads of the embedding model per batch"),
+    ann_min_vectors: int = typer.Option(
+        10000, "--ann-min-vectors", help="Tutorials or sections of a tool from which an approximate index is built"
+    ),
+    ann_recall_target: float = typer.Option(
+        0.95, "--ann-recall-target", help="Recall@10 the approximate indices are tuned to"
+    ),
+    update_indices: bool = typer.Option(
+        False,
+        "--update-indices",
+        help="Re-check every tutorial, not only those of folders modified since the indices were saved",
+    ),
+):
+    """
+    Serve the embedding model and tutorial indices to concurrent runs, so that they are loaded only once.
+    """
+    import logging
+
+    from autogluon.assistant.tools_registry.embedding_service import serve_embedding_service
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    serve_embedding_service(
+        str(socket_path),
+        embedding_model_name=embedding_model_name,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        chunk_size=chunk_size,
+        embedding_backend=embedding_backend,
+        num_threads=num_threads,
+        ann_config={"min_vectors": ann_min_vectors, "recall_target": ann_recall_target},
+        update_indices=update_indices or None,
+    )
+
+
 if __name__ == "__main__":
     app()
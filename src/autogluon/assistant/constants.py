@@ -1,8 +1,11 @@
+import os
 from pathlib import Path
 
 ### PATHs
 
 PACKAGE_ROOT = Path(__file__).parent  # /src/autogluon/assistant
+# Cache shared across runs and processes (e.g. meta-prompted templates), can be moved with MLZERO_CACHE_DIR
+DEFAULT_CACHE_DIR = Path(os.environ.get("MLZERO_CACHE_DIR", Path.home() / ".cache" / "autogluon-assistant"))
 DEFAULT_CONFIG_PATH = PACKAGE_ROOT / "configs" / "default.yaml"
 LOGO_DAY_PATH = PACKAGE_ROOT / "webui" / "static" / "sidebar_logo_blue.png"
 LOGO_NIGHT_PATH = PACKAGE_ROOT / "webui" / "static" / "sidebar_icon.png"
@@ -56,3 +59,10 @@ PROVIDER_DEFAULTS = {
 ### MLZero
 
 ENV_FOLDER_NAME = "conda_env"
+
+### Prompt caching
+
+# Marks the end of a cacheable prompt prefix. Everything before the marker is expected to stay
+# stable across calls (instructions, task description, data prompt, ...) and is sent to providers
+# that support prompt caching as a cache checkpoint. The marker is stripped for other providers.
+PROMPT_CACHE_BREAKPOINT = "<|cache_breakpoint|>"
@@ -5,7 +5,7 @@ from typing import Any, Dict, List
 from anthropic import Anthropic
 from langchain_anthropic import ChatAnthropic
 
-from .base_chat import BaseAssistantChat
+from .base_chat import BaseAssistantChat, build_cache_control_blocks
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +21,9 @@ class AssistantChatAnthropic(ChatAnthropic, BaseAssistantChat):
         base_desc = super().describe()
         return {**base_desc, "model": self.model}
 
+    def _build_cached_content(self, segments: List[str]) -> List[Dict[str, Any]]:
+        return build_cache_control_blocks(segments)
+
 
 def get_anthropic_models() -> List[str]:
     """Get available Anthropic models."""
@@ -49,6 +52,7 @@ def create_anthropic_chat(config, session_name: str) -> AssistantChatAnthropic:
         "anthropic_api_key": os.environ["ANTHROPIC_API_KEY"],
         "session_name": session_name,
         "max_tokens": config.max_tokens,
+        "enable_prompt_caching": config.get("enable_prompt_caching", False),
     }
 
     if hasattr(config, "temperature"):
@@ -1,8 +1,10 @@
 import json
 import logging
 import os
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -11,8 +13,28 @@ from langgraph.graph import START, MessagesState, StateGraph
 from pydantic import BaseModel, ConfigDict, Field
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
+from .metrics import UsageStats, agent_name_from_session, estimate_cost, find_model_price, format_prometheus
+
 logger = logging.getLogger(__name__)
 
+# Anthropic (and Bedrock for Anthropic models) accept at most 4 cache checkpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+# Serializes appends of concurrent sessions to the same record file
+_record_file_lock = threading.Lock()
+
+
+def _retry_session_name(retry_state) -> str:
+    chat = retry_state.args[0] if retry_state.args else None
+    return getattr(chat, "session_name", "default_session")
+
+
+def _is_throttling_error(exception: BaseException) -> bool:
+    """Heuristically detect rate limiting errors across providers (HTTP 429, ThrottlingException, ...)."""
+    text = f"{type(exception).__name__} {exception}".lower()
+    return any(keyword in text for keyword in ("throttl", "rate limit", "ratelimit", "too many requests", "429"))
+
 
 def log_retry_attempt(retry_state):
     """Custom callback to log each retry attempt"""
@@ -20,93 +42,258 @@ def log_retry_attempt(retry_state):
         exception = retry_state.outcome.exception()
         attempt_number = retry_state.attempt_number
         logger.error(f"Attempt {attempt_number} failed: {type(exception).__name__}: {exception}")
+        GlobalTokenTracker().record_error(_retry_session_name(retry_state), exception)
+
+
+def record_retry_wait(retry_state):
+    """Custom callback to record the time waited before each retry"""
+    wait_seconds = retry_state.next_action.sleep if retry_state.next_action else 0.0
+    GlobalTokenTracker().record_retry(_retry_session_name(retry_state), wait_seconds)
+
+
+def build_cache_control_blocks(segments: List[str]) -> List[Dict[str, Any]]:
+    """
+    Build Anthropic-style text content blocks where every segment but the last one ends with
+    an ephemeral cache checkpoint. Only the last MAX_CACHE_BREAKPOINTS checkpoints are kept.
+    """
+    blocks = []
+    checkpoint_blocks = []
+    for i, segment in enumerate(segments):
+        if not segment.strip():
+            continue
+        block = {"type": "text", "text": segment}
+        blocks.append(block)
+        if i < len(segments) - 1:
+            checkpoint_blocks.append(block)
+    if not blocks:
+        return [{"type": "text", "text": "".join(segments)}]
+    for block in checkpoint_blocks[-MAX_CACHE_BREAKPOINTS:]:
+        block["cache_control"] = {"type": "ephemeral"}
+    return blocks
+
+
+def _drop_stale_cache_control(messages: List[Any]) -> List[Any]:
+    """Remove cache checkpoints from all messages except the latest one to stay within provider limits."""
+    cleaned = []
+    last_index = len(messages) - 1
+    for i, message in enumerate(messages):
+        content = getattr(message, "content", None)
+        has_cache_control = isinstance(content, list) and any(
+            isinstance(block, dict) and "cache_control" in block for block in content
+        )
+        if i != last_index and has_cache_control:
+            content = [
+                {k: v for k, v in block.items() if k != "cache_control"} if isinstance(block, dict) else block
+                for block in content
+            ]
+            message = message.model_copy(update={"content": content})
+        cleaned.append(message)
+    return cleaned
+
+
+def _content_to_text(content: Union[str, List[Any]]) -> str:
+    """Extract the text of a (streamed) message content, which may be a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    texts = []
+    for block in content:
+        if isinstance(block, str):
+            texts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            texts.append(block.get("text", ""))
+    return "".join(texts)
 
 
 class GlobalTokenTracker:
-    """Singleton class to track token usage across all conversations."""
+    """
+    Thread-safe singleton tracking token usage and request telemetry across all conversations.
+
+    Besides token counts per conversation and session, it records per-session and per-agent
+    request counts, latency histograms, errors, retries, time spent waiting between retries and
+    the estimated cost based on a configurable price table.
+    """
 
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(GlobalTokenTracker, cls).__new__(cls)
-            cls._instance.total_input_tokens = 0
-            cls._instance.total_output_tokens = 0
-            cls._instance.conversations = {}  # Track per-conversation usage
-            cls._instance.sessions = {}  # Track per-session usage
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(GlobalTokenTracker, cls).__new__(cls)
+                    instance._lock = threading.RLock()
+                    instance._reset()
+                    cls._instance = instance
         return cls._instance
 
+    def _reset(self):
+        self.total = UsageStats()
+        self.conversations = {}  # Track per-conversation usage
+        self.sessions = {}  # Track per-session usage
+        self.agents = {}  # Track per-agent usage, aggregated over sessions
+        self.price_table = {}
+        self.prometheus_path = None
+
+    def configure(
+        self,
+        price_table: Optional[Dict[str, Dict[str, float]]] = None,
+        prometheus_path: Optional[str] = None,
+    ):
+        """
+        Configure cost estimation and metrics export.
+
+        Args:
+            price_table: Maps a model id substring to its prices in USD per million tokens
+                ("input", "output", "cache_read", "cache_write")
+            prometheus_path: If set, metrics are also written in Prometheus text format to this path
+        """
+        with self._lock:
+            if price_table is not None:
+                self.price_table = {str(k): dict(v) for k, v in price_table.items()}
+            self.prometheus_path = prometheus_path
+
+    def _stats_for(self, session_name: str) -> List[UsageStats]:
+        if session_name not in self.sessions:
+            self.sessions[session_name] = UsageStats()
+        agent_name = agent_name_from_session(session_name)
+        if agent_name not in self.agents:
+            self.agents[agent_name] = UsageStats()
+        return [self.total, self.sessions[session_name], self.agents[agent_name]]
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.total.input_tokens
+
+    @property
+    def total_output_tokens(self) -> int:
+        return self.total.output_tokens
+
     def add_tokens(
         self,
         conversation_id: str,
         session_name: str,
         input_tokens: int,
         output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        model: Optional[str] = None,
+        latency: Optional[float] = None,
     ):
-        """Add token counts for a specific conversation and session."""
-        self.total_input_tokens += input_tokens
-        self.total_output_tokens += output_tokens
-
-        # Track conversation-level usage
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = {
-                "input_tokens": 0,
-                "output_tokens": 0,
-            }
-
-        self.conversations[conversation_id]["input_tokens"] += input_tokens
-        self.conversations[conversation_id]["output_tokens"] += output_tokens
-
-        # Track session-level usage
-        if session_name not in self.sessions:
-            self.sessions[session_name] = {"input_tokens": 0, "output_tokens": 0}
-
-        self.sessions[session_name]["input_tokens"] += input_tokens
-        self.sessions[session_name]["output_tokens"] += output_tokens
+        """Record a completed request with its token counts for a specific conversation and session.
+
+        Cache read/write tokens are a breakdown of the input tokens that were served from
+        or written to the provider-side prompt cache; they are tracked separately so the
+        effect of prompt caching can be measured.
+        """
+        with self._lock:
+            cost = estimate_cost(
+                find_model_price(model, self.price_table),
+                input_tokens,
+                output_tokens,
+                cache_read_tokens,
+                cache_write_tokens,
+            )
+
+            # Track conversation-level usage
+            if conversation_id not in self.conversations:
+                self.conversations[conversation_id] = {
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cache_read_tokens": 0,
+                    "cache_write_tokens": 0,
+                }
+
+            self.conversations[conversation_id]["input_tokens"] += input_tokens
+            self.conversations[conversation_id]["output_tokens"] += output_tokens
+            self.conversations[conversation_id]["cache_read_tokens"] += cache_read_tokens
+            self.conversations[conversation_id]["cache_write_tokens"] += cache_write_tokens
+
+            # Track total, session-level and agent-level usage
+            for stats in self._stats_for(session_name):
+                stats.requests += 1
+                stats.input_tokens += input_tokens
+                stats.output_tokens += output_tokens
+                stats.cache_read_tokens += cache_read_tokens
+                stats.cache_write_tokens += cache_write_tokens
+                stats.cost += cost
+                if latency is not None:
+                    stats.latency.observe(latency)
+
+    def record_error(self, session_name: str, exception: BaseException):
+        """Record a failed request attempt."""
+        throttled = _is_throttling_error(exception)
+        with self._lock:
+            for stats in self._stats_for(session_name):
+                stats.errors += 1
+                if throttled:
+                    stats.throttled += 1
+
+    def record_retry(self, session_name: str, wait_seconds: float):
+        """Record a retry and the time waited before it."""
+        with self._lock:
+            for stats in self._stats_for(session_name):
+                stats.retries += 1
+                stats.retry_wait_seconds += wait_seconds
 
     def get_conversation_usage(self, conversation_id: str) -> Dict[str, Any]:
         """Get token usage for a specific conversation."""
-        if conversation_id not in self.conversations:
-            return {
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "total_tokens": 0,
-            }
-
-        conv_usage = self.conversations[conversation_id]
+        with self._lock:
+            if conversation_id not in self.conversations:
+                return {
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cache_read_tokens": 0,
+                    "cache_write_tokens": 0,
+                    "total_tokens": 0,
+                }
+
+            conv_usage = dict(self.conversations[conversation_id])
         return {
             "input_tokens": conv_usage["input_tokens"],
             "output_tokens": conv_usage["output_tokens"],
+            "cache_read_tokens": conv_usage["cache_read_tokens"],
+            "cache_write_tokens": conv_usage["cache_write_tokens"],
             "total_conversation_tokens": conv_usage["input_tokens"] + conv_usage["output_tokens"],
         }
 
     def get_total_usage(self, save_path: Optional[str] = None) -> Dict[str, Any]:
-        """Get total token usage across all conversations and sessions."""
-        usage_data = {
-            "total": {
-                "total_input_tokens": self.total_input_tokens,
-                "total_output_tokens": self.total_output_tokens,
-                "total_tokens": self.total_input_tokens + self.total_output_tokens,
-            },
-            "conversations": {},
-            "sessions": {},
-        }
-
-        # Add conversation-level usage
-        for conv_id, conv_usage in self.conversations.items():
-            usage_data["conversations"][conv_id] = {
-                "input_tokens": conv_usage["input_tokens"],
-                "output_tokens": conv_usage["output_tokens"],
-                "total_tokens": conv_usage["input_tokens"] + conv_usage["output_tokens"],
+        """Get total token usage and telemetry across all conversations, sessions and agents."""
+        with self._lock:
+            total = self.total.to_dict()
+            usage_data = {
+                "total": {
+                    "total_input_tokens": self.total.input_tokens,
+                    "total_output_tokens": self.total.output_tokens,
+                    "total_cache_read_tokens": self.total.cache_read_tokens,
+                    "total_cache_write_tokens": self.total.cache_write_tokens,
+                    "total_tokens": self.total.input_tokens + self.total.output_tokens,
+                    "total_requests": total["requests"],
+                    "total_errors": total["errors"],
+                    "total_retries": total["retries"],
+                    "total_throttled": total["throttled"],
+                    "total_retry_wait_seconds": total["retry_wait_seconds"],
+                    "total_estimated_cost_usd": total["estimated_cost_usd"],
+                    "latency_seconds": total["latency_seconds"],
+                },
+                "conversations": {},
+                "sessions": {name: stats.to_dict() for name, stats in self.sessions.items()},
+                "agents": {name: stats.to_dict() for name, stats in self.agents.items()},
             }
 
-        # Add session-level usage
-        for session_name, session_usage in self.sessions.items():
-            usage_data["sessions"][session_name] = {
-                "input_tokens": session_usage["input_tokens"],
-                "output_tokens": session_usage["output_tokens"],
-                "total_tokens": session_usage["input_tokens"] + session_usage["output_tokens"],
-            }
+            # Add conversation-level usage
+            for conv_id, conv_usage in self.conversations.items():
+                usage_data["conversations"][conv_id] = {
+                    "input_tokens": conv_usage["input_tokens"],
+                    "output_tokens": conv_usage["output_tokens"],
+                    "cache_read_tokens": conv_usage["cache_read_tokens"],
+                    "cache_write_tokens": conv_usage["cache_write_tokens"],
+                    "total_tokens": conv_usage["input_tokens"] + conv_usage["output_tokens"],
+                }
+
+            prometheus_text = None
+            if self.prometheus_path:
+                prometheus_text = format_prometheus({"agent": self.agents, "session": self.sessions})
+            prometheus_path = self.prometheus_path
 
         # Save to file if path is provided
         if save_path:
@@ -114,6 +301,14 @@ class GlobalTokenTracker:
             with open(save_path, "w") as f:
                 json.dump(usage_data, f, indent=2)
 
+        if prometheus_text is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(prometheus_path)), exist_ok=True)
+            # Write to a temporary file first so that scrapers never see a partial file
+            tmp_path = f"{prometheus_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(prometheus_text)
+            os.replace(tmp_path, prometheus_path)
+
         return usage_data
 
 
@@ -128,10 +323,14 @@ class BaseAssistantChat(BaseModel):
     graph: Optional[Any] = Field(default=None, exclude=True)
     app: Optional[Any] = Field(default=None, exclude=True)
     memory: Optional[Any] = Field(default=None, exclude=True)
+    prompt_template: Optional[Any] = Field(default=None, exclude=True)
     token_tracker: GlobalTokenTracker = Field(default_factory=GlobalTokenTracker)
     conversation_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     session_name: str = Field(default="default_session")
     thread_id: str = Field(default_factory=lambda: str(uuid.uuid4()))  # Reuse same thread_id per session
+    enable_prompt_caching: bool = Field(default=False)
+    # JSONL file to record exchanges to, replayable by the mock provider
+    record_file: Optional[str] = Field(default=None)
 
     def initialize_conversation(
         self,
@@ -149,6 +348,8 @@ class BaseAssistantChat(BaseModel):
         graph = StateGraph(state_schema=MessagesState)
 
         def call_model(state: MessagesState):
+            # Only the latest message may carry cache checkpoints, older turns are already part of the prefix
+            state = {**state, "messages": _drop_stale_cache_control(state["messages"])}
             prompt_messages = prompt_template.invoke(state)
             response = llm.invoke(prompt_messages)
             return {"messages": [response]}
@@ -162,6 +363,7 @@ class BaseAssistantChat(BaseModel):
         self.graph = graph
         self.app = app
         self.memory = memory
+        self.prompt_template = prompt_template
 
     def describe(self) -> Dict[str, Any]:
         """Get model description and conversation history."""
@@ -175,7 +377,109 @@ class BaseAssistantChat(BaseModel):
             "session_name": self.session_name,
         }
 
-    @retry(stop=stop_after_attempt(6), wait=wait_exponential(multiplier=32, min=32, max=128), after=log_retry_attempt)
+    def _build_message_content(self, message: str) -> Union[str, List[Dict[str, Any]]]:
+        """
+        Convert a rendered prompt into message content.
+
+        Prompts may contain PROMPT_CACHE_BREAKPOINT markers separating a stable prefix from the
+        dynamic rest of the prompt. If prompt caching is enabled the segments are handed to
+        _build_cached_content, otherwise the markers are simply removed.
+        """
+        segments = message.split(PROMPT_CACHE_BREAKPOINT)
+        if len(segments) == 1:
+            return message
+        if not self.enable_prompt_caching:
+            return "".join(segments)
+        return self._build_cached_content(segments)
+
+    def _build_cached_content(self, segments: List[str]) -> Union[str, List[Dict[str, Any]]]:
+        """Build message content with cache checkpoints. Providers supporting prompt caching override this."""
+        return "".join(segments)
+
+    def _model_id(self) -> Optional[str]:
+        """Model identifier used to look up prices, the attribute name differs between providers."""
+        for attr in ("model_id", "model_name", "model", "deployment_name", "endpoint_name"):
+            value = getattr(self, attr, None)
+            if isinstance(value, str) and value:
+                return value
+        return None
+
+    def _estimate_token_count(self, text: str) -> int:
+        """Estimate the number of tokens of a text, for usage the provider did not report."""
+        from ..prompts.token_counter import get_token_counter
+
+        return get_token_counter(self._model_id()).count(text)
+
+    def _record_usage(
+        self,
+        message: str,
+        output: str,
+        usage: Optional[Dict[str, Any]],
+        latency: Optional[float] = None,
+        estimated: bool = False,
+    ) -> None:
+        """
+        Update instance and global token tracking and append the exchange to the history.
+
+        estimated marks token counts that were estimated with a tokenizer rather than reported by the provider.
+        """
+        input_tokens = output_tokens = cache_read_tokens = cache_write_tokens = 0
+
+        if usage:
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            input_token_details = usage.get("input_token_details") or {}
+            cache_read_tokens = input_token_details.get("cache_read", 0) or 0
+            cache_write_tokens = input_token_details.get("cache_creation", 0) or 0
+
+        # Update both instance and global tracking
+        self.input_tokens_ += input_tokens
+        self.output_tokens_ += output_tokens
+        self.token_tracker.add_tokens(
+            self.conversation_id,
+            self.session_name,
+            input_tokens,
+            output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            model=self._model_id(),
+            latency=latency,
+        )
+
+        if self.record_file:
+            self._record_exchange(message, output)
+
+        self.history_.append(
+            {
+                "input": message.replace(PROMPT_CACHE_BREAKPOINT, ""),
+                "output": output,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cache_read_tokens": cache_read_tokens,
+                "cache_write_tokens": cache_write_tokens,
+                "estimated_tokens": estimated,
+            }
+        )
+
+    def _record_exchange(self, message: str, output: str) -> None:
+        """Append the exchange to the record file so that the session can be replayed offline."""
+        record = {
+            "session_name": self.session_name,
+            "agent": agent_name_from_session(self.session_name),
+            "input": message.replace(PROMPT_CACHE_BREAKPOINT, ""),
+            "output": output,
+        }
+        with _record_file_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.record_file)), exist_ok=True)
+            with open(self.record_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    @retry(
+        stop=stop_after_attempt(6),
+        wait=wait_exponential(multiplier=32, min=32, max=128),
+        after=log_retry_attempt,
+        before_sleep=record_retry_wait,
+    )
     def assistant_chat(self, message: str) -> str:
         """Send a message and get response using LangGraph."""
         if not self.app:
@@ -183,32 +487,87 @@ class BaseAssistantChat(BaseModel):
 
         # Reuse the same thread_id for multi-turn conversations
         config = {"configurable": {"thread_id": self.thread_id}}
-        input_messages = [HumanMessage(content=message)]
+        input_messages = [HumanMessage(content=self._build_message_content(message))]
+        start_time = time.perf_counter()
         response = self.app.invoke({"messages": input_messages}, config)
+        latency = time.perf_counter() - start_time
 
         ai_message = response["messages"][-1]
-        input_tokens = output_tokens = 0
+        self._record_usage(message, ai_message.content, getattr(ai_message, "usage_metadata", None), latency)
 
-        if hasattr(ai_message, "usage_metadata"):
-            usage = ai_message.usage_metadata
-            input_tokens = usage.get("input_tokens", 0)
-            output_tokens = usage.get("output_tokens", 0)
+        return ai_message.content
 
-            # Update both instance and global tracking
-            self.input_tokens_ += input_tokens
-            self.output_tokens_ += output_tokens
-            self.token_tracker.add_tokens(self.conversation_id, self.session_name, input_tokens, output_tokens)
+    @retry(
+        stop=stop_after_attempt(6),
+        wait=wait_exponential(multiplier=32, min=32, max=128),
+        after=log_retry_attempt,
+        before_sleep=record_retry_wait,
+    )
+    def assistant_chat_streaming(self, message: str, stop_condition: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Send a message and stream the response, stopping as soon as stop_condition is satisfied.
+
+        The model is streamed directly instead of through the LangGraph app so that breaking out of
+        the stream closes the underlying provider stream and no further output tokens are generated.
+        The exchange is written back to the conversation memory afterwards, so multi-turn
+        conversations behave the same as with assistant_chat.
+
+        Args:
+            message: The prompt to send
+            stop_condition: Called with the partial response after every chunk; streaming stops once it returns True
+
+        Returns:
+            str: The (possibly truncated) response text
+        """
+        if not self.app:
+            raise RuntimeError("Conversation not initialized. Call initialize_conversation first.")
 
-        self.history_.append(
-            {
-                "input": message,
-                "output": ai_message.content,
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-            }
+        config = {"configurable": {"thread_id": self.thread_id}}
+        human_message = HumanMessage(content=self._build_message_content(message))
+        history = self.app.get_state(config).values.get("messages", [])
+        prompt_messages = self.prompt_template.invoke(
+            {"messages": _drop_stale_cache_control(list(history) + [human_message])}
         )
 
-        return ai_message.content
+        response_chunk = None
+        text = ""
+        stopped_early = False
+        start_time = time.perf_counter()
+        stream = self.stream(prompt_messages)
+        try:
+            for chunk in stream:
+                if isinstance(chunk, str):
+                    # Plain LLMs (e.g. SageMaker endpoints) stream text only
+                    text += chunk
+                else:
+                    response_chunk = chunk if response_chunk is None else response_chunk + chunk
+                    text += _content_to_text(chunk.content)
+                if stop_condition is not None and stop_condition(text):
+                    stopped_early = True
+                    break
+        finally:
+            stream.close()
+        latency = time.perf_counter() - start_time
+
+        usage = getattr(response_chunk, "usage_metadata", None) or {}
+        estimated = False
+        if stopped_early:
+            logger.info(f"Stopped streaming early for session {self.session_name} after {len(text)} characters.")
+            # Providers that report usage in the final event (OpenAI, Azure, Bedrock) never send it when the
+            # stream is cancelled, so the missing counts are estimated from the prompt and the partial response
+            if not usage.get("input_tokens") or not usage.get("output_tokens"):
+                prompt_text = "\n".join(_content_to_text(m.content) for m in prompt_messages.to_messages())
+                usage = {
+                    **usage,
+                    "input_tokens": usage.get("input_tokens") or self._estimate_token_count(prompt_text),
+                    "output_tokens": usage.get("output_tokens") or self._estimate_token_count(text),
+                }
+                estimated = True
+
+        self.app.update_state(config, {"messages": [human_message, AIMessage(content=text)]}, as_node="model")
+        self._record_usage(message, text, usage, latency, estimated=estimated)
+
+        return text
 
     async def astream(self, message: str):
         """Stream responses using LangGraph."""
@@ -217,8 +576,8 @@ class BaseAssistantChat(BaseModel):
 
         thread_id = str(uuid.uuid4())
         config = {"configurable": {"thread_id": thread_id}}
-        input_messages = [HumanMessage(content=message)]
+        input_messages = [HumanMessage(content=self._build_message_content(message))]
 
-        async for chunk, metadata in self.app.stream({"messages": input_messages}, config, stream_mode="messages"):
+        async for chunk, metadata in self.app.astream({"messages": input_messages}, config, stream_mode="messages"):
             if isinstance(chunk, AIMessage):
                 yield chunk.content
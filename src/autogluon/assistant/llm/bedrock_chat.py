@@ -1,12 +1,12 @@
 import logging
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 import boto3
 from botocore.config import Config
 from langchain_aws import ChatBedrock
 
-from .base_chat import BaseAssistantChat
+from .base_chat import BaseAssistantChat, build_cache_control_blocks
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,12 @@ class AssistantChatBedrock(ChatBedrock, BaseAssistantChat):
         base_desc = super().describe()
         return {**base_desc, "model": self.model_id}
 
+    def _build_cached_content(self, segments: List[str]) -> Union[str, List[Dict[str, Any]]]:
+        # Prompt caching on Bedrock is only available through the Anthropic message format
+        if "anthropic" not in self.model_id:
+            return "".join(segments)
+        return build_cache_control_blocks(segments)
+
 
 def get_bedrock_models() -> List[str]:
     if "AWS_DEFAULT_REGION" not in os.environ:
@@ -58,4 +64,5 @@ def create_bedrock_chat(config, session_name: str) -> AssistantChatBedrock:
         verbose=config.verbose,
         session_name=session_name,
         config=boto_config,
+        enable_prompt_caching=config.get("enable_prompt_caching", False),
     )
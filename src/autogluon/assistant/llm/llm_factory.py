@@ -8,6 +8,7 @@ from .anthropic_chat import AssistantChatAnthropic, create_anthropic_chat, get_a
 from .azure_openai_chat import AssistantAzureChatOpenAI, create_azure_openai_chat, get_azure_models
 from .base_chat import GlobalTokenTracker
 from .bedrock_chat import AssistantChatBedrock, create_bedrock_chat, get_bedrock_models
+from .mock_chat import AssistantChatMock, create_mock_chat, get_mock_models
 from .openai_chat import AssistantChatOpenAI, create_openai_chat, get_openai_models
 from .sagemaker_chat import SagemakerEndpointChat, create_sagemaker_chat, get_sagemaker_endpoints
 
@@ -22,6 +23,13 @@ class ChatLLMFactory:
         """Get total token usage across all conversations and sessions."""
         return GlobalTokenTracker().get_total_usage(save_path)
 
+    @staticmethod
+    def configure_telemetry(
+        price_table: Optional[Dict[str, Dict[str, float]]] = None, prometheus_path: Optional[str] = None
+    ) -> None:
+        """Configure cost estimation and the optional Prometheus export of the LLM telemetry."""
+        GlobalTokenTracker().configure(price_table=price_table, prometheus_path=prometheus_path)
+
     @classmethod
     def get_valid_models(cls, provider):
         if provider == "azure":
@@ -34,12 +42,14 @@ class ChatLLMFactory:
             return get_anthropic_models()
         elif provider == "sagemaker":
             return get_sagemaker_endpoints()
+        elif provider == "mock":
+            return get_mock_models()
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
     @classmethod
     def get_valid_providers(cls):
-        return ["azure", "openai", "bedrock", "anthropic", "sagemaker"]
+        return ["azure", "openai", "bedrock", "anthropic", "sagemaker", "mock"]
 
     @classmethod
     def get_chat_model(cls, config: DictConfig, session_name: str) -> Union[
@@ -48,6 +58,7 @@ class ChatLLMFactory:
         AssistantChatBedrock,
         AssistantChatAnthropic,
         SagemakerEndpointChat,
+        AssistantChatMock,
     ]:
         """Get a configured chat model instance using LangGraph patterns."""
         provider = config.provider
@@ -57,7 +68,7 @@ class ChatLLMFactory:
         if provider not in valid_providers:
             raise ValueError(f"Invalid provider: {provider}. Must be one of {valid_providers}")
 
-        if provider != "sagemaker":
+        if provider not in ["sagemaker", "mock"]:
             valid_models = cls.get_valid_models(provider)
             if model not in valid_models:
                 if model[3:] not in valid_models:  # TODO: better logic for cross region inference
@@ -66,14 +77,23 @@ class ChatLLMFactory:
                     )
 
         if provider == "openai":
-            return create_openai_chat(config, session_name)
+            chat_model = create_openai_chat(config, session_name)
         elif provider == "azure":
-            return create_azure_openai_chat(config, session_name)
+            chat_model = create_azure_openai_chat(config, session_name)
         elif provider == "anthropic":
-            return create_anthropic_chat(config, session_name)
+            chat_model = create_anthropic_chat(config, session_name)
         elif provider == "bedrock":
-            return create_bedrock_chat(config, session_name)
+            chat_model = create_bedrock_chat(config, session_name)
         elif provider == "sagemaker":
-            return create_sagemaker_chat(config, session_name)
+            chat_model = create_sagemaker_chat(config, session_name)
+        elif provider == "mock":
+            chat_model = create_mock_chat(config, session_name)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+
+        # Record all exchanges to a JSONL file, e.g. to replay the session with the mock provider
+        record_file = config.get("record_file", None)
+        if record_file:
+            chat_model.record_file = record_file
+
+        return chat_model
@@ -0,0 +1,219 @@
+"""
+Building blocks for LLM telemetry.
+
+This module provides the latency histogram, per-session/per-agent usage statistics, cost
+estimation from a configurable price table and the Prometheus text exposition used by
+GlobalTokenTracker.
+"""
+
+import bisect
+import math
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Upper bounds (in seconds) of the latency histogram buckets, LLM calls range from sub-second to minutes
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, math.inf)
+
+# Number of latencies kept for the percentiles, which are exact up to this many observations
+MAX_LATENCY_SAMPLES = 10000
+
+# Session names created by agents.utils.init_llm: {multi_turn|single_turn}_{agent_name}_{%Y%m%d%H%M%S}
+_SESSION_NAME_PATTERN = re.compile(r"^(?:multi|single)_turn_(?P<agent>.+)_\d{14}$")
+
+PRICE_FIELDS = ("input", "output", "cache_read", "cache_write")
+
+
+def agent_name_from_session(session_name: str) -> str:
+    """Extract the agent name from a session name, falling back to the session name itself."""
+    match = _SESSION_NAME_PATTERN.match(session_name)
+    return match.group("agent") if match else session_name
+
+
+def find_model_price(model: Optional[str], price_table: Optional[Dict[str, Dict[str, float]]]) -> Optional[Dict]:
+    """
+    Look up the price entry of a model.
+
+    Keys of the price table are matched as substrings of the model id, so a single entry
+    (e.g. "claude-sonnet-4") covers the Anthropic, Bedrock and regional variants of a model.
+    The longest matching key wins.
+    """
+    if not model or not price_table:
+        return None
+    matches = [key for key in price_table if key in model]
+    if not matches:
+        return None
+    return price_table[max(matches, key=len)]
+
+
+def estimate_cost(
+    price: Optional[Dict[str, float]],
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """
+    Estimate the cost in USD of a request.
+
+    Prices are given in USD per million tokens. Input tokens include the cache read/write tokens,
+    which are billed at their own rates (defaulting to the input price).
+
+    Args:
+        price: Price entry with "input", "output" and optionally "cache_read"/"cache_write" keys
+        input_tokens: Total number of input tokens
+        output_tokens: Number of output tokens
+        cache_read_tokens: Number of input tokens served from the prompt cache
+        cache_write_tokens: Number of input tokens written to the prompt cache
+
+    Returns:
+        float: Estimated cost in USD, 0 if no price is known
+    """
+    if not price:
+        return 0.0
+    input_price = price.get("input", 0.0)
+    uncached_input_tokens = max(input_tokens - cache_read_tokens - cache_write_tokens, 0)
+    cost = (
+        uncached_input_tokens * input_price
+        + cache_read_tokens * price.get("cache_read", input_price)
+        + cache_write_tokens * price.get("cache_write", input_price)
+        + output_tokens * price.get("output", 0.0)
+    )
+    return cost / 1_000_000
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with a bounded reservoir sample for the percentiles.
+
+    Bucket counts, sum, count and max cover every observation. Percentiles are exact up to
+    max_samples observations and estimated from a uniform sample of them afterwards.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_samples: int = MAX_LATENCY_SAMPLES):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+        self.count = 0
+        self.sum = 0.0
+        self.max: Optional[float] = None
+        # Seeded so that reports of the same run are reproducible
+        self._rng = random.Random(0)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(value)
+        else:
+            # Reservoir sampling (algorithm R)
+            index = self._rng.randrange(self.count)
+            if index < self.max_samples:
+                self.samples[index] = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the sampled latencies, q in [0, 100]."""
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        rank = max(math.ceil(q / 100 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+def summarize_latencies(values: Iterable[float], digits: int = 4) -> Dict[str, Optional[float]]:
+    """
+    Count, total, mean, percentiles and max of latencies, rounded, from a LatencyHistogram.
+
+    Used by all latency reports (LLM calls, prompt rendering, retrieval) so that their percentiles
+    are computed the same way.
+    """
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.observe(value)
+    summary = {"count": histogram.count, "total": histogram.sum, **histogram.summary()}
+    return {key: value if key == "count" or value is None else round(value, digits) for key, value in summary.items()}
+
+
+class UsageStats:
+    """Request, token, latency, retry and cost statistics of one session, agent or the whole run."""
+
+    COUNTERS = (
+        "requests",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_tokens",
+        "cache_write_tokens",
+        "errors",
+        "retries",
+        "throttled",
+    )
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.retry_wait_seconds = 0.0
+        self.cost = 0.0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data["total_tokens"] = self.input_tokens + self.output_tokens
+        data["retry_wait_seconds"] = round(self.retry_wait_seconds, 3)
+        data["estimated_cost_usd"] = round(self.cost, 6)
+        data["latency_seconds"] = self.latency.summary()
+        return data
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(stats_by_label: Dict[str, Dict[str, UsageStats]], prefix: str = "mlzero_llm") -> str:
+    """
+    Render usage statistics in the Prometheus text exposition format.
+
+    Args:
+        stats_by_label: Maps a label name (e.g. "agent", "session") to the statistics per label value
+        prefix: Prefix of all metric names
+
+    Returns:
+        str: Prometheus text format, suitable for the node exporter textfile collector
+    """
+    lines = []
+    counters = {name: f"{prefix}_{name}_total" for name in UsageStats.COUNTERS}
+    counters["cost"] = f"{prefix}_estimated_cost_usd_total"
+    counters["retry_wait_seconds"] = f"{prefix}_retry_wait_seconds_total"
+
+    for attr, metric in counters.items():
+        lines.append(f"# TYPE {metric} counter")
+        for label, stats in stats_by_label.items():
+            for value, usage in stats.items():
+                lines.append(f'{metric}{{{label}="{_escape_label(value)}"}} {getattr(usage, attr)}')
+
+    metric = f"{prefix}_request_latency_seconds"
+    lines.append(f"# TYPE {metric} histogram")
+    for label, stats in stats_by_label.items():
+        for value, usage in stats.items():
+            escaped = _escape_label(value)
+            cumulative = 0
+            for bound, bucket_count in zip(usage.latency.buckets, usage.latency.bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if math.isinf(bound) else f"{bound}"
+                lines.append(f'{metric}_bucket{{{label}="{escaped}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{label}="{escaped}"}} {usage.latency.sum}')
+            lines.append(f'{metric}_count{{{label}="{escaped}"}} {usage.latency.count}')
+
+    return "\n".join(lines) + "\n"
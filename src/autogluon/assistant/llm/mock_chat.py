@@ -0,0 +1,288 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from omegaconf import OmegaConf
+from pydantic import Field, PrivateAttr
+
+from .base_chat import BaseAssistantChat, _content_to_text
+from .metrics import agent_name_from_session
+
+logger = logging.getLogger(__name__)
+
+MOCK_MODES = ["scripted", "replay", "synthetic"]
+
+# Single-turn agents create a new chat model per call, so the position in the scripted/recorded
+# responses is shared across instances (per mode, source and agent)
+_response_cursors = defaultdict(int)
+_response_cursors_lock = threading.Lock()
+
+
+class MockLLMError(RuntimeError):
+    """Simulated provider failure raised by the mock chat model."""
+
+
+class AssistantChatMock(BaseChatModel, BaseAssistantChat):
+    """
+    Offline chat model with LangGraph support, for load tests and benchmarks without network access.
+
+    Modes:
+        - scripted: return the configured responses in order (cycling), either a single list or
+          a mapping from agent name (e.g. "python_coder", "executer") to a list
+        - replay: return the outputs recorded in a JSONL file (see the record_file llm option) per agent
+        - synthetic: synthesize a valid response for the detected prompt type (code, decisions, rankings, ...)
+
+    Latency, jitter and failure rate can be configured to emulate provider behaviour.
+    """
+
+    model: str = Field(default="mock")
+    mode: str = Field(default="synthetic")
+    responses: Union[List[str], Dict[str, List[str]]] = Field(default_factory=list)
+    replay_file: Optional[str] = Field(default=None)
+    latency: float = Field(default=0.0)
+    latency_jitter: float = Field(default=0.0)
+    failure_rate: float = Field(default=0.0)
+    stream_chunk_size: int = Field(default=64)
+    seed: Optional[int] = Field(default=None)
+
+    _rng: Any = PrivateAttr(default=None)
+    _rng_lock: Any = PrivateAttr(default=None)
+    _replay_outputs: Optional[Dict[str, List[str]]] = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.mode not in MOCK_MODES:
+            raise ValueError(f"Invalid mock mode: {self.mode}. Must be one of {MOCK_MODES}")
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+        if self.mode == "replay":
+            if not self.replay_file:
+                raise ValueError("replay_file is required for the mock provider in replay mode")
+            self._replay_outputs = load_replay_file(self.replay_file)
+        self.initialize_conversation(self)
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    def describe(self) -> Dict[str, Any]:
+        base_desc = super().describe()
+        return {**base_desc, "model": self.model, "mode": self.mode}
+
+    @property
+    def agent_name(self) -> str:
+        return agent_name_from_session(self.session_name)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = _content_to_text(messages[-1].content) if messages else ""
+        self._maybe_fail()
+        self._sleep(self._sample_latency())
+        response = self._respond(prompt)
+        message = AIMessage(content=response, usage_metadata=_estimate_usage(messages, response))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        prompt = _content_to_text(messages[-1].content) if messages else ""
+        self._maybe_fail()
+        response = self._respond(prompt)
+
+        # Spread the sampled latency evenly over the streamed chunks
+        chunk_size = max(self.stream_chunk_size, 1)
+        pieces = [response[i : i + chunk_size] for i in range(0, len(response), chunk_size)] or [""]
+        delay = self._sample_latency() / len(pieces)
+        for piece in pieces:
+            self._sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+        # Usage is reported with the final chunk, like the real providers do
+        usage = _estimate_usage(messages, response)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    def _estimate_token_count(self, text: str) -> int:
+        """Same 4 characters per token estimate as the reported usage, the mock provider never loads a tokenizer."""
+        return len(text) // 4
+
+    def _sample_latency(self) -> float:
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter) if self.latency_jitter else 0.0
+        return max(self.latency + jitter, 0.0)
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate <= 0:
+            return
+        with self._rng_lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            raise MockLLMError(f"Simulated failure of the mock LLM for session {self.session_name}")
+
+    def _next_from(self, outputs: List[str]) -> str:
+        key = (self.mode, self.replay_file, self.agent_name)
+        with _response_cursors_lock:
+            index = _response_cursors[key]
+            _response_cursors[key] += 1
+        return outputs[index % len(outputs)]
+
+    def _respond(self, prompt: str) -> str:
+        if self.mode == "scripted":
+            if isinstance(self.responses, dict):
+                outputs = self.responses.get(self.agent_name) or self.responses.get("default")
+            else:
+                outputs = self.responses
+            if outputs:
+                return self._next_from(list(outputs))
+            logger.warning(f"No scripted responses for agent {self.agent_name}, synthesizing one instead.")
+        elif self.mode == "replay":
+            outputs = self._replay_outputs.get(self.agent_name)
+            if outputs:
+                return self._next_from(outputs)
+            logger.warning(f"No recorded responses for agent {self.agent_name}, synthesizing one instead.")
+
+        return self._synthesize(prompt)
+
+    def _synthesize(self, prompt: str) -> str:
+        """Synthesize a response that the parser of the detected prompt type accepts."""
+        if "### Original Template:" in prompt:
+            # Meta-prompting: keep the original template unchanged
+            match = re.search(r"### Original Template:\n(.*?)\n### Meta Instructions:", prompt, re.DOTALL)
+            return match.group(1).strip() if match else ""
+
+        if "DECISION: [SUCCESS or FIX]" in prompt:
+            with self._rng_lock:
+                score = round(self._rng.uniform(0.5, 0.95), 4)
+            return f"DECISION: SUCCESS\nERROR_SUMMARY: None\nVALIDATION_SCORE: {score}\n"
+
+        if "SUGGESTED_FIX:" in prompt:
+            return (
+                "ERROR_SUMMARY: The mock execution failed because of a synthetic error.\n"
+                "SUGGESTED_FIX: Re-run the script after checking the input paths.\n"
+            )
+
+        if "RANKED_LIBRARIES:" in prompt:
+            libraries = re.findall(r"^Library Name: (.+)$", prompt, re.MULTILINE)
+            ranking = "\n".join(f"{i}. {name.strip()}" for i, name in enumerate(libraries, 1))
+            return f"EXPLANATION: Libraries are ranked in the order they are listed.\n\nRANKED_LIBRARIES:\n{ranking}\n"
+
+        if "most relevant tutorials" in prompt:
+            max_num_tutorials = re.search(r"select the (\d+) most relevant tutorials", prompt)
+            num = int(max_num_tutorials.group(1)) if max_num_tutorials else 1
+            return ",".join(str(i) for i in range(1, num + 1)) + "\n"
+
+        if "search query" in prompt:
+            return "machine learning training and prediction tutorial\n"
+
+        if "Description Files:" in prompt:
+            paths = re.findall(r"(/[^\s'\"\],]+)", prompt)
+            description_files = sorted(
+                {p for p in paths if re.search(r"(readme|descr|task|instruction)[^/]*$", p, re.IGNORECASE)}
+            )
+            return "Description Files:\n" + "\n".join(description_files) + "\n"
+
+        if "Generate a minimal bash script" in prompt:
+            python_file = re.search(r"Execute the Python script: (\S+)", prompt)
+            command = f"python {python_file.group(1)}" if python_file else "echo 'No python script given'"
+            return f"```bash\n#!/bin/bash\nset -e\n{command}\n```\n"
+
+        if "Generate Python code to read and analyze the file" in prompt:
+            file_path = re.search(r'analyze the file: "(.+?)"', prompt)
+            file_path = file_path.group(1) if file_path else ""
+            return f"""```python
+with open({file_path!r}, "rb") as f:
+    print(f.read(512).decode("utf-8", errors="replace"))
+```
+"""
+
+        if "description of the data science task" in prompt:
+            return "Mock task: train a model on the provided training data and predict the test data."
+
+        if "python" in prompt.lower() and "code" in prompt.lower():
+            with self._rng_lock:
+                score = round(self._rng.uniform(0.5, 0.95), 4)
+            return f'''```python
+"""Synthetic training script produced by the mock LLM provider."""
+
+if __name__ == "__main__":
+    print("Mock training finished")
+    print("Validation score: {score}")
+```
+'''
+
+        return "This is a synthetic response of the mock LLM provider."
+
+
+@lru_cache(maxsize=None)
+def load_replay_file(replay_file: str) -> Dict[str, List[str]]:
+    """Load recorded outputs from a JSONL file, grouped by agent in the recorded order."""
+    outputs = defaultdict(list)
+    with open(replay_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            agent = record.get("agent") or agent_name_from_session(record.get("session_name", ""))
+            outputs[agent].append(record["output"])
+    logger.info(f"Loaded {sum(len(v) for v in outputs.values())} recorded responses from {replay_file}")
+    return dict(outputs)
+
+
+def _estimate_usage(messages: List[BaseMessage], response: str) -> Dict[str, int]:
+    """Rough token usage (4 characters per token) so that telemetry and budgets behave realistically."""
+    input_tokens = sum(len(_content_to_text(m.content)) for m in messages) // 4
+    output_tokens = len(response) // 4
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+def get_mock_models() -> List[str]:
+    return ["mock"]
+
+
+def create_mock_chat(config, session_name: str) -> AssistantChatMock:
+    """Create a mock chat model instance."""
+    mode = config.get("mode", "synthetic")
+    logger.info(f"Using mock LLM in {mode} mode for session: {session_name}")
+
+    responses = config.get("responses", None)
+    if OmegaConf.is_config(responses):
+        responses = OmegaConf.to_container(responses, resolve=True)
+
+    return AssistantChatMock(
+        model=config.get("model", "mock"),
+        mode=mode,
+        responses=responses or [],
+        replay_file=config.get("replay_file", None),
+        latency=config.get("latency", 0.0),
+        latency_jitter=config.get("latency_jitter", 0.0),
+        failure_rate=config.get("failure_rate", 0.0),
+        stream_chunk_size=config.get("stream_chunk_size", 64),
+        seed=config.get("seed", None),
+        session_name=session_name,
+    )
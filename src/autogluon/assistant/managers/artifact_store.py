@@ -0,0 +1,202 @@
+"""
+Consolidated storage of the per-node artifacts (prompts, responses, stdout/stderr, ...).
+
+Instead of one small file per artifact, each states directory holds an append-only log of
+zlib-compressed blobs (artifacts.log) and a JSONL index (artifacts.jsonl) mapping artifact
+names to blobs. Identical contents are stored once per log. Writes are queued and performed
+in batches by a background thread, so the search loop never blocks on the filesystem.
+ArtifactReader gives read access to the stored artifacts, e.g. for the WebUI.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_LOG_NAME = "artifacts.log"
+ARTIFACT_INDEX_NAME = "artifacts.jsonl"
+
+
+class ArtifactStore:
+    """Asynchronous writer of per-directory artifact logs."""
+
+    def __init__(self, compression_level: int = 6):
+        """
+        Initialize the store and start the background writer.
+
+        Args:
+            compression_level: zlib compression level of the stored blobs
+        """
+        self.compression_level = compression_level
+        self._queue: "queue.Queue[Optional[Tuple[str, str, str, float]]]" = queue.Queue()
+        # Per states directory: content hash -> (offset, length) of the stored blob
+        self._blobs: Dict[str, Dict[str, Tuple[int, int]]] = defaultdict(dict)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="artifact-store-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, states_dir: str, name: str, content: str) -> None:
+        """
+        Queue an artifact for writing.
+
+        Args:
+            states_dir: Directory holding the artifact log
+            name: Artifact name (the file name it would have been saved as)
+            content: Artifact content
+        """
+        if self._closed:
+            raise RuntimeError("ArtifactStore is closed")
+        self._queue.put((states_dir, name, content, time.time()))
+
+    def flush(self) -> None:
+        """Block until all queued artifacts are written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued artifacts and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # Drain whatever else is queued to write it in one pass per directory
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_dir = defaultdict(list)
+            for item in batch:
+                if item is None:
+                    stop = True
+                else:
+                    by_dir[item[0]].append(item)
+
+            for states_dir, items in by_dir.items():
+                try:
+                    self._write(states_dir, items)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(items)} artifacts to {states_dir}: {e}")
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, states_dir: str, items: List[Tuple[str, str, str, float]]) -> None:
+        os.makedirs(states_dir, exist_ok=True)
+        log_path = os.path.join(states_dir, ARTIFACT_LOG_NAME)
+        blobs = self._blobs[states_dir]
+        if not os.path.exists(log_path):
+            # New log, or the directory was removed since the last write
+            blobs.clear()
+        elif not blobs:
+            # Log written by an earlier store (e.g. a resumed run), re-read its blob locations
+            blobs.update({entry["sha256"]: (entry["offset"], entry["length"]) for entry in read_index(states_dir)})
+
+        index_lines = []
+        with open(log_path, "ab") as log_file:
+            offset = log_file.seek(0, os.SEEK_END)
+            for _, name, content, timestamp in items:
+                data = content.encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+                if digest not in blobs:
+                    compressed = zlib.compress(data, self.compression_level)
+                    log_file.write(compressed)
+                    blobs[digest] = (offset, len(compressed))
+                    offset += len(compressed)
+                blob_offset, blob_length = blobs[digest]
+                index_lines.append(
+                    json.dumps(
+                        {
+                            "name": name,
+                            "sha256": digest,
+                            "offset": blob_offset,
+                            "length": blob_length,
+                            "size": len(data),
+                            "time": timestamp,
+                        }
+                    )
+                )
+            log_file.flush()
+
+        # The index is appended after the blobs are on disk, so readers never see dangling entries
+        with open(os.path.join(states_dir, ARTIFACT_INDEX_NAME), "a", encoding="utf-8") as index_file:
+            index_file.write("\n".join(index_lines) + "\n")
+
+
+def read_index(states_dir: str) -> List[Dict]:
+    """Read the index entries of an artifact log in write order, ignoring a partially written last line."""
+    index_path = os.path.join(states_dir, ARTIFACT_INDEX_NAME)
+    if not os.path.exists(index_path):
+        return []
+    entries = []
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+class ArtifactReader:
+    """Read access to the artifacts of a states directory, falling back to plain files."""
+
+    def __init__(self, states_dir: str):
+        self.states_dir = str(states_dir)
+
+    def _latest_entries(self) -> Dict[str, Dict]:
+        entries = {}
+        for entry in read_index(self.states_dir):
+            entries[entry["name"]] = entry
+        return entries
+
+    def list(self) -> List[str]:
+        """Names of the stored artifacts, including plain files of the directory."""
+        names = list(self._latest_entries())
+        if os.path.isdir(self.states_dir):
+            for file_name in sorted(os.listdir(self.states_dir)):
+                if file_name not in (ARTIFACT_LOG_NAME, ARTIFACT_INDEX_NAME) and file_name not in names:
+                    names.append(file_name)
+        return names
+
+    def exists(self, name: str) -> bool:
+        return name in self._latest_entries() or os.path.isfile(os.path.join(self.states_dir, name))
+
+    def read(self, name: str) -> Optional[str]:
+        """
+        Read the latest version of an artifact.
+
+        Args:
+            name: Artifact name
+
+        Returns:
+            The artifact content, or None if there is no such artifact
+        """
+        entry = self._latest_entries().get(name)
+        if entry is None:
+            file_path = os.path.join(self.states_dir, name)
+            if os.path.isfile(file_path):
+                with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                    return f.read()
+            return None
+
+        with open(os.path.join(self.states_dir, ARTIFACT_LOG_NAME), "rb") as log_file:
+            log_file.seek(entry["offset"])
+            compressed = log_file.read(entry["length"])
+        return zlib.decompress(compressed).decode("utf-8")
@@ -13,6 +13,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, List, Optional
 
+from .retrieval_stats import RetrievalStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -131,6 +133,9 @@ class ChattingManager:
         self.data_context_presented = False
         self.presented_tutorials = set()  # Set of tutorial identifiers
 
+        # Tutorial search latencies and skipped reranker calls, written to retrieval_stats.json on cleanup
+        self.retrieval_stats = RetrievalStats()
+
         # Initialize agents
         self._init_agents()
 
@@ -572,6 +577,8 @@ class ChattingManager:
         if hasattr(self, "retriever"):
             self.retriever.cleanup()
 
+        self.retrieval_stats.save_report(os.path.join(self.output_folder, "retrieval_stats.json"))
+
         logger.info("ChattingManager cleanup completed.")
 
     @property
@@ -0,0 +1,185 @@
+"""
+Deduplicated memory of the error analyses of failed nodes.
+
+Late in a run the same root cause tends to be analysed again and again. ErrorMemory clusters
+the analyses by semantic similarity (using the BGE embedder of the tutorial indexer, with a
+lexical fallback), keeps one representative and an occurrence count per cluster, and renders
+the clusters within a token budget, preferring those from the lineage of the current node.
+"""
+
+import logging
+import re
+from typing import Callable, List, Optional, Set
+
+import numpy as np
+
+from ..prompts.token_counter import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Token-set Jaccard similarity above which two analyses are considered the same error when no embedder is available
+LEXICAL_SIMILARITY_THRESHOLD = 0.6
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _token_set(text: str) -> Set[str]:
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ErrorCluster:
+    """A group of error analyses sharing the same root cause."""
+
+    def __init__(self, analysis: str, time_step: int, embedding: Optional[np.ndarray], tokens: Set[str]):
+        self.analyses: List[str] = [analysis]
+        self.time_steps: List[int] = [time_step]
+        self.centroid = embedding
+        self.tokens = tokens
+
+    @property
+    def count(self) -> int:
+        return len(self.analyses)
+
+    @property
+    def last_step(self) -> int:
+        return self.time_steps[-1]
+
+    def add(self, analysis: str, time_step: int, embedding: Optional[np.ndarray]) -> None:
+        self.analyses.append(analysis)
+        self.time_steps.append(time_step)
+        if self.centroid is not None and embedding is not None:
+            # Running mean of the member embeddings, kept normalized for cosine similarity
+            centroid = self.centroid * (self.count - 1) + embedding
+            self.centroid = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+    def representative(self, lineage_steps: Set[int]) -> str:
+        """The most recent analysis of the lineage if the cluster has one, otherwise the most recent overall."""
+        for analysis, time_step in zip(reversed(self.analyses), reversed(self.time_steps)):
+            if time_step in lineage_steps:
+                return analysis
+        return self.analyses[-1]
+
+
+class ErrorMemory:
+    """Clusters error analyses and renders a compact, token-bounded summary of them."""
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        similarity_threshold: float = 0.9,
+        max_tokens: int = 4096,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Initialize the error memory.
+
+        Args:
+            embed_fn: Function returning L2-normalized embeddings of a list of texts, lexical similarity
+                is used if None or if embedding fails
+            similarity_threshold: Cosine similarity above which an analysis joins an existing cluster
+            max_tokens: Token budget of the rendered summary
+            token_counter: Token counter used for the budget
+        """
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or get_token_counter()
+        self.clusters: List[ErrorCluster] = []
+
+    def __len__(self) -> int:
+        return sum(cluster.count for cluster in self.clusters)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            return np.asarray(self.embed_fn([text]), dtype=np.float32)[0]
+        except Exception as e:
+            logger.warning(f"Failed to embed error analysis, falling back to lexical similarity: {e}")
+            self.embed_fn = None
+            for cluster in self.clusters:
+                cluster.centroid = None
+            return None
+
+    def add(self, analysis: str, time_step: int) -> None:
+        """
+        Add the error analysis of a failed node, merging it into the most similar cluster if any.
+
+        Args:
+            analysis: The error analysis
+            time_step: Time step (id) of the node the analysis belongs to
+        """
+        if not analysis:
+            return
+
+        embedding = self._embed(analysis)
+        tokens = _token_set(analysis)
+
+        best_cluster, best_similarity = None, -1.0
+        for cluster in self.clusters:
+            if embedding is not None and cluster.centroid is not None:
+                similarity = float(np.dot(embedding, cluster.centroid))
+                threshold = self.similarity_threshold
+            else:
+                similarity = _jaccard(tokens, cluster.tokens)
+                threshold = LEXICAL_SIMILARITY_THRESHOLD
+            if similarity >= threshold and similarity > best_similarity:
+                best_cluster, best_similarity = cluster, similarity
+
+        if best_cluster is None:
+            self.clusters.append(ErrorCluster(analysis, time_step, embedding, tokens))
+        else:
+            best_cluster.add(analysis, time_step, embedding)
+            logger.debug(
+                f"Error analysis of step {time_step} matches a previous error (similarity {best_similarity:.3f}), "
+                f"seen {best_cluster.count} times."
+            )
+
+    def render(self, lineage_steps: Optional[Set[int]] = None) -> str:
+        """
+        Render the representative analysis of each cluster within the token budget.
+
+        Clusters from the lineage of the current node are selected first, then the most recent ones.
+        The selected clusters are rendered in chronological order of their last occurrence.
+
+        Args:
+            lineage_steps: Time steps of the current node and its ancestors
+
+        Returns:
+            The rendered error analyses
+        """
+        lineage_steps = lineage_steps or set()
+
+        def priority(cluster: ErrorCluster):
+            in_lineage = any(time_step in lineage_steps for time_step in cluster.time_steps)
+            return (in_lineage, cluster.last_step)
+
+        selected = []
+        used_tokens = 0
+        for cluster in sorted(self.clusters, key=priority, reverse=True):
+            entry = self._format_cluster(cluster, lineage_steps)
+            entry_tokens = self.token_counter.count(entry)
+            if used_tokens + entry_tokens > self.max_tokens:
+                continue
+            selected.append((cluster.last_step, entry))
+            used_tokens += entry_tokens
+
+        entries = [entry for _, entry in sorted(selected, key=lambda item: item[0])]
+        num_omitted = len(self.clusters) - len(selected)
+        if num_omitted:
+            entries.append(f"({num_omitted} other distinct errors omitted.)")
+        return "\n\n".join(entries)
+
+    @staticmethod
+    def _format_cluster(cluster: ErrorCluster, lineage_steps: Set[int]) -> str:
+        analysis = cluster.representative(lineage_steps)
+        if cluster.count == 1:
+            return analysis
+        steps = ", ".join(str(time_step) for time_step in cluster.time_steps)
+        return f"[Seen {cluster.count} times, in steps {steps}]\n{analysis}"
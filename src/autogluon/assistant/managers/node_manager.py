@@ -14,8 +14,15 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, List, Literal, Optional, Set
 
+from omegaconf import OmegaConf
+
 from ..llm import ChatLLMFactory
+from ..prompts.profiler import PromptProfiler
 from ..tools_registry import registry
+from .artifact_store import ArtifactStore
+from .error_memory import ErrorMemory
+from .perception_cache import PerceptionCache
+from .retrieval_stats import RetrievalStats
 
 logger = logging.getLogger(__name__)
 
@@ -259,6 +266,10 @@ class NodeManager:
 
         # Track time_step
         self.time_step = -1
+
+        # Version of the state that prompt variables are derived from, see log_agent_start
+        self.state_version = 0
+
         # Create root node
         self.root_node = Node(stage="root", time_step=self.time_step, depth=0)
         self.current_node = self.root_node
@@ -279,6 +290,17 @@ class NodeManager:
         self.failure_offset = self.config.failure_offset
         self.failure_penalty_weight = self.config.failure_penalty_weight
 
+        # LLM telemetry: cost estimation and optional Prometheus export
+        telemetry_config = self.config.get("telemetry", {})
+        ChatLLMFactory.configure_telemetry(
+            price_table=telemetry_config.get("llm_pricing", None),
+            prometheus_path=(
+                os.path.join(self.output_folder, "metrics.prom")
+                if telemetry_config.get("prometheus_export", False)
+                else None
+            ),
+        )
+
         # Tracking for thread safety
         self._node_lock = threading.Lock()
         self.search_start_time = time.time()
@@ -295,9 +317,34 @@ class NodeManager:
         # Target prompt instance for meta-prompting
         self.target_prompt_instance = None
 
+        # Artifacts (prompts, responses, stdout/stderr, ...) are written to one compressed log per states
+        # directory by a background thread instead of one file each
+        artifact_store_config = self.config.get("artifact_store", {})
+        self.artifact_store = None
+        if artifact_store_config.get("enabled", False):
+            self.artifact_store = ArtifactStore(compression_level=artifact_store_config.get("compression_level", 6))
+
+        # Created in initialize, as fingerprinting reads the input folder
+        self.perception_cache = None
+
+        # Per-call prompt composition statistics, written to prompt_profile.json
+        self.prompt_profiler = PromptProfiler() if self.config.get("enable_prompt_profiling", False) else None
+        # Tutorial search latencies and skipped reranker calls, written to retrieval_stats.json
+        self.retrieval_stats = RetrievalStats()
+
         # Initialize the agent components
         self._init_agents()
 
+        # Deduplicated error analyses, clustered with the embedder of the tutorial retriever
+        error_memory_config = self.config.get("error_memory", {})
+        self.error_memory = None
+        if error_memory_config.get("enabled", False):
+            self.error_memory = ErrorMemory(
+                embed_fn=self.retriever.indexer.encode,
+                similarity_threshold=error_memory_config.get("similarity_threshold", 0.9),
+                max_tokens=error_memory_config.get("max_tokens", 4096),
+            )
+
     def _init_agents(self):
         """Initialize all required agents."""
         from ..agents import (
@@ -410,6 +457,21 @@ class NodeManager:
 
     def initialize(self):
         """Initialize the manager."""
+        perception_cache_config = self.config.get("perception_cache", {})
+        if perception_cache_config.get("enabled", False):
+            self.perception_cache = self._create_perception_cache(perception_cache_config)
+            cached = self.perception_cache.get_outputs()
+            if cached is not None:
+                logger.brief("Input data folder is unchanged, reusing the cached data perception results.")
+                self.data_prompt = cached["data_prompt"]
+                self.description_files = cached["description_files"]
+                self.task_description = cached["task_description"]
+                if "available_tools" in cached:
+                    self.available_tools = cached["available_tools"]
+                else:
+                    self.available_tools = self.ts_agent()
+                return
+
         self.data_prompt = self.dp_agent()
         self.description_files = self.dfr_agent()
         self.task_description = self.td_agent()
@@ -417,6 +479,48 @@ class NodeManager:
         # Use tool selector to get prioritized list of tools
         self.available_tools = self.ts_agent()
 
+        if self.perception_cache is not None:
+            outputs = {
+                "data_prompt": self.data_prompt,
+                "description_files": list(self.description_files),
+                "task_description": self.task_description,
+            }
+            if perception_cache_config.get("cache_tool_selection", True):
+                outputs["available_tools"] = list(self.available_tools)
+            self.perception_cache.put_outputs(outputs)
+
+    def _create_perception_cache(self, perception_cache_config) -> PerceptionCache:
+        """Create the perception cache, keyed by everything the perception results depend on besides the data."""
+
+        def section(name):
+            value = self.config.get(name, None)
+            return OmegaConf.to_container(value, resolve=True) if OmegaConf.is_config(value) else value
+
+        reader_context = {
+            "reader": section("reader"),
+            "executer": section("executer"),
+            "max_chars_per_file": self.config.max_chars_per_file,
+            "use_native_readers": self.config.get("use_native_readers", False),
+        }
+        context = {
+            "reader_context": reader_context,
+            "user_input": self.initial_user_input,
+            "description_file_retriever": section("description_file_retriever"),
+            "task_descriptor": section("task_descriptor"),
+            "tool_selector": section("tool_selector"),
+            "max_file_group_size_to_show": self.config.max_file_group_size_to_show,
+            "num_example_files_to_show": self.config.num_example_files_to_show,
+            "data_profiler": section("data_profiler"),
+            "tools": sorted(registry.list_tools()),
+        }
+        return PerceptionCache(
+            input_data_folder=self.input_data_folder,
+            context=context,
+            reader_context=reader_context,
+            cache_dir=perception_cache_config.get("cache_dir", None),
+            hashed_files_per_group=perception_cache_config.get("hashed_files_per_group", 8),
+        )
+
     def get_iteration_folder(self, node: Node) -> str:
         """
         Get the folder for storing iteration artifacts.
@@ -474,23 +578,32 @@ class NodeManager:
         else:
             states_dir = os.path.join(self.output_folder, "states")
 
-        os.makedirs(states_dir, exist_ok=True)
+        if content is not None:
+            if isinstance(content, list):
+                # Join list elements with newlines
+                content = "\n".join(str(item) for item in content)
+        else:
+            content = "<None>"
+
         output_file = os.path.join(states_dir, save_name)
+        if self.artifact_store is not None:
+            logger.info(f"Saving {output_file} to the artifact store...")
+            self.artifact_store.put(states_dir, save_name, content)
+            return
 
+        os.makedirs(states_dir, exist_ok=True)
         logger.info(f"Saving {output_file}...")
         with open(output_file, "w") as file:
-            if content is not None:
-                if isinstance(content, list):
-                    # Join list elements with newlines
-                    file.write("\n".join(str(item) for item in content))
-                else:
-                    # Handle as string (original behavior)
-                    file.write(content)
-            else:
-                file.write("<None>")
+            file.write(content)
 
     def log_agent_start(self, message: str):
-        """Log agent start message."""
+        """
+        Log agent start message.
+
+        Every agent call starts here, so this is also where memoized prompt variable values are invalidated:
+        state mutations happen between agent calls (e.g. storing the generated code or the execution output).
+        """
+        self.state_version += 1
         logger.info(message)
 
     def log_agent_end(self, message: str):
@@ -873,6 +986,8 @@ class NodeManager:
             self.current_node.error_analysis = self.error_analyzer()
 
             self._all_error_analyses.append(self.current_node.error_analysis)
+            if self.error_memory is not None:
+                self.error_memory.add(self.current_node.error_analysis, time_step=self.time_step)
 
             # If this is a debug node and it failed, check parent's debug attempts
             if self.current_node.stage == "debug" and self.current_node.parent:
@@ -1171,6 +1286,10 @@ class NodeManager:
                 )
                 return
 
+        if self.artifact_store is not None:
+            # Pending writes would recreate the folder after its removal
+            self.artifact_store.flush()
+
         if os.path.exists(source_folder):
             import shutil
 
@@ -1213,6 +1332,8 @@ class NodeManager:
         """Clean up resources."""
         if hasattr(self, "retriever"):
             self.retriever.cleanup()
+        if getattr(self, "artifact_store", None) is not None:
+            self.artifact_store.close()
 
     def _find_debug_origin(self, node: Node) -> Optional[Node]:
         """
@@ -1262,9 +1383,49 @@ class NodeManager:
             f"output: {total['total_output_tokens']}, "
             f"sum: {total['total_tokens']}"
         )
+        latency = total["latency_seconds"]
+        if latency["count"]:
+            logger.brief(
+                f"LLM requests: {total['total_requests']}, errors: {total['total_errors']}, "
+                f"retries: {total['total_retries']} (waited {total['total_retry_wait_seconds']:.0f}s), "
+                f"latency p50/p95/p99: {latency['p50']:.1f}s/{latency['p95']:.1f}s/{latency['p99']:.1f}s"
+            )
+        if total["total_estimated_cost_usd"]:
+            agent_costs = sorted(
+                ((name, stats["estimated_cost_usd"]) for name, stats in usage["agents"].items()),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            logger.brief(
+                f"Estimated cost: ${total['total_estimated_cost_usd']:.2f} "
+                f"(by agent: {', '.join(f'{name}: ${cost:.2f}' for name, cost in agent_costs)})"
+            )
+        if total.get("total_cache_read_tokens") or total.get("total_cache_write_tokens"):
+            logger.brief(
+                f"Prompt cache tokens — read: {total['total_cache_read_tokens']}, "
+                f"write: {total['total_cache_write_tokens']}"
+            )
 
         logger.info(f"Full token usage detail:\n{usage}")
 
+        retrieval = self.retrieval_stats.save_report(os.path.join(self.output_folder, "retrieval_stats.json"))
+        if retrieval["num_retrievals"]:
+            latency = retrieval["retrieval_latency_seconds"]
+            logger.brief(
+                f"Tutorial retrievals: {retrieval['num_retrievals']}, "
+                f"latency p50/p95: {latency['p50'] * 1000:.0f}ms/{latency['p95'] * 1000:.0f}ms, "
+                f"reranker calls skipped: {retrieval['num_reranks_skipped']}/{retrieval['num_reranks']}"
+            )
+
+        if self.prompt_profiler is not None:
+            profile = self.prompt_profiler.save_report(os.path.join(self.output_folder, "prompt_profile.json"))
+            top_variables = profile["variables"][:5]
+            if top_variables:
+                logger.brief(
+                    "Most expensive prompt variables: "
+                    + ", ".join(f"{v['variable']} ({v['total_tokens']} tokens)" for v in top_variables)
+                )
+
     def compute_uct_value(self, node):
         return node.uct_value(
             self.exploration_constant,
@@ -1350,6 +1511,15 @@ class NodeManager:
     @property
     def all_previous_error_analyses(self) -> str:
         """Get all error analyses from previous nodes."""
+        if self.error_memory is not None:
+            # Deduplicated, preferring the analyses of the current node's lineage
+            lineage_steps = set()
+            node = self.current_node
+            while node is not None:
+                lineage_steps.add(node.time_step)
+                node = node.parent
+            return self.error_memory.render(lineage_steps=lineage_steps)
+
         # TODO: make this recursive, handle debugging code and successful ones differently
         return "\n\n".join(self._all_error_analyses)
 
@@ -0,0 +1,200 @@
+"""
+Persistent cache of the data perception results of an input folder.
+
+The input folder is fingerprinted from the relative path, size and mtime of every file, and a
+sampled content hash of a bounded number of files per group (same depth and extension), so that
+large folders are fingerprinted from their metadata rather than read. When the fingerprint and
+the context (user input and the configuration of the perception agents) are unchanged, the
+outputs of NodeManager.initialize (data prompt, description files, task description and
+optionally the selected tools) are reused as is. Otherwise the summaries of unchanged files are
+still reused by the DataPerceptionAgent, so only the changed files are read again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..constants import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+PERCEPTION_CACHE_SUBDIR = "perception"
+
+# Bytes hashed at the start, middle and end of each hashed file
+FINGERPRINT_SAMPLE_BYTES = 64 * 1024
+# Files per group (same depth and extension) whose content is hashed, the others are fingerprinted by size and mtime
+FINGERPRINT_HASHED_FILES_PER_GROUP = 8
+
+
+def fingerprint_file(file_path: str, hash_content: bool = True) -> List:
+    """
+    Fingerprint a file by its size, modification time and optionally a hash of sampled content.
+
+    Args:
+        file_path: Path to the file
+        hash_content: Whether to read the file to hash sampled content
+
+    Returns:
+        [size, mtime_ns, sampled sha256], or [size, mtime_ns] without the content hash
+    """
+    stat = os.stat(file_path)
+    if not hash_content:
+        return [stat.st_size, stat.st_mtime_ns]
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        if stat.st_size <= 3 * FINGERPRINT_SAMPLE_BYTES:
+            digest.update(f.read())
+        else:
+            for offset in (0, stat.st_size // 2, stat.st_size - FINGERPRINT_SAMPLE_BYTES):
+                f.seek(offset)
+                digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+
+def fingerprint_folder(
+    folder: str, hashed_files_per_group: int = FINGERPRINT_HASHED_FILES_PER_GROUP
+) -> Tuple[str, Dict[str, List]]:
+    """
+    Fingerprint a folder from the fingerprints of all its files and their relative paths.
+
+    Every file is fingerprinted by its size and mtime. In each group of files with the same depth and
+    extension, the sampled content of the first files (by relative path) is hashed too, which catches
+    changes that keep the size and mtime (e.g. copies that preserve timestamps).
+
+    Args:
+        folder: Path to the folder
+        hashed_files_per_group: Files per group whose content is hashed
+
+    Returns:
+        Tuple of (folder fingerprint, dict mapping absolute file paths to file fingerprints)
+    """
+    abs_folder = os.path.abspath(folder)
+    groups: Dict[Tuple[int, str], List[str]] = {}
+    for root, _, files in os.walk(abs_folder):
+        depth = 0 if root == abs_folder else os.path.relpath(root, abs_folder).count(os.sep) + 1
+        for file in files:
+            groups.setdefault((depth, os.path.splitext(file)[1].lower()), []).append(os.path.join(root, file))
+
+    file_fingerprints = {}
+    for file_paths in groups.values():
+        for position, file_path in enumerate(sorted(file_paths)):
+            try:
+                file_fingerprints[file_path] = fingerprint_file(
+                    file_path, hash_content=position < hashed_files_per_group
+                )
+            except OSError as e:
+                logger.warning(f"Could not fingerprint {file_path}: {e}")
+
+    digest = hashlib.sha256()
+    for file_path in sorted(file_fingerprints):
+        # Relative paths, so that the folder structure is part of the fingerprint
+        digest.update(os.path.relpath(file_path, abs_folder).encode("utf-8"))
+        digest.update(json.dumps(file_fingerprints[file_path]).encode("utf-8"))
+    return digest.hexdigest(), file_fingerprints
+
+
+def _hash_context(context: Any) -> str:
+    return hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class PerceptionCache:
+    """Cache of the perception outputs and per-file summaries of one input folder."""
+
+    def __init__(
+        self,
+        input_data_folder: str,
+        context: Any,
+        reader_context: Any,
+        cache_dir: Optional[Union[str, Path]] = None,
+        hashed_files_per_group: int = FINGERPRINT_HASHED_FILES_PER_GROUP,
+    ):
+        """
+        Initialize the cache and fingerprint the input folder.
+
+        Args:
+            input_data_folder: Path to the input data folder
+            context: Anything else the perception outputs depend on (user input, agent configuration, ...),
+                outputs cached with another context are not reused
+            reader_context: Anything else the file summaries depend on (reader configuration, ...)
+            cache_dir: Root cache directory, DEFAULT_CACHE_DIR if None
+            hashed_files_per_group: Files per group (same depth and extension) whose sampled content is
+                fingerprinted, see fingerprint_folder
+        """
+        self.input_data_folder = os.path.abspath(input_data_folder)
+        self.context_key = _hash_context(context)
+        self.reader_context_key = _hash_context(reader_context)
+        folder_key = hashlib.sha256(self.input_data_folder.encode("utf-8")).hexdigest()[:32]
+        self.cache_path = Path(cache_dir or DEFAULT_CACHE_DIR) / PERCEPTION_CACHE_SUBDIR / f"{folder_key}.json"
+
+        self.fingerprint, self.file_fingerprints = fingerprint_folder(
+            self.input_data_folder, hashed_files_per_group=hashed_files_per_group
+        )
+        self._entry = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return {"files": {}, "outputs": None}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable perception cache {self.cache_path}: {e}")
+            return {"files": {}, "outputs": None}
+
+        # Drop the summaries of files that changed or no longer exist
+        entry["files"] = {
+            file_path: cached
+            for file_path, cached in entry.get("files", {}).items()
+            if cached.get("fingerprint") == self.file_fingerprints.get(file_path)
+        }
+        return entry
+
+    def _save(self) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._entry, f)
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write perception cache {self.cache_path}: {e}")
+
+    def get_outputs(self) -> Optional[Dict[str, Any]]:
+        """The cached perception outputs, None if the folder or the context changed."""
+        outputs = self._entry.get("outputs")
+        if not outputs or outputs.get("fingerprint") != self.fingerprint or outputs.get("context") != self.context_key:
+            return None
+        return outputs["values"]
+
+    def put_outputs(self, values: Dict[str, Any]) -> None:
+        """Store the perception outputs for the current fingerprint and context."""
+        self._entry["outputs"] = {"fingerprint": self.fingerprint, "context": self.context_key, "values": values}
+        self._save()
+
+    def get_file_summaries(self, file_paths: List[str]) -> Dict[str, str]:
+        """The cached summaries of the given files that are unchanged since they were summarized."""
+        files = self._entry["files"]
+        return {
+            file_path: files[file_path]["summary"]
+            for file_path in file_paths
+            if file_path in files and files[file_path].get("context") == self.reader_context_key
+        }
+
+    def put_file_summaries(self, summaries: Dict[str, str]) -> None:
+        """Store the summaries of files of the input folder."""
+        for file_path, summary in summaries.items():
+            if file_path in self.file_fingerprints:
+                self._entry["files"][file_path] = {
+                    "fingerprint": self.file_fingerprints[file_path],
+                    "context": self.reader_context_key,
+                    "summary": summary,
+                }
+        self._save()
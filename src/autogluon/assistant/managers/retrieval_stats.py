@@ -0,0 +1,103 @@
+"""
+Per-run statistics of tutorial retrieval.
+
+The RetrievalStats collector records the latency and size of every tutorial search and whether
+the reranker LLM call was made or skipped because the dense similarities of the top tutorials
+were clearly ahead. The report gives the latency percentiles and the rerank skip rate of the run.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..llm.metrics import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalStats:
+    """Thread-safe collector of retrieval statistics for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retrievals: List[Dict[str, Any]] = []
+        self.reranks: List[Dict[str, Any]] = []
+
+    def record_retrieval(
+        self, tool_name: str, hybrid: bool, num_results: int, latency: float, num_queries: int = 1
+    ) -> None:
+        """
+        Record a tutorial search.
+
+        Args:
+            tool_name: Tool whose tutorials were searched
+            hybrid: Whether the dense ranking was fused with the BM25 ranking
+            num_results: Number of tutorials returned
+            latency: Time spent searching, in seconds
+            num_queries: Number of queries searched at once (main query and expansions)
+        """
+        with self._lock:
+            self.retrievals.append(
+                {
+                    "tool": tool_name,
+                    "hybrid": hybrid,
+                    "num_queries": num_queries,
+                    "num_results": num_results,
+                    "latency_seconds": latency,
+                }
+            )
+
+    def record_rerank(self, skipped: bool, num_candidates: int, reason: Optional[str] = None) -> None:
+        """
+        Record a reranking step.
+
+        Args:
+            skipped: Whether the reranker LLM call was skipped
+            num_candidates: Number of retrieved tutorials to select from
+            reason: Why the call was skipped
+        """
+        with self._lock:
+            self.reranks.append({"skipped": skipped, "num_candidates": num_candidates, "reason": reason})
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Aggregate the recorded retrievals and reranks.
+
+        Returns:
+            Dict with the search latency summary and the number and rate of skipped reranker calls
+        """
+        with self._lock:
+            retrievals = list(self.retrievals)
+            reranks = list(self.reranks)
+
+        num_skipped = sum(rerank["skipped"] for rerank in reranks)
+        skip_reasons: Dict[str, int] = {}
+        for rerank in reranks:
+            if rerank["skipped"]:
+                skip_reasons[rerank["reason"]] = skip_reasons.get(rerank["reason"], 0) + 1
+
+        return {
+            "num_retrievals": len(retrievals),
+            "num_hybrid_retrievals": sum(retrieval["hybrid"] for retrieval in retrievals),
+            "num_queries": sum(retrieval.get("num_queries", 1) for retrieval in retrievals),
+            "retrieval_latency_seconds": summarize_latencies(
+                [retrieval["latency_seconds"] for retrieval in retrievals]
+            ),
+            "num_reranks": len(reranks),
+            "num_reranks_skipped": num_skipped,
+            "rerank_skip_rate": round(num_skipped / len(reranks), 4) if reranks else 0.0,
+            "rerank_skip_reasons": skip_reasons,
+            "retrievals": retrievals,
+            "reranks": reranks,
+        }
+
+    def save_report(self, save_path: str) -> Dict[str, Any]:
+        """Write the report as JSON and return it."""
+        report = self.get_report()
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        with open(save_path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Retrieval statistics saved to {save_path}")
+        return report
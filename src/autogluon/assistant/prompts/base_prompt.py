@@ -6,11 +6,14 @@ for all prompt types in the system.
 """
 
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 
 # Import at module level to avoid circular import
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
+from .token_counter import get_token_counter
 from .variable_provider import VariableProvider
 
 if TYPE_CHECKING:
@@ -46,6 +49,11 @@ class BasePrompt(ABC):
         self._meta_prompted = False
         self._rewritten_template = None
 
+        # Profile of the last rendering in each thread, if prompt profiling is enabled. Agents may build the
+        # same prompt from several threads, so the record is handed back by build_with_profile() instead of
+        # being shared on the instance.
+        self._render_state = threading.local()
+
         # Initialize the template (without meta-prompting, that will happen in build())
         self.set_template(template, apply_meta_prompting=False)
 
@@ -150,6 +158,24 @@ class BasePrompt(ABC):
             return start_part + truncated_text + end_part
         return output
 
+    def get_token_budget(self) -> Optional[int]:
+        """
+        Get the token budget of the rendered prompt if context budgeting is enabled.
+
+        The budget is max_prompt_tokens if configured, otherwise the context window
+        (max_context_tokens) minus the tokens reserved for the response (max_tokens).
+
+        Returns:
+            The maximum number of prompt tokens, or None if context budgeting is disabled
+        """
+        if not self.llm_config.get("context_budgeting", False):
+            return None
+        max_prompt_tokens = self.llm_config.get("max_prompt_tokens", None)
+        if max_prompt_tokens is None:
+            max_context_tokens = self.llm_config.get("max_context_tokens", 200000)
+            max_prompt_tokens = max_context_tokens - self.llm_config.get("max_tokens", 0)
+        return max(max_prompt_tokens, 0)
+
     def render(self, additional_vars: Optional[Dict[str, Any]] = None) -> str:
         """
         Render the prompt template with the current variable values.
@@ -160,31 +186,45 @@ class BasePrompt(ABC):
         Returns:
             The rendered prompt
         """
-        # If additional variables are provided, we need a temporary provider
-        if additional_vars:
-            # Create a subclass of VariableProvider that can handle the additional vars
-            class TempProvider(VariableProvider):
-                def __init__(self, parent_provider, additional_vars):
-                    self.parent_provider = parent_provider
-                    self.additional_vars = additional_vars
-                    # Keep a reference to the manager for method calls
-                    self.manager = parent_provider.manager
-
-                def get_value(self, var_name):
-                    if var_name in self.additional_vars:
-                        return self.additional_vars[var_name]
-                    return self.parent_provider.get_value(var_name)
-
-            temp_provider = TempProvider(self.variable_provider, additional_vars)
-            rendered = temp_provider.render_template(self.template)
-        else:
-            rendered = self.variable_provider.render_template(self.template)
-
-        # Add format instructions if configured
+        start_time = time.perf_counter()
+        self._render_state.profile_record = None
+        profiler = getattr(self.manager, "prompt_profiler", None)
+        render_stats = {} if profiler is not None else None
+
+        token_budget = self.get_token_budget()
+        token_counter = None
+        format_instruction = None
         if hasattr(self.llm_config, "add_coding_format_instruction") and self.llm_config.add_coding_format_instruction:
             if hasattr(self, "get_format_instruction"):
                 format_instruction = self.get_format_instruction()
-                rendered = f"{rendered}\n\n{format_instruction}"
+        if token_budget is not None:
+            token_counter = get_token_counter(self.llm_config.get("model", None))
+            if format_instruction:
+                token_budget -= token_counter.count(format_instruction)
+
+        rendered = self.variable_provider.render_template(
+            self.template,
+            additional_vars=additional_vars,
+            token_budget=token_budget,
+            token_counter=token_counter,
+            render_stats=render_stats,
+        )
+
+        # Add format instructions if configured
+        if format_instruction:
+            rendered = f"{rendered}\n\n{format_instruction}"
+
+        if profiler is not None:
+            render_seconds = time.perf_counter() - start_time
+            token_counter = token_counter or get_token_counter(self.llm_config.get("model", None))
+            self._render_state.profile_record = profiler.record_render(
+                prompt_name=self.__class__.__name__,
+                time_step=getattr(self.manager, "time_step", None),
+                variables=render_stats,
+                prompt_chars=len(rendered),
+                prompt_tokens=token_counter.count(rendered),
+                render_seconds=render_seconds,
+            )
 
         return rendered
 
@@ -208,6 +248,20 @@ class BasePrompt(ABC):
         # Call the template method that subclasses should override, passing all kwargs
         return self._build(**kwargs)
 
+    def build_with_profile(self, **kwargs) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Build the prompt string and return it with the profile record of its rendering.
+
+        Args:
+            **kwargs: Additional keyword arguments to pass to the _build method.
+
+        Returns:
+            Tuple of the built prompt string and its profile record, or None if prompt profiling is disabled
+        """
+        self._render_state.profile_record = None
+        prompt = self.build(**kwargs)
+        return prompt, getattr(self._render_state, "profile_record", None)
+
     def _build(self, **kwargs) -> str:
         """
         Template method for building the prompt string.
@@ -228,6 +282,22 @@ class BasePrompt(ABC):
         """Parse the LLM response"""
         pass
 
+    def is_response_complete(self, response: str) -> bool:
+        """
+        Incremental parser used when streaming the LLM response.
+
+        Called with the partial response received so far. Returning True means everything
+        parse() needs is already present, so the stream can be stopped early. Subclasses
+        override this; by default the full response is always awaited.
+
+        Args:
+            response: The partial response text streamed so far
+
+        Returns:
+            bool: Whether the partial response can already be parsed
+        """
+        return False
+
     @abstractmethod
     def default_template(self) -> str:
         """Default prompt template"""
@@ -3,7 +3,7 @@ from typing import Dict, Optional, Tuple
 
 from ..constants import ENV_FOLDER_NAME
 from .base_prompt import BasePrompt
-from .utils import extract_code
+from .utils import extract_code, has_complete_code_block
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +76,10 @@ Notes:
 
         return prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """The bash code is extracted from the first bash code block, so stop once it is closed."""
+        return has_complete_code_block(response, language="bash")
+
     def parse(self, response: Dict) -> Tuple[str, Optional[str]]:
         """Parse the LLM's response to generated bash code"""
 
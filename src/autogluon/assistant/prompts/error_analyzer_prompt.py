@@ -2,7 +2,9 @@ import logging
 import re
 from typing import Optional
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from .base_prompt import BasePrompt
+from .utils import has_complete_fields
 
 logger = logging.getLogger(__name__)
 
@@ -28,15 +30,13 @@ Considerations for rewriting this template:
 
     def default_template(self) -> str:
         """Default template for code execution evaluation"""
-        return """
-Analyze the error and provide your response in this exact format:
+        return (
+            """
+Analyze the error shown below and provide your response in this exact format:
 
 ERROR_SUMMARY: [Brief technical description of the root cause in 1-3 sentences]
 SUGGESTED_FIX: [Specific debugging directions in 1-3 sentences without code]
 
-### Error Message
-{error_message_truncate_mid_8192}
-
 ### Task Description
 {task_description}
 
@@ -45,6 +45,11 @@ SUGGESTED_FIX: [Specific debugging directions in 1-3 sentences without code]
 
 ### User Instructions
 {user_input}
+"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """
+### Error Message
+{error_message_truncate_mid_8192}
 
 ### Previous Python Code:
 {python_code}
@@ -55,6 +60,7 @@ SUGGESTED_FIX: [Specific debugging directions in 1-3 sentences without code]
 ### Relevant Tutorials
 {tutorial_prompt}
 """
+        )
 
     def _build(self, **kwargs) -> str:
         """Build a prompt for the LLM to analyze errors.
@@ -72,6 +78,10 @@ SUGGESTED_FIX: [Specific debugging directions in 1-3 sentences without code]
 
         return prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """Stop once both the error summary and the suggested fix lines have been received."""
+        return has_complete_fields(response, fields=["ERROR_SUMMARY", "SUGGESTED_FIX"])
+
     def parse(self, response: str) -> Optional[str]:
         analysis_match = re.search(r"ERROR_SUMMARY:\s*(.*)", response, re.DOTALL)
         if analysis_match:
@@ -1,7 +1,9 @@
 import logging
 from typing import Dict, Optional, Tuple
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from .base_prompt import BasePrompt
+from .utils import has_complete_fields
 
 logger = logging.getLogger(__name__)
 
@@ -27,25 +29,10 @@ Considerations for rewriting this template:
 
     def default_template(self) -> str:
         """Default template for code execution evaluation"""
-        return """You are an expert code evaluator. Analyze the execution results of the following Python code and determine if the execution was successful or if issues need to be fixed.
-
-### Task Descriptions
-{execution_task}
-
-### Data Structure
-{execution_data}
-
-### Python Code
-{code_to_analyze}
-
-## Execution Results
-### Standard Output (stdout)
-
-{stdout_truncate_start_8192}
-
-### Standard Error (stderr)
-
-{stderr_truncate_start_8192}
+        # The evaluation instructions and task context are placed before the cache breakpoint
+        # so that they can be reused across iterations by providers supporting prompt caching.
+        return (
+            """You are an expert code evaluator. Analyze the execution results of the Python code given below and determine if the execution was successful or if issues need to be fixed.
 
 Evaluate the execution results and decide on one of the following actions:
 1. SUCCESS - If the execution was completely successful and met all requirements.
@@ -62,7 +49,28 @@ Even if the code executed without throwing errors, it might still have issues wi
 For validation scores:
 - If there is a validation score present in the execution results, extract it (e.g. the last validation score reported in the training process).
 - Convert the score to ensure higher values indicate better performance (multiply "lower is better" metrics like RMSE, MAE, or loss by -1)
-- Return the converted score that follows the "higher is better" convention"""
+- Return the converted score that follows the "higher is better" convention
+
+### Task Descriptions
+{execution_task}
+
+### Data Structure
+{execution_data}
+"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """
+### Python Code
+{code_to_analyze}
+
+## Execution Results
+### Standard Output (stdout)
+
+{stdout_truncate_start_8192}
+
+### Standard Error (stderr)
+
+{stderr_truncate_start_8192}"""
+        )
 
     def _build(
         self, stdout: str, stderr: str, code_to_analyze: str, execution_task: str, execution_data: str, **kwargs
@@ -106,6 +114,10 @@ For validation scores:
 
         return prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """Stop once the decision, error summary and validation score lines have all been received."""
+        return has_complete_fields(response, fields=["DECISION", "ERROR_SUMMARY", "VALIDATION_SCORE"])
+
     def parse(self, response: Dict) -> Tuple[str, Optional[str], Optional[float]]:
         """Parse the LLM's response to extract decision, error summary, and validation score."""
 
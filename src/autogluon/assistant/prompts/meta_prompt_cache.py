@@ -0,0 +1,164 @@
+"""
+Cross-run cache of meta-prompted templates.
+
+Rewritten templates are stored as JSON files keyed by a hash of (prompt class, original template,
+model) and a fingerprint of the task (task description and data prompt). Runs on the same task
+reuse them instead of calling the meta-prompting LLM again; with a similarity threshold below 1,
+templates rewritten for a near-identical task (by token-set Jaccard similarity) are reused as well.
+Writes are atomic, so the cache can be shared by concurrent processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Set, Union
+
+from ..constants import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+META_PROMPT_CACHE_SUBDIR = "meta_prompts"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _sha256(*parts: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _task_tokens(task_text: str) -> Set[str]:
+    return set(_TOKEN_PATTERN.findall(task_text.lower()))
+
+
+def _normalize_task(task_text: str) -> str:
+    return " ".join(task_text.lower().split())
+
+
+class MetaPromptCache:
+    """File-based cache of rewritten prompt templates, shared across runs and processes."""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, similarity_threshold: float = 1.0):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root cache directory, DEFAULT_CACHE_DIR if None
+            similarity_threshold: Minimum Jaccard similarity of the task tokens for reusing a template
+                rewritten for another task, 1.0 only reuses templates of the same task
+        """
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR) / META_PROMPT_CACHE_SUBDIR
+        self.similarity_threshold = similarity_threshold
+
+    def _scope_key(self, prompt_class: str, template: str, model: Optional[str]) -> str:
+        # The file name prefix, so that candidates for near-identical tasks can be globbed
+        return _sha256(prompt_class, template, model)[:32]
+
+    def _path(self, scope_key: str, task_text: str) -> Path:
+        return self.cache_dir / f"{scope_key}_{_sha256(_normalize_task(task_text))[:32]}.json"
+
+    def get(self, prompt_class: str, template: str, task_text: str, model: Optional[str]) -> Optional[str]:
+        """
+        Look up the rewritten template.
+
+        Args:
+            prompt_class: Name of the prompt class
+            template: The original template
+            task_text: Text identifying the task (task description and data prompt)
+            model: Model used for meta-prompting
+
+        Returns:
+            The cached rewritten template, or None on a cache miss
+        """
+        scope_key = self._scope_key(prompt_class, template, model)
+        path = self._path(scope_key, task_text)
+        entry = self._read(path)
+        if entry is not None:
+            logger.info(f"Reusing cached meta-prompted template for {prompt_class} ({path.name})")
+            return entry["rewritten_template"]
+
+        if self.similarity_threshold >= 1.0 or not self.cache_dir.exists():
+            return None
+
+        tokens = _task_tokens(task_text)
+        best_entry, best_similarity = None, 0.0
+        for candidate_path in self.cache_dir.glob(f"{scope_key}_*.json"):
+            candidate = self._read(candidate_path)
+            if candidate is None:
+                continue
+            candidate_tokens = set(candidate.get("task_tokens", []))
+            union = tokens | candidate_tokens
+            similarity = len(tokens & candidate_tokens) / len(union) if union else 1.0
+            if similarity >= self.similarity_threshold and similarity > best_similarity:
+                best_entry, best_similarity = candidate, similarity
+
+        if best_entry is not None:
+            logger.info(
+                f"Reusing cached meta-prompted template of a near-identical task for {prompt_class} "
+                f"(similarity {best_similarity:.3f})"
+            )
+            return best_entry["rewritten_template"]
+        return None
+
+    def put(
+        self, prompt_class: str, template: str, task_text: str, model: Optional[str], rewritten_template: str
+    ) -> None:
+        """Store a rewritten template, replacing any previous entry of the same key atomically."""
+        scope_key = self._scope_key(prompt_class, template, model)
+        path = self._path(scope_key, task_text)
+        entry = {
+            "prompt_class": prompt_class,
+            "model": model,
+            "task_tokens": sorted(_task_tokens(task_text)),
+            "created": time.time(),
+            "rewritten_template": rewritten_template,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write meta-prompt cache entry {path}: {e}")
+
+    def clear(self) -> int:
+        """
+        Remove all cached templates.
+
+        Returns:
+            Number of removed entries
+        """
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable meta-prompt cache entry {path}: {e}")
+            return None
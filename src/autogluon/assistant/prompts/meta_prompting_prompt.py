@@ -8,6 +8,7 @@ task and variables to generate customized prompts for other agents.
 import logging
 from typing import Dict
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from .base_prompt import BasePrompt
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,8 @@ class MetaPromptingPrompt(BasePrompt):
         return NotImplementedError
 
     def default_template(self) -> str:
-        return """
+        return (
+            """
 You are a Prompt Engineer. Customize the original template for the specific task while preserving core functionality.
 
 ### Task:
@@ -46,6 +48,9 @@ You are a Prompt Engineer. Customize the original template for the specific task
 2. PRESERVE core structure and variable placeholders (i.e., {<variable_name>})
 3. Use truncation syntax when needed (e.g., {<variable_name>_truncate_end_2048})
 4. Add relevant domain-specific knowledge
+5. If the original template contains the cache marker '"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """', keep it exactly once and keep content that does not change between iterations before it
 
 ### CRITICAL: 
 Your response must contain ONLY the prompt template text. Do NOT:
@@ -57,6 +62,7 @@ Your response must contain ONLY the prompt template text. Do NOT:
 
 Return the customized prompt template as plain text only.
 """
+        )
 
     def _build(self, **kwargs) -> str:
         """Build a prompt for the meta-prompting LLM.
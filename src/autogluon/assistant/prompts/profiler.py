@@ -0,0 +1,152 @@
+"""
+Per-call profiling of prompt composition.
+
+The PromptProfiler records, for every rendered prompt, the size in characters and tokens of
+each substituted variable, the truncation applied, the render time and the latency of the LLM
+call the prompt was sent with. The per-run report ranks variables by their total token cost
+across prompts and iterations.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from ..llm.metrics import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+
+class PromptProfiler:
+    """Thread-safe collector of prompt composition statistics for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+
+    def record_render(
+        self,
+        prompt_name: str,
+        time_step: Optional[int],
+        variables: Dict[str, Dict[str, Any]],
+        prompt_chars: int,
+        prompt_tokens: int,
+        render_seconds: float,
+    ) -> Dict[str, Any]:
+        """
+        Record a rendered prompt.
+
+        Args:
+            prompt_name: Name of the prompt class (one per agent)
+            time_step: Time step of the manager when the prompt was rendered
+            variables: Statistics of each substituted variable, see VariableProvider.render_template
+            prompt_chars: Number of characters of the rendered prompt
+            prompt_tokens: Number of tokens of the rendered prompt
+            render_seconds: Time spent rendering the prompt
+
+        Returns:
+            The call record, to be passed to record_llm_latency
+        """
+        variable_tokens = sum(stats["tokens"] * stats["occurrences"] for stats in variables.values())
+        record = {
+            "prompt": prompt_name,
+            "time_step": time_step,
+            "prompt_chars": prompt_chars,
+            "prompt_tokens": prompt_tokens,
+            "template_tokens": max(prompt_tokens - variable_tokens, 0),
+            "render_seconds": render_seconds,
+            "llm_latency_seconds": None,
+            "variables": variables,
+        }
+        with self._lock:
+            self.calls.append(record)
+        return record
+
+    def record_llm_latency(self, record: Optional[Dict[str, Any]], latency: float) -> None:
+        """Attach the latency of the LLM call to the record of the prompt that was sent."""
+        if record is None:
+            return
+        with self._lock:
+            record["llm_latency_seconds"] = latency
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Aggregate the recorded calls.
+
+        Returns:
+            Dict with the variables ranked by total token cost, per-prompt summaries and the individual calls
+        """
+        with self._lock:
+            calls = list(self.calls)
+
+        variables = defaultdict(
+            lambda: {
+                "total_tokens": 0,
+                "total_chars": 0,
+                "renders": 0,
+                "truncated_renders": 0,
+                "truncated_tokens": 0,
+                "max_tokens": 0,
+                "tokens_by_prompt": defaultdict(int),
+            }
+        )
+        prompts = defaultdict(lambda: {"prompt_tokens": [], "template_tokens": [], "render": [], "llm_latency": []})
+
+        for call in calls:
+            prompt = prompts[call["prompt"]]
+            prompt["prompt_tokens"].append(call["prompt_tokens"])
+            prompt["template_tokens"].append(call["template_tokens"])
+            prompt["render"].append(call["render_seconds"])
+            if call["llm_latency_seconds"] is not None:
+                prompt["llm_latency"].append(call["llm_latency_seconds"])
+
+            for stats in call["variables"].values():
+                tokens = stats["tokens"] * stats["occurrences"]
+                variable = variables[stats["variable"]]
+                variable["total_tokens"] += tokens
+                variable["total_chars"] += stats["chars"] * stats["occurrences"]
+                variable["renders"] += 1
+                variable["max_tokens"] = max(variable["max_tokens"], stats["tokens"])
+                variable["tokens_by_prompt"][call["prompt"]] += tokens
+                if stats["truncated"]:
+                    variable["truncated_renders"] += 1
+                    variable["truncated_tokens"] += stats["original_tokens"] - stats["tokens"]
+
+        total_prompt_tokens = sum(call["prompt_tokens"] for call in calls)
+        ranked_variables = []
+        for name, variable in sorted(variables.items(), key=lambda item: item[1]["total_tokens"], reverse=True):
+            variable["tokens_by_prompt"] = dict(
+                sorted(variable["tokens_by_prompt"].items(), key=lambda item: item[1], reverse=True)
+            )
+            variable["share_of_prompt_tokens"] = (
+                round(variable["total_tokens"] / total_prompt_tokens, 4) if total_prompt_tokens else 0.0
+            )
+            ranked_variables.append({"variable": name, **variable})
+
+        return {
+            "num_calls": len(calls),
+            "total_prompt_tokens": total_prompt_tokens,
+            "variables": ranked_variables,
+            "prompts": {
+                name: {
+                    "calls": len(prompt["prompt_tokens"]),
+                    "total_prompt_tokens": sum(prompt["prompt_tokens"]),
+                    "total_template_tokens": sum(prompt["template_tokens"]),
+                    "render_seconds": summarize_latencies(prompt["render"]),
+                    "llm_latency_seconds": summarize_latencies(prompt["llm_latency"]),
+                }
+                for name, prompt in prompts.items()
+            },
+            "calls": calls,
+        }
+
+    def save_report(self, save_path: str) -> Dict[str, Any]:
+        """Write the report as JSON and return it."""
+        report = self.get_report()
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        with open(save_path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Prompt profile saved to {save_path}")
+        return report
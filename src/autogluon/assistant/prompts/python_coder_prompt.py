@@ -8,9 +8,10 @@ based on task description, data structure, and other context.
 import logging
 from typing import Dict, Optional, Tuple
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from ..utils import get_cpu_count, get_gpu_count
 from .base_prompt import BasePrompt
-from .utils import extract_code
+from .utils import extract_code, has_complete_code_block
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +29,13 @@ This prompt generates executable Python code for the specified task. Make sure t
 """
 
     def default_template(self) -> str:
-        return """
+        # Stable instructions and task context come first so that they can be served from the provider-side
+        # prompt cache, iteration specific content follows the cache breakpoint.
+        return (
+            """
 As an AutoML Agent, you will be given a folder containing data and description files. Please generate Python code using {selected_tool} to train a predictor and make predictions on test data. Follow these specifications:
 
-ONLY save files to the working directory: {per_iteration_output_folder}.
+ONLY save files to the working directory given below.
 
 1. Data preprocessing:
    - Remove training data samples without valid labels (drop NA values from training dataset ONLY, NOT from test dataset) unless explicitly instructed otherwise.
@@ -39,11 +43,11 @@ ONLY save files to the working directory: {per_iteration_output_folder}.
 
 2. Model training:
    - Use {selected_tool} with appropriate parameters for the task
-   - If a model is trained, save it in a folder with random timestamp within {per_iteration_output_folder}
+   - If a model is trained, save it in a folder with random timestamp within the working directory
 
 3. Prediction:
    - Make predictions on the ENTIRE test set, preserving ORIGINAL INDICES to maintain exact row correspondence. NEVER drop any test rows for any reason (including missing values), and ensure the output has the exact same number of rows as the test set.
-   - Save the predicted results to {per_iteration_output_folder}, result file name should be "results", the format and extension should be same as the test data file
+   - Save the predicted results to the working directory, result file name should be "results", the format and extension should be same as the test data file
    - Output column names must exactly match those in the training or sample submission files without adding "predicted_" prefixes or creating any new columns.
    - IMPORTANT: At the end, implement validation checks that assert the prediction file maintains exact test data indices, verify correct column names match requirements, confirm proper output format, verify the number of predictions equals the number of test samples, and if applicable, sanity check output predictions are valid and correct.
 
@@ -60,10 +64,6 @@ ONLY save files to the working directory: {per_iteration_output_folder}.
 
 {tool_prompt}
 
-{code_improvement_prompt}
-
-Please provide the complete Python script that accomplishes these tasks, ensuring it's ready to run given the appropriate data inputs.
-
 ### Task Description
 {task_description}
 
@@ -72,6 +72,13 @@ Please provide the complete Python script that accomplishes these tasks, ensurin
 
 ### User Instruction
 {user_input_truncate_end_2048}
+"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """
+### Working Directory
+{per_iteration_output_folder}
+
+{code_improvement_prompt}
 
 ### Previous Errors
 These errors were encountered across different implementation approaches and may not be directly related to your current implementation. Use them as reference material to identify potential pitfalls and avoid similar mistakes in your implementation.
@@ -79,7 +86,10 @@ These errors were encountered across different implementation approaches and may
 
 ### Tutorials for Reference
 {tutorial_prompt}
+
+Please provide the complete Python script that accomplishes these tasks, ensuring it's ready to run given the appropriate data inputs.
 """
+        )
 
     def get_format_instruction(self) -> str:
         """Get the format instruction to append to the prompt."""
@@ -106,7 +116,8 @@ These errors were encountered across different implementation approaches and may
         prompt = self.render(additional_vars)
 
         # TODO: Remove hardcoding. And add this safeguard for other prompts.
-        if len(prompt) > 80000:
+        # Not needed with context budgeting, which already fits the prompt into the token budget.
+        if self.get_token_budget() is None and len(prompt) > 80000:
             logger.warning(f"Coder's prompt too long: {len(prompt)}. Truncated.")
             self.manager.save_and_log_states(
                 content=prompt,
@@ -171,6 +182,10 @@ Please fix the errors in the code above. Make minimal changes necessary to fix t
 
         return code_improvement_prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """The python code is extracted from the first python code block, so stop once it is closed."""
+        return has_complete_code_block(response, language="python")
+
     def parse(self, response: Dict) -> Tuple[str, Optional[str]]:
         """Parse the LLM's response to generated python code"""
 
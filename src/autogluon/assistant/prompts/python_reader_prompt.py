@@ -3,7 +3,7 @@ import os
 from typing import Dict, Optional, Tuple
 
 from .base_prompt import BasePrompt
-from .utils import extract_code
+from .utils import extract_code, has_complete_code_block
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +82,10 @@ Return ONLY the Python code, no explanations. The code should be self-contained
 
         return prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """The python code is extracted from the first python code block, so stop once it is closed."""
+        return has_complete_code_block(response, language="python")
+
     def parse(self, response: Dict) -> Tuple[str, Optional[str]]:
         """Parse the LLM's response to generated python code"""
 
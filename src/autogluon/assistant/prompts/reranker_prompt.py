@@ -1,6 +1,8 @@
 import logging
+import re
 from typing import List
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from ..tools_registry import TutorialInfo, get_tool_tutorials_folder
 from .base_prompt import BasePrompt
 
@@ -69,7 +71,8 @@ Considerations for rewriting this template:
 
     def default_template(self) -> str:
         """Default template for tutorial selection"""
-        return """
+        return (
+            """
 Given the following context and list of tutorials with their summaries, select the {max_num_tutorials} most relevant tutorials for helping with this task. Consider how well each tutorial's title and summary match the task, data, user question, and any errors.
 
 ### Task Description
@@ -80,7 +83,9 @@ Given the following context and list of tutorials with their summaries, select t
 
 ### User Instruction
 {user_input}
-
+"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """
 ### Previous Error Analysis
 {all_previous_error_analyses}
 
@@ -91,6 +96,7 @@ IMPORTANT: Respond ONLY with the numbers of the selected tutorials (up to {max_n
 For example: "1,3,4" or "2,5" or just "1" if only one is relevant.
 DO NOT include any other text, explanation, or formatting in your response.
 """
+        )
 
     def _build(self, **kwargs) -> str:
         """Build a prompt for the LLM to select relevant tutorials.
@@ -130,6 +136,10 @@ DO NOT include any other text, explanation, or formatting in your response.
 
         return prompt
 
+    def is_response_complete(self, response: str) -> bool:
+        """Only the first non-empty line of the response is parsed for tutorial indices."""
+        return re.search(r"\S[^\n]*\n", response) is not None
+
     def parse(self, response: str) -> List[int]:
         """Parse the LLM response to extract selected tutorial indices."""
 
@@ -138,8 +148,8 @@ DO NOT include any other text, explanation, or formatting in your response.
         )
 
         try:
-            # Clean the response - take first line and keep only digits and commas
-            content = response.split("\n")[0]
+            # Clean the response - take first non-empty line and keep only digits and commas
+            content = response.strip().split("\n")[0]
             content = "".join(char for char in content if char.isdigit() or char == ",")
 
             if not content:
@@ -1,5 +1,8 @@
 import logging
+import re
+from typing import List
 
+from ..constants import PROMPT_CACHE_BREAKPOINT
 from .base_prompt import BasePrompt
 
 logger = logging.getLogger(__name__)
@@ -22,12 +25,19 @@ Considerations for rewriting this template:
 3. Include important dataset characteristics and task requirements
 4. Balance specificity with breadth to ensure relevant tutorials are found
 5. Consider the context of previous errors when formulating search queries
+6. Ask for the number of queries given by num_search_queries, one per line, each covering a different aspect of the task
 """
 
     def default_template(self) -> str:
         """Default template for search query generation"""
-        return """
-You are an expert at generating search queries to find relevant machine learning tutorials. Given the context below, generate a concise and effective search query that will help find the most relevant tutorials for this task.
+        return (
+            """
+You are an expert at generating search queries to find relevant machine learning tutorials. Given the context below, generate up to {num_search_queries} concise and effective search queries that will help find the most relevant tutorials for this task. Start with the main search query; each additional query should cover a different aspect of the task (e.g. the data format, the model or the error to fix).
+
+Each query should:
+1. Include key technical terms and concepts
+2. Focus on the main task/problem to solve
+3. Be concise but specific
 
 ### Task Description
 {task_description}
@@ -38,20 +48,20 @@ You are an expert at generating search queries to find relevant machine learning
 ### User Instruction
 {user_input}
 
-### Previous Error Analysis
-{all_previous_error_analyses}
-
 ### Selected Tool/Library
 {selected_tool}
+"""
+            + PROMPT_CACHE_BREAKPOINT
+            + """
+### Previous Error Analysis
+{all_previous_error_analyses}
 
 
-Based on the above context, generate a search query that will help find tutorials most relevant to this task. The query should:
-1. Include key technical terms and concepts
-2. Focus on the main task/problem to solve
-3. Be concise but specific
+Based on the above context, generate up to {num_search_queries} search queries that will help find tutorials most relevant to this task.
 
-IMPORTANT: Respond ONLY with the search query text. Do not include explanations, quotes, or any other formatting.
+IMPORTANT: Respond ONLY with the search query texts, one per line. Do not include explanations, numbering, quotes, or any other formatting.
 """
+        )
 
     def _build(self, **kwargs) -> str:
         """Build a prompt for the LLM to generate a search query.
@@ -60,8 +70,8 @@ IMPORTANT: Respond ONLY with the search query text. Do not include explanations,
             **kwargs: Additional keyword arguments to customize the prompt building process
         """
 
-        # Render the prompt using the variable provider
-        prompt = self.render()
+        # Render the prompt using the variable provider with additional variables
+        prompt = self.render({"num_search_queries": self.num_search_queries})
 
         self.manager.save_and_log_states(
             content=prompt, save_name="retriever_prompt.txt", per_iteration=True, add_uuid=False
@@ -69,50 +79,67 @@ IMPORTANT: Respond ONLY with the search query text. Do not include explanations,
 
         return prompt
 
-    def parse(self, response: str) -> str:
-        """Parse the LLM response to extract the search query."""
+    @property
+    def num_search_queries(self) -> int:
+        """Maximum number of search queries, the first one is the main query and the others expansions."""
+        return max(1, int(self.llm_config.get("num_queries", 1)))
+
+    def is_response_complete(self, response: str) -> bool:
+        """Only the first num_search_queries non-empty lines are used as search queries."""
+        return len(re.findall(r"\S[^\n]*\n", response)) >= self.num_search_queries
+
+    def parse(self, response: str) -> List[str]:
+        """Parse the LLM response to extract the search queries, main query first."""
 
         self.manager.save_and_log_states(
             content=response, save_name="retriever_response.txt", per_iteration=True, add_uuid=False
         )
 
         try:
-            # Clean the response - take first line and strip whitespace
-            query = response.strip().split("\n")[0].strip()
-
-            # Remove quotes if present
-            query = query.strip("\"'")
+            queries = []
+            for line in response.strip().split("\n"):
+                query = self._clean_query(line)
+                if query and query not in queries:
+                    queries.append(query)
+                if len(queries) == self.num_search_queries:
+                    break
 
             # Basic validation
-            if not query:
+            if not queries:
                 logger.warning("Empty search query generated by LLM")
-                return ""
-
-            # Limit query length for practical purposes
-            if len(query) > 512:
-                query = query[:512]
-                logger.warning("Search query truncated to 512 characters")
-
-            # Remove any unwanted prefixes/suffixes that might indicate explanation
-            unwanted_prefixes = [
-                "search query:",
-                "query:",
-                "the search query is:",
-            ]
-            query_lower = query.lower()
-            for prefix in unwanted_prefixes:
-                if query_lower.startswith(prefix):
-                    query = query[len(prefix) :].strip()
-                    break
+                return []
 
-            logger.info(f"Generated search query: '{query}'")
+            logger.info(f"Generated search queries: {queries}")
 
             self.manager.save_and_log_states(
-                content=query, save_name="parsed_search_query.txt", per_iteration=True, add_uuid=False
+                content="\n".join(queries), save_name="parsed_search_query.txt", per_iteration=True, add_uuid=False
             )
 
-            return query
+            return queries
 
         except Exception as e:
             logger.warning(f"Error parsing search query from LLM response: {e}")
-            return ""
+            return []
+
+    @staticmethod
+    def _clean_query(line: str) -> str:
+        # Remove list markers and quotes if present
+        query = re.sub(r"^\s*(?:\d+[.)]|[-*•])\s+", "", line).strip().strip("\"'")
+
+        # Limit query length for practical purposes
+        if len(query) > 512:
+            query = query[:512]
+            logger.warning("Search query truncated to 512 characters")
+
+        # Remove any unwanted prefixes/suffixes that might indicate explanation
+        unwanted_prefixes = [
+            "search query:",
+            "query:",
+            "the search query is:",
+        ]
+        query_lower = query.lower()
+        for prefix in unwanted_prefixes:
+            if query_lower.startswith(prefix):
+                query = query[len(prefix) :].strip()
+                break
+        return query
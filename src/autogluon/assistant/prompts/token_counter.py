@@ -0,0 +1,110 @@
+"""
+Token counting for prompt budgeting.
+
+This module provides the TokenCounter class used to measure and truncate prompt
+variables in tokens instead of characters. It uses a local tiktoken encoding for
+the configured model family when tiktoken is installed, and falls back to a
+character based estimate otherwise.
+"""
+
+import logging
+import math
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Average number of characters per token used when no tokenizer is available
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Newer OpenAI models use o200k_base. There is no public local tokenizer for Claude models,
+# cl100k_base is used as a close approximation for them and all other model families.
+_O200K_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+
+def _encoding_name_for_model(model: Optional[str]) -> str:
+    model_name = (model or "").lower().split("/")[-1]
+    if model_name.startswith(_O200K_MODEL_PREFIXES):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens of a model family."""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self.encoding = None
+        if tiktoken is not None:
+            encoding_name = _encoding_name_for_model(model)
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                # The encoding files are downloaded on first use, which fails without network access
+                logger.warning(f"Failed to load tokenizer {encoding_name}, estimating tokens from characters: {e}")
+        else:
+            logger.info("tiktoken is not installed, estimating tokens from characters.")
+
+    def count(self, text: str) -> int:
+        """Count the number of tokens in a text."""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / DEFAULT_CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int, mode: str = "end") -> str:
+        """
+        Truncate a text to at most max_tokens tokens.
+
+        Args:
+            text: The text to truncate
+            max_tokens: Maximum number of tokens to keep
+            mode: Which part is removed, one of 'start' (keep the end), 'mid' (keep both ends)
+                  or 'end' (keep the beginning)
+
+        Returns:
+            The truncated text with a marker noting how many tokens were removed
+        """
+        num_tokens = self.count(text)
+        if num_tokens <= max_tokens:
+            return text
+
+        max_tokens = max(max_tokens, 0)
+        tokens = self.encoding.encode(text, disallowed_special=()) if self.encoding is not None else None
+
+        def head(n):
+            if tokens is not None:
+                return self.encoding.decode(tokens[:n])
+            return text[: int(n * len(text) / num_tokens)]
+
+        def tail(n):
+            if n <= 0:
+                return ""
+            if tokens is not None:
+                return self.encoding.decode(tokens[-n:])
+            num_chars = int(n * len(text) / num_tokens)
+            return text[len(text) - num_chars :]
+
+        truncated_text = f"\n[...TRUNCATED ({num_tokens - max_tokens} tokens)...]\n"
+        if mode == "start":
+            return truncated_text + tail(max_tokens)
+        elif mode == "end":
+            return head(max_tokens) + truncated_text
+        elif mode == "mid":
+            half_size = max_tokens // 2
+            return head(half_size) + truncated_text + tail(half_size)
+        else:
+            logger.warning(f"Unknown truncation mode: {mode}")
+            return text
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Get the (cached) token counter for a model."""
+    return TokenCounter(model)
@@ -1,6 +1,6 @@
 import logging
 import re
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 from ..constants import DEFAULT_LIBRARY
 from ..tools_registry import registry
@@ -9,12 +9,13 @@ from .base_prompt import BasePrompt
 logger = logging.getLogger(__name__)
 
 
-def _format_tools_info(tools_info: Dict) -> str:
+def _format_tools_info(tools_info: Dict, tutorial_matches: Optional[Dict[str, List[str]]] = None) -> str:
     """
     Format tools information for the prompt.
 
     Args:
         tools_info: Dictionary containing tool information
+        tutorial_matches: Titles of the tutorials of each tool that best match the task
 
     Returns:
         str: Formatted string of tool information
@@ -24,6 +25,9 @@ def _format_tools_info(tools_info: Dict) -> str:
         formatted_info += f"Library Name: {tool_name}\n"
         formatted_info += f"Version: v{info['version']}\n"
         formatted_info += f"Description: {info['description']}\n"
+        if tutorial_matches is not None:
+            titles = tutorial_matches.get(tool_name)
+            formatted_info += f"Tutorials Matching the Task: {'; '.join(titles) if titles else 'None'}\n"
         formatted_info += "\n\n"
     return formatted_info
 
@@ -83,15 +87,17 @@ Requirements for your response:
 Do not include any other formatting or additional sections in your response.
 """
 
-    def _build(self, **kwargs) -> str:
+    def _build(self, tutorial_matches: Optional[Dict[str, List[str]]] = None, **kwargs) -> str:
         """Build a prompt for the LLM to select appropriate library.
 
         Args:
+            tutorial_matches: Titles of the tutorials of each tool that best match the task, from a search
+                across the tutorials of all tools; not shown if None or empty
             **kwargs: Additional keyword arguments to customize the prompt building process
         """
 
         # Render the prompt using the variable provider with additional variables
-        additional_vars = {"tools_info": _format_tools_info(registry.tools)}
+        additional_vars = {"tools_info": _format_tools_info(registry.tools, tutorial_matches or None)}
 
         prompt = self.render(additional_vars)
 
@@ -48,3 +48,17 @@ def extract_code(response, language):
         result = response
 
     return result
+
+
+def has_complete_code_block(response, language):
+    """Check whether the (partial) response already contains a closed code block of the language."""
+    pattern = rf"```{language}\s*\n(.*?)```"
+    return re.search(pattern, response, re.DOTALL) is not None
+
+
+def has_complete_fields(response, fields):
+    """Check whether every "FIELD: value" line of the (partial) response is present and terminated."""
+    for field in fields:
+        if re.search(rf"{field}:[^\n]*\S[^\n]*\n", response) is None:
+            return False
+    return True
@@ -7,12 +7,99 @@ and rendering templates with those values.
 
 import logging
 import re
-from typing import Any, Dict, List, Set, Tuple
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+from .token_counter import TokenCounter, get_token_counter
 from .variables import registry
 
 logger = logging.getLogger(__name__)
 
+# Priority, minimum share and truncation mode of variables that are not in the registry
+DEFAULT_BUDGET_SPEC = (50, 0.05, "mid")
+
+# Variables up to this size are never truncated when packing a prompt into a token budget
+SMALL_VARIABLE_TOKENS = 256
+
+# Tokens reserved for the marker inserted into truncated variables
+TRUNCATION_MARKER_TOKENS = 16
+
+# This regex finds all {variable_name} patterns
+# but ignores escaped braces like \{not_a_variable\}
+# and excludes any {} that contain < or > characters
+VARIABLE_PATTERN = re.compile(r"(?<!\\){([^{}<>]+)}")
+
+# Format: variable_name_truncate_mode_length
+TRUNCATION_PATTERN = re.compile(r"^(.+)_truncate_(start|mid|end)_(\d+)$")
+
+
+class TemplateVariable(NamedTuple):
+    """A variable placeholder of a compiled template with its pre-parsed truncation directive."""
+
+    placeholder: str  # Variable name as written in the template, including the truncation directive
+    base_name: str
+    truncate_mode: Optional[str]
+    max_length: Optional[int]
+
+
+class CompiledTemplate(NamedTuple):
+    """A template split into literal text and variable segments."""
+
+    segments: Tuple[Union[str, TemplateVariable], ...]
+    variables: Dict[str, TemplateVariable]  # Unique variables by placeholder, in order of first appearance
+
+
+def parse_variable_with_truncation(var_name: str) -> Tuple[str, Optional[str], Optional[int]]:
+    """
+    Parse variable name to extract truncation directive if present.
+    Format: variable_name_truncate_mode_length
+    Examples:
+    - xxx_truncate_mid_2048 -> truncate in middle to 2048 chars
+    - xxx_truncate_start_4096 -> truncate from start to 4096 chars
+    - xxx_truncate_end_1024 -> truncate from end to 1024 chars
+
+    Args:
+        var_name: The variable name to parse
+
+    Returns:
+        Tuple of (base_var_name, truncate_mode, max_length)
+        - truncate_mode is one of 'start', 'mid', 'end' or None
+        - max_length is an integer or None
+    """
+    match = TRUNCATION_PATTERN.match(var_name)
+    if match:
+        return match.group(1), match.group(2), int(match.group(3))
+    return var_name, None, None
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Compile a template into literal and variable segments. Results are cached per template string,
+    so each template is only parsed once.
+
+    Args:
+        template: The template string
+
+    Returns:
+        The compiled template
+    """
+    segments = []
+    variables = {}
+    position = 0
+    for match in VARIABLE_PATTERN.finditer(template):
+        if match.start() > position:
+            segments.append(template[position : match.start()])
+        placeholder = match.group(1)
+        if placeholder not in variables:
+            variables[placeholder] = TemplateVariable(placeholder, *parse_variable_with_truncation(placeholder))
+        segments.append(variables[placeholder])
+        position = match.end()
+    if position < len(template):
+        segments.append(template[position:])
+    return CompiledTemplate(tuple(segments), variables)
+
 
 class VariableProvider:
     """Provides variable values for prompt templates."""
@@ -26,7 +113,57 @@ class VariableProvider:
         """
         self.manager = manager
 
+        # Memoized variable values, valid as long as the manager state key does not change. Prompts can be
+        # rendered from several threads, so the memo is only read and swapped under the lock.
+        self._value_cache: Dict[str, Any] = {}
+        self._value_cache_key = None
+        self._value_cache_lock = threading.Lock()
+
+    def _get_state_key(self) -> Optional[Tuple]:
+        """
+        Key identifying the manager state that variable values are derived from.
+
+        Only managers exposing a state_version counter (bumped whenever prompt-relevant state changes)
+        support memoization; None disables it.
+        """
+        state_version = getattr(self.manager, "state_version", None)
+        if state_version is None:
+            return None
+        return (
+            getattr(self.manager, "time_step", None),
+            id(getattr(self.manager, "current_node", None)),
+            state_version,
+        )
+
     def get_value(self, var_name: str) -> Any:
+        """
+        Get the value for a variable, memoized per manager state.
+
+        Args:
+            var_name: The variable name (can be an alias)
+
+        Returns:
+            The variable value
+        """
+        state_key = self._get_state_key()
+        if state_key is None:
+            return self._resolve_value(var_name)
+
+        with self._value_cache_lock:
+            if state_key != self._value_cache_key:
+                self._value_cache = {}
+                self._value_cache_key = state_key
+            if var_name in self._value_cache:
+                return self._value_cache[var_name]
+
+        # Resolve outside the lock, and only keep the value if the state did not change meanwhile
+        value = self._resolve_value(var_name)
+        with self._value_cache_lock:
+            if self._value_cache_key == state_key and self._get_state_key() == state_key:
+                self._value_cache.setdefault(var_name, value)
+        return value
+
+    def _resolve_value(self, var_name: str) -> Any:
         """
         Get the value for a variable.
 
@@ -115,11 +252,7 @@ class VariableProvider:
         Returns:
             Set of variable names
         """
-        # This regex finds all {variable_name} patterns
-        # but ignores escaped braces like \{not_a_variable\}
-        # and excludes any {} that contain < or > characters
-        pattern = r"(?<!\\){([^{}<>]+)}"
-        return set(re.findall(pattern, template))
+        return set(compile_template(template).variables)
 
     def validate_template(self, template: str) -> List[str]:
         """
@@ -143,33 +276,8 @@ class VariableProvider:
         return errors
 
     def _parse_variable_with_truncation(self, var_name: str) -> Tuple[str, str, int]:
-        """
-        Parse variable name to extract truncation directive if present.
-        Format: variable_name_truncate_mode_length
-        Examples:
-        - xxx_truncate_mid_2048 -> truncate in middle to 2048 chars
-        - xxx_truncate_start_4096 -> truncate from start to 4096 chars
-        - xxx_truncate_end_1024 -> truncate from end to 1024 chars
-
-        Args:
-            var_name: The variable name to parse
-
-        Returns:
-            Tuple of (base_var_name, truncate_mode, max_length)
-            - truncate_mode is one of 'start', 'mid', 'end' or None
-            - max_length is an integer or None
-        """
-        # Check for truncation directive pattern
-        pattern = r"^(.+)_truncate_(start|mid|end)_(\d+)$"
-        match = re.match(pattern, var_name)
-
-        if match:
-            base_var_name = match.group(1)
-            truncate_mode = match.group(2)
-            max_length = int(match.group(3))
-            return base_var_name, truncate_mode, max_length
-
-        return var_name, None, None
+        """Parse variable name to extract truncation directive if present, see parse_variable_with_truncation."""
+        return parse_variable_with_truncation(var_name)
 
     def _truncate_value(self, value: str, truncate_mode: str, max_length: int) -> str:
         """
@@ -204,13 +312,136 @@ class VariableProvider:
             logger.warning(f"Unknown truncation mode: {truncate_mode}")
             return value
 
-    def render_template(self, template: str) -> str:
+    def _get_budget_spec(self, var_name: str) -> Tuple[int, float, str]:
+        """Get the packing priority, minimum share and truncation mode of a variable."""
+        try:
+            var_info = registry.get_variable_info(var_name)
+        except ValueError:
+            # Prompt-specific variables passed as additional variables are not registered
+            return DEFAULT_BUDGET_SPEC
+        return var_info.priority, var_info.min_share, var_info.truncate_mode
+
+    def _pack_values(
+        self, compiled: CompiledTemplate, values: Dict[str, str], token_budget: int, token_counter: TokenCounter
+    ) -> Dict[str, str]:
+        """
+        Fit the variable values into the token budget of the rendered template.
+
+        Each variable first gets its minimum share of the budget (or less if it needs less), the
+        remaining budget is then assigned in order of priority. Variables exceeding their allocation
+        are truncated in tokens using the mode of their truncation directive or definition.
+        Small variables (paths, names, numbers, ...) are never truncated.
+
+        Args:
+            compiled: The compiled template
+            values: Map of template variables (including truncation directives) to their values
+            token_budget: Maximum number of tokens of the rendered template
+            token_counter: Token counter of the target model
+
+        Returns:
+            Map of template variables to the packed values
+        """
+        fixed_text = "".join(segment for segment in compiled.segments if isinstance(segment, str))
+
+        occurrences = {var: 0 for var in values}
+        for segment in compiled.segments:
+            if isinstance(segment, TemplateVariable) and segment.placeholder in occurrences:
+                occurrences[segment.placeholder] += 1
+        needs = {var: token_counter.count(value) * occurrences[var] for var, value in values.items()}
+
+        packable = [var for var in values if needs[var] > SMALL_VARIABLE_TOKENS]
+        fixed_tokens = token_counter.count(fixed_text) + sum(needs[var] for var in values if var not in packable)
+        available = token_budget - fixed_tokens
+        if available <= 0:
+            logger.warning(f"Prompt template needs {fixed_tokens} tokens, exceeding the budget of {token_budget}.")
+            available = 0
+
+        if sum(needs[var] for var in packable) <= available:
+            return values
+
+        specs = {}
+        for var in packable:
+            variable = compiled.variables[var]
+            priority, min_share, default_mode = self._get_budget_spec(variable.base_name)
+            specs[var] = (priority, min_share, variable.truncate_mode or default_mode)
+
+        # 1. Reserve the minimum share of each variable
+        allocation = {var: min(needs[var], int(specs[var][1] * available)) for var in packable}
+        reserved = sum(allocation.values())
+        if reserved > available:
+            scale = available / reserved
+            allocation = {var: int(tokens * scale) for var, tokens in allocation.items()}
+
+        # 2. Assign the remaining budget by priority, ties broken by order of appearance (packable is ordered)
+        remaining = available - sum(allocation.values())
+        for var in sorted(packable, key=lambda v: -specs[v][0]):
+            extra = min(needs[var] - allocation[var], remaining)
+            allocation[var] += extra
+            remaining -= extra
+
+        # 3. Truncate the variables that did not get all the tokens they need
+        packed = dict(values)
+        for var in packable:
+            if allocation[var] < needs[var]:
+                max_tokens = max(allocation[var] // occurrences[var] - TRUNCATION_MARKER_TOKENS, 0)
+                packed[var] = token_counter.truncate(values[var], max_tokens, mode=specs[var][2])
+                logger.info(f"Truncated prompt variable {var} from {needs[var]} to {allocation[var]} tokens.")
+
+        return packed
+
+    @staticmethod
+    def _collect_render_stats(
+        compiled: CompiledTemplate,
+        original_values: Dict[str, str],
+        values: Dict[str, str],
+        token_counter: TokenCounter,
+        render_stats: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Record the size before and after truncation of each substituted variable."""
+        occurrences = {}
+        for segment in compiled.segments:
+            if isinstance(segment, TemplateVariable):
+                occurrences[segment.placeholder] = occurrences.get(segment.placeholder, 0) + 1
+
+        for var, value in values.items():
+            original_value = original_values.get(var, value)
+            tokens = token_counter.count(value)
+            render_stats[var] = {
+                "variable": compiled.variables[var].base_name,
+                "occurrences": occurrences.get(var, 0),
+                "chars": len(value),
+                "tokens": tokens,
+                "original_chars": len(original_value),
+                "original_tokens": token_counter.count(original_value) if original_value != value else tokens,
+                "truncated": original_value != value,
+            }
+
+    def render_template(
+        self,
+        template: str,
+        additional_vars: Optional[Dict[str, Any]] = None,
+        token_budget: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None,
+        render_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> str:
         """
         Render a template by replacing variables with their values.
         Supports truncation syntax: {variable_name_truncate_mode_length}
 
+        The template is compiled once (and cached) into literal and variable segments, so rendering
+        is a single pass over the segments.
+
+        If a token budget is given, the character lengths of truncation directives are ignored and the
+        variables are instead packed into the budget in tokens (see _pack_values).
+
         Args:
             template: The template string
+            additional_vars: Additional variables to use for this rendering only, taking precedence
+                over the values provided by the manager
+            token_budget: Optional maximum number of tokens of the rendered template
+            token_counter: Token counter used with token_budget
+            render_stats: Optional dict filled with the size (in characters and tokens) and the truncation
+                of each substituted variable, used for prompt profiling
 
         Returns:
             The rendered template
@@ -218,25 +449,37 @@ class VariableProvider:
         if not template:
             return ""
 
-        template_vars = self.extract_variables_from_template(template)
-        rendered = template
+        compiled = compile_template(template)
+        values = {}
+        original_values = {}
 
-        for var in template_vars:
+        for var, variable in compiled.variables.items():
             try:
-                # Parse variable name for possible truncation directive
-                base_var_name, truncate_mode, max_length = self._parse_variable_with_truncation(var)
-
                 # Get the value for the base variable name
-                value = self.get_value(base_var_name)
+                if additional_vars and variable.base_name in additional_vars:
+                    value = additional_vars[variable.base_name]
+                else:
+                    value = self.get_value(variable.base_name)
+                original_values[var] = str(value or "")
 
                 # Apply truncation if specified
-                if truncate_mode and max_length and isinstance(value, str):
-                    value = self._truncate_value(value, truncate_mode, max_length)
+                if token_budget is None and variable.truncate_mode and variable.max_length and isinstance(value, str):
+                    value = self._truncate_value(value, variable.truncate_mode, variable.max_length)
 
-                # Replace {var} with the actual value
-                rendered = rendered.replace(f"{{{var}}}", str(value or ""))
+                values[var] = str(value or "")
             except Exception as e:
                 logger.warning(f"Error rendering variable {var}: {e}")
                 # Leave the variable in place if there's an error
 
-        return rendered
+        if token_budget is not None:
+            values = self._pack_values(compiled, values, token_budget, token_counter or get_token_counter())
+
+        if render_stats is not None:
+            self._collect_render_stats(
+                compiled, original_values, values, token_counter or get_token_counter(), render_stats
+            )
+
+        return "".join(
+            segment if isinstance(segment, str) else values.get(segment.placeholder, f"{{{segment.placeholder}}}")
+            for segment in compiled.segments
+        )
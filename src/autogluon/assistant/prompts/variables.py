@@ -20,6 +20,9 @@ class VariableDefinition:
         description: str,
         aliases: Optional[List[str]] = None,
         deprecated_aliases: Optional[List[str]] = None,
+        priority: int = 0,
+        min_share: float = 0.0,
+        truncate_mode: str = "end",
     ):
         """
         Initialize variable definition.
@@ -29,11 +32,19 @@ class VariableDefinition:
             description: Description of what this variable represents
             aliases: Alternative names that can be used for this variable
             deprecated_aliases: Older names that should be avoided
+            priority: Order in which the remaining token budget is assigned when packing a prompt
+                (higher first)
+            min_share: Fraction of the token budget for variables that is reserved for this variable
+            truncate_mode: Which part is cut when the variable exceeds its token budget,
+                one of 'start', 'mid' or 'end'
         """
         self.name = name
         self.description = description
         self.aliases = aliases or []
         self.deprecated_aliases = deprecated_aliases or []
+        self.priority = priority
+        self.min_share = min_share
+        self.truncate_mode = truncate_mode
 
     def get_all_names(self) -> Set[str]:
         """Get all possible names for this variable (canonical + aliases)."""
@@ -61,6 +72,9 @@ class VariableRegistry:
                 name="user_input",
                 description="User instructions and requirements",
                 aliases=["user_prompt"],
+                priority=100,
+                min_share=0.05,
+                truncate_mode="end",
             )
         )
 
@@ -69,6 +83,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="task_description",
                 description="Description of the ML task to be performed",
+                priority=90,
+                min_share=0.1,
+                truncate_mode="end",
             )
         )
 
@@ -77,6 +94,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="data_prompt",
                 description="Information about data structure and files",
+                priority=80,
+                min_share=0.1,
+                truncate_mode="end",
             )
         )
 
@@ -93,6 +113,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="error_message",
                 description="Error message in the current iteration",
+                priority=90,
+                min_share=0.1,
+                truncate_mode="mid",
             )
         )
 
@@ -101,14 +124,33 @@ class VariableRegistry:
             VariableDefinition(
                 name="all_previous_error_analyses",
                 description="Error analysis in all completed iterations",
+                priority=50,
+                min_share=0.05,
+                truncate_mode="start",
             )
         )
 
         # Code-related variables
-        self.register(VariableDefinition(name="python_code", description="Python code of current iteration"))
+        self.register(
+            VariableDefinition(
+                name="python_code",
+                description="Python code of current iteration",
+                priority=85,
+                min_share=0.1,
+                truncate_mode="mid",
+            )
+        )
 
         # Code-related variables
-        self.register(VariableDefinition(name="previous_python_code", description="Python code of previous iteration"))
+        self.register(
+            VariableDefinition(
+                name="previous_python_code",
+                description="Python code of previous iteration",
+                priority=40,
+                min_share=0.05,
+                truncate_mode="mid",
+            )
+        )
 
         self.register(
             VariableDefinition(
@@ -121,6 +163,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="bash_script",
                 description="Bash script of current iter",
+                priority=60,
+                min_share=0.02,
+                truncate_mode="mid",
             )
         )
 
@@ -128,6 +173,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="previous_bash_script",
                 description="Bash script of previous iter",
+                priority=30,
+                min_share=0.02,
+                truncate_mode="mid",
             )
         )
 
@@ -152,6 +200,9 @@ class VariableRegistry:
                 name="tool_prompt",
                 description="Information about selected tools",
                 aliases=["tools_info"],
+                priority=60,
+                min_share=0.05,
+                truncate_mode="end",
             )
         )
 
@@ -160,6 +211,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="tutorial_prompt",
                 description="Relevant tutorial information of current iteration",
+                priority=20,
+                min_share=0.1,
+                truncate_mode="end",
             )
         )
 
@@ -168,6 +222,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="previous_tutorial_prompt",
                 description="Relevant tutorial information in previous iteration",
+                priority=10,
+                min_share=0.0,
+                truncate_mode="end",
             )
         )
 
@@ -176,6 +233,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="stdout",
                 description="Standard output from code execution",
+                priority=70,
+                min_share=0.1,
+                truncate_mode="start",
             )
         )
 
@@ -183,6 +243,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="stderr",
                 description="Standard error from code execution",
+                priority=75,
+                min_share=0.1,
+                truncate_mode="start",
             )
         )
 
@@ -199,6 +262,9 @@ class VariableRegistry:
             VariableDefinition(
                 name="code_improvement_prompt",
                 description="Examples of high-quality code",
+                priority=85,
+                min_share=0.1,
+                truncate_mode="mid",
             )
         )
 
@@ -229,6 +295,17 @@ class VariableRegistry:
             VariableDefinition(
                 name="description_file_contents",
                 description="Contents of identified description files",
+                priority=70,
+                min_share=0.1,
+                truncate_mode="end",
+            )
+        )
+
+        # Retriever related
+        self.register(
+            VariableDefinition(
+                name="num_search_queries",
+                description="Maximum number of search queries to generate",
             )
         )
 
@@ -29,3 +29,6 @@ class TutorialInfo(NamedTuple):
     summary: str
     score: Optional[float] = None
     content: Optional[str] = None
+    # Cosine similarity and BM25 score of the tutorial, None if it is not in that ranking
+    dense_score: Optional[float] = None
+    bm25_score: Optional[float] = None
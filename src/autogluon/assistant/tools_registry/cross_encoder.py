@@ -0,0 +1,171 @@
+"""
+Local cross-encoder scoring of tutorials.
+
+The LLM reranker sends the summaries of all retrieved tutorials with the full task context to the
+reranker LLM. A bge-reranker cross-encoder scores (query, tutorial) pairs directly on the CPU in
+batches instead, with FlagEmbedding's FlagReranker or, for lower latency, an ONNX export of the
+model run with onnxruntime (through optimum). Models are loaded once per process and shared.
+"""
+
+import contextlib
+import io
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSS_ENCODER_MODEL = "BAAI/bge-reranker-base"
+CROSS_ENCODER_BACKENDS = ["torch", "onnx"]
+
+_cross_encoders: Dict[Tuple[str, str, Optional[str]], "CrossEncoderReranker"] = {}
+_cross_encoders_lock = threading.Lock()
+
+
+class CrossEncoderReranker:
+    """bge-reranker cross-encoder scoring (query, passage) pairs in batches."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CROSS_ENCODER_MODEL,
+        backend: str = "torch",
+        onnx_path: Optional[str] = None,
+        device: str = "cpu",
+        batch_size: int = 16,
+        max_length: int = 512,
+    ):
+        """
+        Configure the cross-encoder, the model is loaded on the first call to score.
+
+        Args:
+            model_name: Name or path of the bge-reranker model
+            backend: "torch" (FlagReranker) or "onnx" (onnxruntime through optimum)
+            onnx_path: Folder of an exported ONNX model; if None, model_name is exported on load
+            device: Device of the torch backend
+            batch_size: Number of pairs scored per forward pass
+            max_length: Maximum number of tokens of a (query, passage) pair
+        """
+        if backend not in CROSS_ENCODER_BACKENDS:
+            raise ValueError(f"Unknown cross-encoder backend {backend}, expected one of {CROSS_ENCODER_BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_path = onnx_path
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.model = None
+        self.tokenizer = None
+        # Forward passes are not thread-safe on every backend
+        self._lock = threading.Lock()
+
+    def _load_model(self) -> None:
+        if self.model is not None:
+            return
+        logger.info(f"Loading cross-encoder {self.model_name} ({self.backend})")
+        if self.backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                from transformers import AutoTokenizer
+            except ImportError as e:
+                raise ImportError(
+                    "The onnx cross-encoder backend requires optimum and onnxruntime: "
+                    "pip install 'optimum[onnxruntime]'"
+                ) from e
+            source = self.onnx_path or self.model_name
+            self.tokenizer = AutoTokenizer.from_pretrained(source)
+            self.model = ORTModelForSequenceClassification.from_pretrained(source, export=self.onnx_path is None)
+        else:
+            from FlagEmbedding import FlagReranker
+
+            self.model = FlagReranker(
+                self.model_name,
+                use_fp16=False,
+                devices=self.device,
+                batch_size=self.batch_size,
+                max_length=self.max_length,
+            )
+        logger.info("Cross-encoder loaded successfully")
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        """
+        Score the relevance of passages to a query.
+
+        Args:
+            query: Query text
+            passages: Passages to score
+
+        Returns:
+            Relevance in [0, 1] of each passage, in the order of passages
+        """
+        if not passages:
+            return []
+        with self._lock:
+            self._load_model()
+            pairs = [[query, passage] for passage in passages]
+            if self.backend == "onnx":
+                return self._score_onnx(pairs)
+            with contextlib.redirect_stderr(io.StringIO()):
+                scores = self.model.compute_score(
+                    pairs, batch_size=self.batch_size, max_length=self.max_length, normalize=True
+                )
+            return [float(s) for s in np.atleast_1d(scores)]
+
+    def _score_onnx(self, pairs: List[List[str]]) -> List[float]:
+        scores = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start : start + self.batch_size]
+            inputs = self.tokenizer(
+                [query for query, _ in batch],
+                [passage for _, passage in batch],
+                padding=True,
+                truncation="only_second",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            logits = np.asarray(self.model(**inputs).logits, dtype=np.float32).reshape(len(batch), -1)[:, 0]
+            scores.extend((1 / (1 + np.exp(-logits))).tolist())
+        return scores
+
+    def cleanup(self) -> None:
+        """Release the model, it is loaded again on the next call to score."""
+        with self._lock:
+            self.model = None
+            self.tokenizer = None
+
+
+def get_cross_encoder(
+    model_name: str = DEFAULT_CROSS_ENCODER_MODEL,
+    backend: str = "torch",
+    onnx_path: Optional[str] = None,
+    device: str = "cpu",
+    batch_size: int = 16,
+    max_length: int = 512,
+) -> CrossEncoderReranker:
+    """
+    Get the cross-encoder of this process for a model and backend, created on the first call.
+
+    Args:
+        model_name: Name or path of the bge-reranker model
+        backend: "torch" or "onnx"
+        onnx_path: Folder of an exported ONNX model
+        device: Device of the torch backend
+        batch_size: Number of pairs scored per forward pass
+        max_length: Maximum number of tokens of a (query, passage) pair
+
+    Returns:
+        The shared CrossEncoderReranker
+    """
+    key = (model_name, backend, onnx_path)
+    with _cross_encoders_lock:
+        if key not in _cross_encoders:
+            _cross_encoders[key] = CrossEncoderReranker(
+                model_name,
+                backend=backend,
+                onnx_path=onnx_path,
+                device=device,
+                batch_size=batch_size,
+                max_length=max_length,
+            )
+        return _cross_encoders[key]
@@ -0,0 +1,492 @@
+"""
+Shared embedding and tutorial search service.
+
+Loading the BGE model and the tutorial indices takes seconds and hundreds of MB, so they are
+loaded once per process by get_embedding_service, which returns a process-wide EmbeddingService
+shared by all retrievers and managers. Encoding requests of concurrent callers are collected for
+a few milliseconds and encoded as one batch.
+
+Runs in separate processes (e.g. the WebUI queue, which starts a process per task) can share a
+single resident service: `mlzero embedding-service --socket PATH` serves it on a Unix socket, and
+get_embedding_service returns an EmbeddingServiceClient when a socket path is configured and the
+daemon is reachable, falling back to the in-process service otherwise.
+"""
+
+import atexit
+import base64
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .indexing import ANN_MIN_VECTORS, ANN_RECALL_TARGET, IVFPQ_MIN_VECTORS, TutorialIndexer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
+# Used when no socket path is configured
+EMBEDDING_SOCKET_ENV = "MLZERO_EMBEDDING_SOCKET"
+
+_services: Dict[Tuple[str, str], "EmbeddingService"] = {}
+_services_lock = threading.Lock()
+
+
+class _MicroBatcher:
+    """Collects the texts of concurrent encode calls and encodes them in batches on one thread."""
+
+    def __init__(self, encode_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _run(self) -> None:
+        while True:
+            requests = [self._queue.get()]
+            num_texts = len(requests[0][0])
+            # Wait briefly for other callers, so that their texts are encoded in the same batch
+            while num_texts < self.max_batch_size:
+                try:
+                    request = self._queue.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                num_texts += len(request[0])
+
+            texts = [text for request_texts, _ in requests for text in request_texts]
+            try:
+                embeddings = self.encode_fn(texts) if texts else None
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future in requests:
+                future.set_result(embeddings[offset : offset + len(request_texts)] if request_texts else None)
+                offset += len(request_texts)
+
+
+class EmbeddingService:
+    """Process-wide embedding model and tutorial indices, with micro-batched encoding."""
+
+    def __init__(
+        self,
+        embedding_model_name: str = DEFAULT_EMBEDDING_MODEL,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        chunk_size: Optional[int] = None,
+        embedding_backend: str = "torch",
+        num_threads: Optional[int] = None,
+        warmup: bool = False,
+        ann_config: Optional[Dict] = None,
+        update_indices: Optional[bool] = None,
+    ):
+        """
+        Load the tutorial indices, updating them if tutorials were added or changed.
+
+        Args:
+            embedding_model_name: Name of the BGE embedding model
+            max_batch_size: Maximum number of texts encoded in one batch
+            max_wait_ms: Time to wait for other encode calls before encoding a batch
+            chunk_size: Maximum size of the indexed tutorial sections, None to index summaries only
+            embedding_backend: "torch" or "onnx_int8", see TutorialIndexer
+            num_threads: Threads used by the embedding model within an encode call
+            warmup: Whether to load the model now rather than on the first query
+            ann_config: Approximate index settings of large tutorial groups, with the keys min_vectors,
+                ivfpq_min_vectors and recall_target, see TutorialIndexer
+            update_indices: Whether to bring the indices up to date with the tutorials. If None, they are
+                updated only if a tutorial folder or file was modified after they were saved; if False,
+                only missing indices are built
+        """
+        self.embedding_model_name = embedding_model_name
+        self.embedding_backend = embedding_backend
+        ann_config = ann_config or {}
+        self.indexer = TutorialIndexer(
+            embedding_model_name=embedding_model_name,
+            chunk_size=chunk_size,
+            embedding_backend=embedding_backend,
+            num_threads=num_threads,
+            ann_min_vectors=ann_config.get("min_vectors", ANN_MIN_VECTORS),
+            ivfpq_min_vectors=ann_config.get("ivfpq_min_vectors", IVFPQ_MIN_VECTORS),
+            ann_recall_target=ann_config.get("recall_target", ANN_RECALL_TARGET),
+        )
+        self.indexer.load_indices()
+        if update_indices is None:
+            # Stat the tutorials rather than hashing them all on every start
+            update_indices = self.indexer.needs_update()
+        if update_indices or self.indexer.index is None:
+            # Only tutorials added or changed since the indices were saved are embedded
+            self.indexer.update_indices()
+        if warmup:
+            self.indexer.warmup()
+        self._batcher = _MicroBatcher(self.indexer.encode, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, batched with the concurrent calls of other callers.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            L2-normalized float32 embeddings, one row per text
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._batcher.encode(texts)
+
+    def enable_chunk_index(self, chunk_size: int) -> None:
+        """Index the sections of the tutorials with this chunk size, if they are not already."""
+        if self.indexer.chunk_size != chunk_size:
+            self.indexer.chunk_size = chunk_size
+            self.indexer.update_indices()
+
+    def search(
+        self,
+        query: str,
+        tool_name: str,
+        condensed: bool = False,
+        top_k: int = 5,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
+        """Search the tutorials of a tool, see TutorialIndexer.search."""
+        return self.indexer.search(
+            query,
+            tool_name,
+            condensed=condensed,
+            top_k=top_k,
+            encode_fn=self.encode,
+            hybrid=hybrid,
+            rrf_k=rrf_k,
+            chunked=chunked,
+            chunk_neighbours=chunk_neighbours,
+            max_sections=max_sections,
+        )
+
+    def search_many(
+        self,
+        queries: List[str],
+        tools: List[str],
+        condensed: bool = False,
+        top_k: int = 5,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
+        """Search the tutorials of several tools with several queries at once, see TutorialIndexer.search_many."""
+        return self.indexer.search_many(
+            queries,
+            tools,
+            condensed=condensed,
+            top_k=top_k,
+            encode_fn=self.encode,
+            hybrid=hybrid,
+            rrf_k=rrf_k,
+            chunked=chunked,
+            chunk_neighbours=chunk_neighbours,
+            max_sections=max_sections,
+        )
+
+    def get_all_summaries(self, tool_name: str, condensed: bool = False) -> List[Dict]:
+        return self.indexer.get_all_summaries(tool_name, condensed=condensed)
+
+    def cleanup(self) -> None:
+        """Release the embedding model, it is loaded again on the next encode call."""
+        self.indexer.cleanup()
+
+
+def _encode_array(array: np.ndarray) -> Dict:
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def _decode_array(payload: Dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+
+class EmbeddingServiceClient:
+    """Client of an embedding service daemon, with the same interface as EmbeddingService."""
+
+    def __init__(self, socket_path: str, timeout: float = 300):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, payload: Dict):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+                stream.flush()
+                response = json.loads(stream.readline())
+        if "error" in response:
+            raise RuntimeError(f"Embedding service error: {response['error']}")
+        return response["result"]
+
+    def ping(self) -> Dict:
+        return self._request({"op": "ping"})
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return _decode_array(self._request({"op": "encode", "texts": list(texts)}))
+
+    def search(
+        self,
+        query: str,
+        tool_name: str,
+        condensed: bool = False,
+        top_k: int = 5,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
+        return self._request(
+            {
+                "op": "search",
+                "query": query,
+                "tool_name": tool_name,
+                "condensed": condensed,
+                "top_k": top_k,
+                "hybrid": hybrid,
+                "rrf_k": rrf_k,
+                "chunked": chunked,
+                "chunk_neighbours": chunk_neighbours,
+                "max_sections": max_sections,
+            }
+        )
+
+    def search_many(
+        self,
+        queries: List[str],
+        tools: List[str],
+        condensed: bool = False,
+        top_k: int = 5,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
+        return self._request(
+            {
+                "op": "search_many",
+                "queries": list(queries),
+                "tools": list(tools),
+                "condensed": condensed,
+                "top_k": top_k,
+                "hybrid": hybrid,
+                "rrf_k": rrf_k,
+                "chunked": chunked,
+                "chunk_neighbours": chunk_neighbours,
+                "max_sections": max_sections,
+            }
+        )
+
+    def get_all_summaries(self, tool_name: str, condensed: bool = False) -> List[Dict]:
+        return self._request({"op": "get_all_summaries", "tool_name": tool_name, "condensed": condensed})
+
+    def enable_chunk_index(self, chunk_size: int) -> None:
+        """Sections are indexed if the daemon was started with --chunk-size, else searches return whole tutorials."""
+
+    def cleanup(self) -> None:
+        """Nothing to release, the model is owned by the daemon."""
+
+
+def get_embedding_service(
+    embedding_model_name: str = DEFAULT_EMBEDDING_MODEL,
+    socket_path: Optional[str] = None,
+    max_batch_size: int = 64,
+    max_wait_ms: float = 5.0,
+    chunk_size: Optional[int] = None,
+    embedding_backend: str = "torch",
+    num_threads: Optional[int] = None,
+    warmup: bool = False,
+    ann_config: Optional[Dict] = None,
+    update_indices: Optional[bool] = None,
+):
+    """
+    Get the shared embedding service.
+
+    Args:
+        embedding_model_name: Name of the BGE embedding model
+        socket_path: Unix socket of an embedding service daemon, MLZERO_EMBEDDING_SOCKET if None
+        max_batch_size: Maximum number of texts encoded in one batch by the in-process service
+        max_wait_ms: Time the in-process service waits for other encode calls before encoding a batch
+        chunk_size: Maximum size of the indexed tutorial sections of the in-process service, None to not
+            index sections
+        embedding_backend: "torch" or "onnx_int8"
+        num_threads: Threads used by the embedding model of the in-process service within an encode call
+        warmup: Whether the in-process service loads the model when it is created rather than on the first query
+        ann_config: Approximate index settings of the in-process service, see EmbeddingService
+        update_indices: Whether the in-process service updates the tutorial indices, see EmbeddingService
+
+    Returns:
+        An EmbeddingServiceClient if the daemon serving this model is reachable, otherwise the
+        EmbeddingService of this process, created on the first call
+    """
+    socket_path = socket_path or os.environ.get(EMBEDDING_SOCKET_ENV)
+    if socket_path and os.path.exists(socket_path):
+        client = EmbeddingServiceClient(socket_path)
+        try:
+            info = client.ping()
+            served = (info.get("embedding_model_name"), info.get("embedding_backend", "torch"))
+            if served == (embedding_model_name, embedding_backend):
+                logger.info(f"Using the embedding service at {socket_path}")
+                return client
+            logger.warning(
+                f"Embedding service at {socket_path} serves {served[0]} ({served[1]}), "
+                f"not {embedding_model_name} ({embedding_backend}), loading the model in this process."
+            )
+        except (OSError, ValueError, RuntimeError) as e:
+            logger.warning(
+                f"Embedding service at {socket_path} is not reachable, loading the model in this process: {e}"
+            )
+
+    key = (embedding_model_name, embedding_backend)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = EmbeddingService(
+                embedding_model_name,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                chunk_size=chunk_size,
+                embedding_backend=embedding_backend,
+                num_threads=num_threads,
+                warmup=warmup,
+                ann_config=ann_config,
+                update_indices=update_indices,
+            )
+            atexit.register(_services[key].cleanup)
+        elif chunk_size:
+            _services[key].enable_chunk_index(chunk_size)
+        return _services[key]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service: EmbeddingService = self.server.service
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "ping":
+                    result = {
+                        "embedding_model_name": service.embedding_model_name,
+                        "embedding_backend": service.embedding_backend,
+                        "pid": os.getpid(),
+                    }
+                elif op == "encode":
+                    result = _encode_array(service.encode(request["texts"]))
+                elif op == "search":
+                    result = service.search(
+                        request["query"],
+                        request["tool_name"],
+                        condensed=request.get("condensed", False),
+                        top_k=request.get("top_k", 5),
+                        hybrid=request.get("hybrid", False),
+                        rrf_k=request.get("rrf_k", 60),
+                        chunked=request.get("chunked", False),
+                        chunk_neighbours=request.get("chunk_neighbours", 1),
+                        max_sections=request.get("max_sections", 3),
+                    )
+                elif op == "search_many":
+                    result = service.search_many(
+                        request["queries"],
+                        request["tools"],
+                        condensed=request.get("condensed", False),
+                        top_k=request.get("top_k", 5),
+                        hybrid=request.get("hybrid", False),
+                        rrf_k=request.get("rrf_k", 60),
+                        chunked=request.get("chunked", False),
+                        chunk_neighbours=request.get("chunk_neighbours", 1),
+                        max_sections=request.get("max_sections", 3),
+                    )
+                elif op == "get_all_summaries":
+                    result = service.get_all_summaries(request["tool_name"], condensed=request.get("condensed", False))
+                else:
+                    raise ValueError(f"Unknown operation: {op}")
+                response = {"result": result}
+            except Exception as e:
+                logger.error(f"Embedding service request failed: {e}")
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_embedding_service(
+    socket_path: str,
+    embedding_model_name: str = DEFAULT_EMBEDDING_MODEL,
+    max_batch_size: int = 64,
+    max_wait_ms: float = 5.0,
+    chunk_size: Optional[int] = None,
+    embedding_backend: str = "torch",
+    num_threads: Optional[int] = None,
+    ann_config: Optional[Dict] = None,
+    update_indices: Optional[bool] = None,
+) -> None:
+    """
+    Serve the embedding service on a Unix socket until interrupted.
+
+    Args:
+        socket_path: Path of the Unix socket
+        embedding_model_name: Name of the BGE embedding model
+        max_batch_size: Maximum number of texts encoded in one batch
+        max_wait_ms: Time to wait for other encode calls before encoding a batch
+        chunk_size: Maximum size of the indexed tutorial sections, None to index summaries only
+        embedding_backend: "torch" or "onnx_int8"
+        num_threads: Threads used by the embedding model within an encode call
+        ann_config: Approximate index settings of large tutorial groups, see EmbeddingService
+        update_indices: Whether to update the tutorial indices, see EmbeddingService
+    """
+    # Load the model now rather than on the first request
+    service = EmbeddingService(
+        embedding_model_name,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        chunk_size=chunk_size,
+        embedding_backend=embedding_backend,
+        num_threads=num_threads,
+        warmup=True,
+        ann_config=ann_config,
+        update_indices=update_indices,
+    )
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with _EmbeddingServer(socket_path, _RequestHandler) as server:
+        server.service = service
+        os.chmod(socket_path, 0o600)
+        logger.info(f"Embedding service for {embedding_model_name} ({embedding_backend}) listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+            service.cleanup()
@@ -1,37 +1,212 @@
 import contextlib
+import fcntl
+import hashlib
 import io
 import logging
 import os
-import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
 
 import faiss
 import numpy as np
 from FlagEmbedding import FlagAutoModel
 
+from .lexical import BM25Index, extract_api_names, extract_title, tokenize
 from .registry import ToolsRegistry
+from .utils import split_markdown_into_chunks
 
 logger = logging.getLogger(__name__)
 
 os.environ["TRANSFORMERS_NO_ADVISORY_WARNINGS"] = "true"
 
+TUTORIAL_TYPES = ["tutorials", "condensed_tutorials"]
+# torch runs the FlagEmbedding model, onnx_int8 an int8-quantized ONNX export with ONNX Runtime
+EMBEDDING_BACKENDS = ["torch", "onnx_int8"]
+# Bump when the saved index layout changes, indices of another version are rebuilt
+INDEX_FORMAT_VERSION = 5
+MAX_INDEX_WORKERS = 8
+# Depth of the dense and lexical rankings fused by hybrid searches
+HYBRID_CANDIDATES = 50
+# The sections of the tutorials of a type are indexed as the tutorial type with this suffix
+CHUNK_TYPE_SUFFIX = "_chunks"
+# Number of sections searched by chunked searches
+CHUNK_CANDIDATES = 200
+# Groups with fewer vectors are searched exactly; larger ones also get an approximate index, HNSW or,
+# from IVFPQ_MIN_VECTORS on, IVF-PQ, whose search depth is tuned to a recall target when it is built
+ANN_MIN_VECTORS = 10000
+IVFPQ_MIN_VECTORS = 200000
+ANN_RECALL_TARGET = 0.95
+# The recall of approximate indices is recall@ANN_RECALL_K against the exact search, for queries
+# sampled from the indexed vectors with noise
+ANN_RECALL_K = 10
+ANN_RECALL_QUERIES = 200
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = [16, 32, 64, 128, 256, 512]
+IVF_NPROBE = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+# IVF-PQ searches fetch this many times more candidates, rescored with the exact vectors
+IVFPQ_REFINE_FACTOR = 4
+
+INDEX_DB_NAME = "tutorials.sqlite"
+# Held by the process writing a new index version
+INDEX_LOCK_NAME = ".tutorials.lock"
+# Vector IDs are (group_id << GROUP_ID_SHIFT) | local ID, so the tutorials of a (tool, tutorial type) group
+# are a contiguous ID range that searches are restricted to
+GROUP_ID_SHIFT = 32
+# The vectors are memory-mapped rather than read, so that processes share them through the page cache
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY,
+    tool_name TEXT NOT NULL,
+    tutorial_type TEXT NOT NULL,
+    next_local_id INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (tool_name, tutorial_type)
+);
+CREATE TABLE IF NOT EXISTS tutorials (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES groups (group_id),
+    file_path TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    UNIQUE (group_id, relative_path)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES groups (group_id),
+    parent_id INTEGER REFERENCES tutorials (id),
+    file_path TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    UNIQUE (group_id, relative_path, chunk_index)
+);
+CREATE TABLE IF NOT EXISTS ann_indices (
+    group_id INTEGER PRIMARY KEY REFERENCES groups (group_id),
+    index_type TEXT NOT NULL,
+    index_file TEXT NOT NULL,
+    search_param INTEGER NOT NULL,
+    recall REAL NOT NULL,
+    num_vectors INTEGER NOT NULL
+);
+"""
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class _LRUCache:
+    """Thread-safe least-recently-used cache."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
 
 class TutorialIndexer:
     """
     Indexes tutorial summaries using FAISS and BGE embeddings for efficient retrieval.
-    Maintains separate indices for regular and condensed tutorials for each tool.
+    Maintains one memory-mapped index over the regular and condensed tutorials of all tools,
+    searches are restricted to the vector ID range of a tool and tutorial type.
+
+    With a chunk size, the header-bounded sections of the tutorials are indexed too, with the ID
+    of their tutorial, so that chunked searches return only the sections matching the query.
+
+    Groups with many vectors (e.g. thousands of model cards) also get an approximate index, HNSW or
+    IVF-PQ depending on their size, which is searched instead of the exact one. Its search depth is
+    the smallest one whose recall against the exact search reaches the recall target.
     """
 
-    def __init__(self, embedding_model_name: str = "BAAI/bge-base-en-v1.5"):
+    def __init__(
+        self,
+        embedding_model_name: str = "BAAI/bge-base-en-v1.5",
+        query_cache_size: int = 1024,
+        result_cache_size: int = 256,
+        content_cache_size: int = 512,
+        chunk_size: Optional[int] = None,
+        embedding_backend: str = "torch",
+        num_threads: Optional[int] = None,
+        ann_min_vectors: int = ANN_MIN_VECTORS,
+        ivfpq_min_vectors: int = IVFPQ_MIN_VECTORS,
+        ann_recall_target: float = ANN_RECALL_TARGET,
+    ):
         self.registry = ToolsRegistry()
         self.embedding_model_name = embedding_model_name
         self.sanitized_model_name = self.embedding_model_name.replace("/", "_")
+        self.embedding_backend = embedding_backend
+        # Threads used by the embedding model within an encode call, the library default if None
+        self.num_threads = num_threads
         self.model = None
-        self.indices: Dict[str, Dict[str, faiss.Index]] = {}  # {tool_name: {type: index}}
-        self.metadata: Dict[str, Dict[str, List[Dict]]] = {}  # {tool_name: {type: [metadata]}}
-        self.index_dir = Path(__file__).parent / "indices" / self.sanitized_model_name
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {embedding_backend}, expected one of {EMBEDDING_BACKENDS}")
+        # Single index over the tutorials of all tools, with the metadata in a SQLite database
+        self.index: Optional[faiss.Index] = None
+        self.index_file: Optional[str] = None
+        self.groups: Dict[Tuple[str, str], int] = {}  # {(tool_name, type): group_id}
+        # {group_id: (index, index type, search depth)} of the groups with an approximate index
+        self.ann_indices: Dict[int, Tuple[faiss.Index, str, int]] = {}
+        # Applied to the groups whose tutorials change, force an update to apply them to all groups
+        self.ann_min_vectors = ann_min_vectors
+        self.ivfpq_min_vectors = ivfpq_min_vectors
+        self.ann_recall_target = ann_recall_target
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Embeddings of different backends differ slightly, so each backend has its own index
+        index_name = self.sanitized_model_name
+        if embedding_backend != "torch":
+            index_name += f"__{embedding_backend}"
+        self.index_dir = Path(__file__).parent / "indices" / index_name
         self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.index_dir / INDEX_DB_NAME
+        # Maximum size in characters of the indexed sections, None to index summaries only
+        self.chunk_size = chunk_size
+
+        # Queries repeat across search iterations and chat messages:
+        # normalized query -> embedding
+        self._query_embedding_cache = _LRUCache(query_cache_size)
+        # (normalized query, tool, type, top_k, index file) -> hits without content
+        self._result_cache = _LRUCache(result_cache_size)
+        # file path -> (mtime_ns, size, content)
+        self._content_cache = _LRUCache(content_cache_size)
+        # (tool, type, index file) -> (BM25 index, hits of its documents), built on first hybrid search
+        self._lexical_indices: Dict[Tuple[str, str, Optional[str]], Tuple[BM25Index, List[Dict]]] = {}
 
     def __del__(self):
         """Cleanup method to properly close the embedding model."""
@@ -60,17 +235,58 @@ class TutorialIndexer:
     def _load_embedding_model(self):
         """Load the BGE embedding model lazily."""
         if self.model is None:
-            logger.info(f"Loading embedding model: {self.embedding_model_name}")
-            self.model = FlagAutoModel.from_finetuned(
-                self.embedding_model_name,
-                query_instruction_for_retrieval="Represent this sentence for searching relevant passages:",
-                use_fp16=True,
-                devices=None,  # Use single process mode
-                batch_size=32,  # Reasonable batch size
-                normalize_embeddings=False,  # We'll handle normalization ourselves
-            )
+            logger.info(f"Loading embedding model: {self.embedding_model_name} ({self.embedding_backend})")
+            if self.embedding_backend == "onnx_int8":
+                from .onnx_embedding import OnnxEmbeddingModel
+
+                self.model = OnnxEmbeddingModel(self.embedding_model_name, num_threads=self.num_threads, batch_size=32)
+            else:
+                import torch
+
+                if self.num_threads:
+                    torch.set_num_threads(self.num_threads)
+                self.model = FlagAutoModel.from_finetuned(
+                    self.embedding_model_name,
+                    query_instruction_for_retrieval="Represent this sentence for searching relevant passages:",
+                    # fp16 only speeds up GPUs, on CPU it is emulated
+                    use_fp16=torch.cuda.is_available(),
+                    devices=None,  # Use single process mode
+                    batch_size=32,  # Reasonable batch size
+                    normalize_embeddings=False,  # We'll handle normalization ourselves
+                )
             logger.info("Embedding model loaded successfully")
 
+    def warmup(self) -> float:
+        """
+        Load the embedding model and run a first encode call, which is slower than the next ones.
+
+        Returns:
+            Time spent, in seconds
+        """
+        start = time.perf_counter()
+        self.encode(["warmup"])
+        elapsed = time.perf_counter() - start
+        logger.info(f"Embedding model warmed up in {elapsed:.1f}s")
+        return elapsed
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with the BGE model used for the tutorial indices.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            L2-normalized float32 embeddings, one row per text
+        """
+        self._load_embedding_model()
+        embeddings = self.__silent_encode(texts)
+        if not isinstance(embeddings, np.ndarray):
+            embeddings = np.array(embeddings)
+        embeddings = np.ascontiguousarray(embeddings.astype(np.float32).reshape(len(texts), -1))
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
     def _extract_summary_from_md(self, md_path: Path) -> Optional[str]:
         """
         Extract summary from markdown file.
@@ -96,208 +312,686 @@ class TutorialIndexer:
             logger.warning(f"Error extracting summary from {md_path}: {e}")
             return None
 
-    def _build_tool_index(self, tool_name: str, tutorial_type: str) -> Tuple[faiss.Index, List[Dict]]:
+    def _scan_tutorials(self, tool_name: str, tutorial_type: str) -> List[Dict]:
         """
-        Build FAISS index for a specific tool and tutorial type.
+        Collect the summaries of the tutorials of a tool.
 
         Args:
             tool_name: Name of the tool
             tutorial_type: Either 'tutorials' or 'condensed_tutorials'
 
         Returns:
-            Tuple of (FAISS index, metadata list)
+            List of metadata dictionaries, including the hash of the summary
         """
-        self._load_embedding_model()
-
         try:
-            if tutorial_type == "condensed_tutorials":
-                tutorials_folder = self.registry.get_tool_tutorials_folder(tool_name, condensed=True)
-            else:
-                tutorials_folder = self.registry.get_tool_tutorials_folder(tool_name, condensed=False)
+            tutorials_folder = self.registry.get_tool_tutorials_folder(
+                tool_name, condensed=tutorial_type == "condensed_tutorials"
+            )
         except FileNotFoundError as e:
             logger.warning(f"No {tutorial_type} found for tool {tool_name}: {e}")
-            return None, []
-
-        summaries = []
-        metadata = []
+            return []
 
+        entries = []
         # Recursively find all .md files
-        for md_file in tutorials_folder.rglob("*.md"):
+        for md_file in sorted(tutorials_folder.rglob("*.md")):
             summary = self._extract_summary_from_md(md_file)
             if summary and summary.strip():  # Ensure non-empty summary
-                summaries.append(summary)
-                metadata.append(
+                entries.append(
                     {
                         "tool_name": tool_name,
                         "tutorial_type": tutorial_type,
                         "file_path": str(md_file),
                         "relative_path": str(md_file.relative_to(tutorials_folder)),
                         "summary": summary,
+                        "sha256": hashlib.sha256(summary.encode("utf-8")).hexdigest(),
+                        "embedding_text": summary,
                     }
                 )
+        return entries
 
-        if not summaries:
-            logger.warning(f"No summaries found for {tool_name} {tutorial_type}")
-            return None, []
-
-        logger.info(f"Found {len(summaries)} summaries for {tool_name} {tutorial_type}")
-
-        try:
-            # Generate embeddings
-            logger.info(f"Generating embeddings for {tool_name} {tutorial_type}")
-
-            # Process in smaller batches to avoid memory issues
-            batch_size = 16
-            all_embeddings = []
+    def _scan_chunks(self, tool_name: str, chunk_type: str) -> List[Dict]:
+        """
+        Split the tutorials of a tool into sections at header boundaries.
 
-            for i in range(0, len(summaries), batch_size):
-                batch_summaries = summaries[i : i + batch_size]
-                batch_embeddings = self.__silent_encode(batch_summaries)
+        Args:
+            tool_name: Name of the tool
+            chunk_type: Tutorial type with the chunk suffix
 
-                # Ensure proper format
-                if not isinstance(batch_embeddings, np.ndarray):
-                    batch_embeddings = np.array(batch_embeddings)
+        Returns:
+            List of section dictionaries, the hash is the one of the whole tutorial and chunk size
+        """
+        entries = []
+        for tutorial in self._scan_tutorials(tool_name, chunk_type[: -len(CHUNK_TYPE_SUFFIX)]):
+            try:
+                content = self._read_tutorial(tutorial["file_path"])
+            except OSError as e:
+                logger.warning(f"Error reading tutorial {tutorial['file_path']}: {e}")
+                continue
+            title = extract_title(content)
+            sha256 = hashlib.sha256(f"{self.chunk_size}\n{content}".encode("utf-8")).hexdigest()
+            for chunk_index, text in enumerate(split_markdown_into_chunks(content, max_chunk_size=self.chunk_size)):
+                if not text.strip():
+                    continue
+                entries.append(
+                    {
+                        "tool_name": tool_name,
+                        "tutorial_type": chunk_type,
+                        "file_path": tutorial["file_path"],
+                        "relative_path": tutorial["relative_path"],
+                        "chunk_index": chunk_index,
+                        "text": text,
+                        "sha256": sha256,
+                        # The title situates sections that do not mention the topic of the tutorial
+                        "embedding_text": f"{title}\n{text}" if title else text,
+                    }
+                )
+        return entries
 
-                all_embeddings.append(batch_embeddings)
+    def _read_rows(self) -> Dict[Tuple[str, str], Dict[str, Tuple[List[int], str]]]:
+        """
+        Vector IDs and hash of every indexed tutorial, by (tool, tutorial type) and relative path.
 
-            # Concatenate all embeddings
-            embeddings = np.vstack(all_embeddings) if len(all_embeddings) > 1 else all_embeddings[0]
+        Tutorials have one vector, chunked tutorials (chunk tutorial types) one per section.
+        """
+        rows = {}
+        with self._lock:
+            if self._conn is None:
+                return rows
+            for table in ("tutorials", "chunks"):
+                cursor = self._conn.execute(
+                    "SELECT g.tool_name, g.tutorial_type, t.relative_path, t.id, t.sha256 "
+                    f"FROM {table} t JOIN groups g USING (group_id) ORDER BY t.id"
+                )
+                for tool_name, tutorial_type, relative_path, vector_id, sha256 in cursor:
+                    row = rows.setdefault((tool_name, tutorial_type), {}).setdefault(relative_path, ([], sha256))
+                    row[0].append(vector_id)
+        return rows
+
+    def _plan_update(
+        self, tool_name: str, tutorial_type: str, indexed: Dict[str, Tuple[List[int], str]], force: bool
+    ) -> Dict:
+        """Compare the tutorials of a tool with the indexed ones, to find what must be embedded."""
+        if tutorial_type.endswith(CHUNK_TYPE_SUFFIX):
+            entries = self._scan_chunks(tool_name, tutorial_type)
+        else:
+            entries = self._scan_tutorials(tool_name, tutorial_type)
+        if force:
+            to_embed = entries
+            to_remove = [vector_id for vector_ids, _ in indexed.values() for vector_id in vector_ids]
+        else:
+            current = {entry["relative_path"]: entry["sha256"] for entry in entries}
+            to_embed = [
+                entry
+                for entry in entries
+                if entry["relative_path"] not in indexed or indexed[entry["relative_path"]][1] != entry["sha256"]
+            ]
+            to_remove = [
+                vector_id
+                for relative_path, (vector_ids, sha256) in indexed.items()
+                if current.get(relative_path) != sha256
+                for vector_id in vector_ids
+            ]
+        return {"entries": entries, "to_embed": to_embed, "to_remove": to_remove}
+
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        # Process in smaller batches to avoid memory issues
+        batch_size = 16
+        embeddings = np.vstack([self.encode(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)])
+        if not np.isfinite(embeddings).all():
+            logger.warning("Found non-finite values in tutorial embeddings, replacing them with zeros")
+            embeddings = np.nan_to_num(embeddings, nan=0.0, posinf=0.0, neginf=0.0)
+        return embeddings
+
+    @staticmethod
+    def _get_group_id(conn: sqlite3.Connection, tool_name: str, tutorial_type: str) -> int:
+        conn.execute(
+            "INSERT OR IGNORE INTO groups (tool_name, tutorial_type) VALUES (?, ?)", (tool_name, tutorial_type)
+        )
+        return conn.execute(
+            "SELECT group_id FROM groups WHERE tool_name = ? AND tutorial_type = ?", (tool_name, tutorial_type)
+        ).fetchone()[0]
+
+    def _apply_plans(self, plans: Dict[Tuple[str, str], Dict], embeddings: np.ndarray, rebuild: bool) -> None:
+        """
+        Write a new version of the index and its database with the planned changes, then swap it in.
 
-            # Convert to float32 and ensure contiguous memory layout
-            embeddings = np.ascontiguousarray(embeddings.astype(np.float32))
+        The database is copied and modified aside, and points to a new index file. Replacing the
+        database switches both atomically; processes that still use the previous version keep
+        their open database and memory-mapped index file. Must be called with the writer lock held.
+        """
+        fd, tmp_db_path = tempfile.mkstemp(dir=self.index_dir, prefix=".tutorials.", suffix=".sqlite.tmp")
+        os.close(fd)
+        index_file = f"tutorials.{uuid.uuid4().hex}.index"
+        new_ann_files: List[str] = []
+        # A rebuilt database references none of the approximate indices of the previous one, and no other
+        # writer can save a database referencing them while the lock is held
+        replaced_ann_files = [path.name for path in self.index_dir.glob("ann.*.index")] if rebuild else []
+        try:
+            with contextlib.closing(sqlite3.connect(tmp_db_path)) as conn:
+                if rebuild:
+                    index = faiss.IndexIDMap2(faiss.IndexFlatIP(embeddings.shape[1]))
+                else:
+                    with self._lock:
+                        self._conn.backup(conn)
+                    # A mutable copy, searches keep using the memory-mapped index until the swap
+                    index = faiss.read_index(str(self.index_dir / self.index_file))
+                conn.executescript(_SCHEMA)
+
+                to_remove = [vector_id for plan in plans.values() for vector_id in plan["to_remove"]]
+                if to_remove:
+                    index.remove_ids(np.array(to_remove, dtype=np.int64))
+                    for table in ("tutorials", "chunks"):
+                        conn.executemany(
+                            f"DELETE FROM {table} WHERE id = ?", [(vector_id,) for vector_id in to_remove]
+                        )
+
+                offset = 0
+                changed_group_ids = set()
+                for (tool_name, tutorial_type), plan in plans.items():
+                    if not plan["entries"] and not plan["to_remove"]:
+                        continue
+                    group_id = self._get_group_id(conn, tool_name, tutorial_type)
+                    table = "chunks" if tutorial_type.endswith(CHUNK_TYPE_SUFFIX) else "tutorials"
+                    num_new = len(plan["to_embed"])
+                    if num_new or plan["to_remove"]:
+                        changed_group_ids.add(group_id)
+                    if num_new:
+                        # Local IDs are never reused, so an ID always refers to the same tutorial version
+                        next_local_id = conn.execute(
+                            "SELECT next_local_id FROM groups WHERE group_id = ?", (group_id,)
+                        ).fetchone()[0]
+                        ids = (group_id << GROUP_ID_SHIFT) + np.arange(
+                            next_local_id, next_local_id + num_new, dtype=np.int64
+                        )
+                        index.add_with_ids(embeddings[offset : offset + num_new], ids)
+                        offset += num_new
+                        conn.execute(
+                            "UPDATE groups SET next_local_id = ? WHERE group_id = ?",
+                            (next_local_id + num_new, group_id),
+                        )
+                        if table == "chunks":
+                            conn.executemany(
+                                "INSERT INTO chunks (id, group_id, file_path, relative_path, chunk_index, text, "
+                                "sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [
+                                    (
+                                        vector_id,
+                                        group_id,
+                                        entry["file_path"],
+                                        entry["relative_path"],
+                                        entry["chunk_index"],
+                                        entry["text"],
+                                        entry["sha256"],
+                                    )
+                                    for vector_id, entry in zip(ids.tolist(), plan["to_embed"])
+                                ],
+                            )
+                        else:
+                            conn.executemany(
+                                "INSERT INTO tutorials (id, group_id, file_path, relative_path, summary, sha256) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                [
+                                    (
+                                        vector_id,
+                                        group_id,
+                                        entry["file_path"],
+                                        entry["relative_path"],
+                                        entry["summary"],
+                                        entry["sha256"],
+                                    )
+                                    for vector_id, entry in zip(ids.tolist(), plan["to_embed"])
+                                ],
+                            )
+                    # Refresh the paths of unchanged tutorials too (e.g. if the tool was moved)
+                    conn.executemany(
+                        f"UPDATE {table} SET file_path = ? WHERE group_id = ? AND relative_path = ?",
+                        list({(entry["file_path"], group_id, entry["relative_path"]) for entry in plan["entries"]}),
+                    )
+
+                # Link the sections to the current vector ID of their tutorial, which changes with its summary
+                conn.execute(
+                    "UPDATE chunks SET parent_id = ("
+                    "SELECT t.id FROM tutorials t JOIN groups tg ON tg.group_id = t.group_id "
+                    "JOIN groups cg ON cg.group_id = chunks.group_id "
+                    "WHERE tg.tool_name = cg.tool_name AND tg.tutorial_type || ? = cg.tutorial_type "
+                    "AND t.relative_path = chunks.relative_path)",
+                    (CHUNK_TYPE_SUFFIX,),
+                )
+                replaced_ann_files += self._update_ann_indices(conn, index, changed_group_ids, new_ann_files)
+
+                faiss.write_index(index, str(self.index_dir / index_file))
+                info = {
+                    "format_version": str(INDEX_FORMAT_VERSION),
+                    "embedding_model": self.embedding_model_name,
+                    "embedding_backend": self.embedding_backend,
+                    "index_file": index_file,
+                    "num_vectors": str(index.ntotal),
+                    "chunk_size": str(self.chunk_size) if self.chunk_size else "",
+                }
+                conn.executemany("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)", list(info.items()))
+                conn.commit()
+            os.replace(tmp_db_path, self.db_path)
+        except BaseException:
+            for path in [tmp_db_path, self.index_dir / index_file] + [self.index_dir / f for f in new_ann_files]:
+                if os.path.exists(path):
+                    os.unlink(path)
+            raise
+
+        previous_index_file = self.index_file
+        self._open(index_file)
+        if previous_index_file and previous_index_file != index_file:
+            # Other processes that mapped it keep their mapping until they switch
+            (self.index_dir / previous_index_file).unlink(missing_ok=True)
+        for ann_file in replaced_ann_files:
+            (self.index_dir / ann_file).unlink(missing_ok=True)
+        logger.info(f"Saved tutorial index with {self.index.ntotal} vectors to {self.index_dir}")
+
+    def _update_ann_indices(
+        self, conn: sqlite3.Connection, index: faiss.Index, group_ids: Set[int], new_ann_files: List[str]
+    ) -> List[str]:
+        """
+        Rebuild the approximate indices of the groups whose vectors changed, from the updated exact index.
 
-            # Validate embeddings shape and values
-            if len(embeddings.shape) != 2:
-                raise ValueError(f"Expected 2D embeddings array, got shape {embeddings.shape}")
+        Args:
+            conn: Database of the new index version
+            index: Updated exact index
+            group_ids: Groups whose vectors were added or removed
+            new_ann_files: List the written index files are appended to, to delete them on failure
 
-            if embeddings.size == 0:
-                raise ValueError("Embeddings array is empty")
+        Returns:
+            Index files of the previous version of the groups, to delete once the new version is swapped in
+        """
+        replaced_files = []
+        for group_id in sorted(group_ids):
+            row = conn.execute("SELECT index_file FROM ann_indices WHERE group_id = ?", (group_id,)).fetchone()
+            if row is not None:
+                replaced_files.append(row[0])
+                conn.execute("DELETE FROM ann_indices WHERE group_id = ?", (group_id,))
+            ids = np.array(
+                [
+                    vector_id
+                    for (vector_id,) in conn.execute(
+                        "SELECT id FROM tutorials WHERE group_id = ? UNION ALL SELECT id FROM chunks WHERE group_id = ?",
+                        (group_id, group_id),
+                    )
+                ],
+                dtype=np.int64,
+            )
+            if len(ids) < self.ann_min_vectors:
+                continue
+            start = time.perf_counter()
+            ann_index, index_type, search_param, recall = self._build_ann_index(index, ids)
+            ann_file = f"ann.{group_id}.{uuid.uuid4().hex}.index"
+            faiss.write_index(ann_index, str(self.index_dir / ann_file))
+            new_ann_files.append(ann_file)
+            conn.execute(
+                "INSERT INTO ann_indices (group_id, index_type, index_file, search_param, recall, num_vectors) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (group_id, index_type, ann_file, search_param, recall, len(ids)),
+            )
+            logger.info(
+                f"Built {index_type} index of group {group_id} with {len(ids)} vectors in "
+                f"{time.perf_counter() - start:.1f}s: search depth {search_param}, recall@{ANN_RECALL_K} {recall:.3f}"
+            )
+        return replaced_files
 
-            # Check for NaN or infinite values
-            if not np.isfinite(embeddings).all():
-                logger.warning(f"Found non-finite values in embeddings for {tool_name} {tutorial_type}")
-                # Replace NaN/inf with zeros
-                embeddings = np.nan_to_num(embeddings, nan=0.0, posinf=0.0, neginf=0.0)
+    def _build_ann_index(self, index: faiss.Index, ids: np.ndarray) -> Tuple[faiss.Index, str, int, float]:
+        """
+        Build an approximate index over the vectors of a group and tune its search depth.
 
-            # Create FAISS index
-            dimension = embeddings.shape[1]
-            index = faiss.IndexFlatIP(dimension)  # Inner product for similarity
+        Groups of at least ivfpq_min_vectors vectors get an IVF-PQ index, trained on a sample of the
+        vectors, which compresses them, and whose candidates are rescored with the exact vectors;
+        smaller ones get an HNSW graph. The search depth
+        (efSearch or nprobe) is the smallest one whose recall against the exact search reaches
+        ann_recall_target, or the largest one tried.
 
-            # Normalize embeddings for cosine similarity (in-place)
-            # Make a copy to avoid modifying the original array
-            embeddings_normalized = embeddings.copy()
-            faiss.normalize_L2(embeddings_normalized)
+        Args:
+            index: Exact index with the vectors of the group
+            ids: Vector IDs of the group
 
-            # Add embeddings to index
-            index.add(embeddings_normalized)
+        Returns:
+            The index with the vector IDs, its type, the search depth and its recall@ANN_RECALL_K
+        """
+        vectors = index.reconstruct_batch(ids)
+        num_vectors, dim = vectors.shape
+        rng = np.random.default_rng(0)
+        if num_vectors >= self.ivfpq_min_vectors:
+            index_type = "ivfpq"
+            # About 4 * sqrt(n) lists, with enough vectors per list to train their centroids
+            nlist = max(1, min(int(4 * np.sqrt(num_vectors)), num_vectors // 39))
+            # 8-bit codes of sub-vectors of about 8 dimensions, the number of sub-vectors must divide dim
+            num_subvectors = max(m for m in range(1, max(dim // 8, 1) + 1) if dim % m == 0)
+            base = faiss.IndexIVFPQ(faiss.IndexFlatIP(dim), dim, nlist, num_subvectors, 8, faiss.METRIC_INNER_PRODUCT)
+            train_size = min(num_vectors, max(64 * nlist, 256 * 39))
+            ann_index = faiss.IndexIDMap(base)
+            ann_index.train(vectors[np.sort(rng.choice(num_vectors, train_size, replace=False))])
+            depths = [nprobe for nprobe in IVF_NPROBE if nprobe <= nlist]
+        else:
+            index_type = "hnsw"
+            base = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            ann_index = faiss.IndexIDMap(base)
+            depths = HNSW_EF_SEARCH
+        ann_index.add_with_ids(vectors, ids)
+
+        # Queries near indexed vectors, but not equal to them, as real queries are
+        num_queries = min(ANN_RECALL_QUERIES, num_vectors)
+        queries = vectors[rng.choice(num_vectors, num_queries, replace=False)]
+        queries = queries + rng.normal(scale=0.5 / np.sqrt(dim), size=queries.shape).astype(np.float32)
+        faiss.normalize_L2(queries)
+        k = min(ANN_RECALL_K, num_vectors)
+        exact_index = faiss.IndexFlatIP(dim)
+        exact_index.add(vectors)
+        expected = ids[exact_index.search(queries, k)[1]]
+
+        recall = 0.0
+        for depth in depths:
+            found = self._search_ann((ann_index, index_type, depth), index, queries, k)[1]
+            recall = float(np.mean([len(set(e) & set(f)) / k for e, f in zip(expected.tolist(), found.tolist())]))
+            if recall >= self.ann_recall_target:
+                break
+        else:
+            logger.warning(
+                f"{index_type} index of {num_vectors} vectors reaches recall@{k} {recall:.3f} at most, "
+                f"below the target {self.ann_recall_target}"
+            )
+        return ann_index, index_type, depth, recall
+
+    @staticmethod
+    def _ann_search_params(index_type: str, depth: int) -> faiss.SearchParameters:
+        if index_type == "ivfpq":
+            params = faiss.SearchParametersIVF()
+            params.nprobe = depth
+        else:
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = depth
+        return params
+
+    def _search_ann(
+        self, ann: Tuple[faiss.Index, str, int], index: faiss.Index, queries: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search an approximate index, rescoring IVF-PQ candidates with the vectors of the exact index."""
+        ann_index, index_type, depth = ann
+        params = self._ann_search_params(index_type, depth)
+        if index_type != "ivfpq":
+            return ann_index.search(queries, k, params=params)
+
+        # PQ codes only approximate the vectors, which would cap the recall
+        candidates = ann_index.search(queries, k * IVFPQ_REFINE_FACTOR, params=params)[1]
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, (query, row_ids) in enumerate(zip(queries, candidates)):
+            row_ids = row_ids[row_ids != -1]
+            if not len(row_ids):
+                continue
+            row_scores = index.reconstruct_batch(row_ids) @ query
+            order = np.argsort(-row_scores)[:k]
+            scores[row, : len(order)] = row_scores[order]
+            ids[row, : len(order)] = row_ids[order]
+        return scores, ids
 
-            logger.info(f"Built index for {tool_name} {tutorial_type} with {index.ntotal} vectors")
-            return index, metadata
+    def _read_ann_index(self, ann_file: str) -> faiss.Index:
+        try:
+            return faiss.read_index(str(self.index_dir / ann_file), MMAP_FLAGS)
+        except RuntimeError:
+            # Inverted lists of IVF indices cannot be memory-mapped from a regular index file
+            return faiss.read_index(str(self.index_dir / ann_file))
+
+    def _open(self, index_file: str) -> None:
+        """Open the database and memory-map its index file, replacing the ones in use."""
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        index = faiss.read_index(str(self.index_dir / index_file), MMAP_FLAGS)
+        groups = {
+            (tool_name, tutorial_type): group_id
+            for group_id, tool_name, tutorial_type in conn.execute(
+                "SELECT group_id, tool_name, tutorial_type FROM groups"
+            )
+        }
+        ann_indices = {
+            group_id: (self._read_ann_index(ann_file), index_type, search_param)
+            for group_id, index_type, ann_file, search_param in conn.execute(
+                "SELECT group_id, index_type, index_file, search_param FROM ann_indices"
+            )
+        }
+        with self._lock:
+            previous_conn = self._conn
+            self._conn, self.index, self.index_file, self.groups = conn, index, index_file, groups
+            self.ann_indices = ann_indices
+        if previous_conn is not None:
+            previous_conn.close()
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """
+        Hold the index writer lock of all processes, on the latest saved index version.
 
-        except Exception as e:
-            logger.error(f"Error during embedding generation or indexing for {tool_name} {tutorial_type}: {e}")
-            return None, []
+        Changes are planned against the index this process loaded, so it is reloaded first if another
+        process saved a newer version in the meantime; otherwise that version would be overwritten.
+        """
+        with open(self.index_dir / INDEX_LOCK_NAME, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    with contextlib.closing(sqlite3.connect(str(self.db_path))) as conn:
+                        saved_index_file = conn.execute("SELECT value FROM info WHERE key = 'index_file'").fetchone()
+                except sqlite3.Error:
+                    saved_index_file = None
+                if saved_index_file is not None and saved_index_file[0] != self.index_file:
+                    self.load_indices()
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
-    def build_indices(self, tools: Optional[List[str]] = None) -> None:
+    def update_indices(self, tools: Optional[List[str]] = None, force: bool = False) -> None:
         """
-        Build FAISS indices for all tools or specified tools.
+        Bring the index up to date with the tutorials, embedding only new or changed summaries.
+
+        The database records the summary hash and vector ID of every indexed tutorial; removed or
+        changed tutorials are deleted from the index by ID. The updated index is saved and swapped
+        in atomically, so concurrent searches see either the old or the new version. Writers of
+        other processes wait for each other. With a chunk size, the sections of tutorials whose
+        content changed are re-embedded too.
 
         Args:
-            tools: List of tool names to index. If None, index all tools.
+            tools: List of tool names to update. If None, update all tools.
+            force: Whether to re-embed all summaries of the tools
         """
-        if tools is None:
-            tools = self.registry.list_tools()
+        with self._write_lock():
+            # Without a loadable index (first run, other embedding model or format), everything is rebuilt
+            rebuild = self.index is None
+            checked_at = time.time()
+            if tools is None or rebuild:
+                tools = self.registry.list_tools()
+            tutorial_types = list(TUTORIAL_TYPES)
+            if self.chunk_size:
+                tutorial_types += [tutorial_type + CHUNK_TYPE_SUFFIX for tutorial_type in TUTORIAL_TYPES]
+            targets = [(tool_name, tutorial_type) for tool_name in tools for tutorial_type in tutorial_types]
+            if not targets:
+                return
+            indexed = {} if rebuild else self._read_rows()
+
+            num_workers = min(MAX_INDEX_WORKERS, len(targets))
+            with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="tutorial_indexer") as executor:
+                plans = dict(
+                    zip(
+                        targets,
+                        executor.map(
+                            lambda target: self._plan_update(*target, indexed.get(target, {}), force), targets
+                        ),
+                    )
+                )
 
-        logger.info(f"Building indices for tools: {tools}")
+            texts = [entry["embedding_text"] for plan in plans.values() for entry in plan["to_embed"]]
+            num_removed = sum(len(plan["to_remove"]) for plan in plans.values())
+            if not texts and (rebuild or not num_removed):
+                if not rebuild and tools == self.registry.list_tools():
+                    # Record the check, so that needs_update does not report the tutorials touched before it again
+                    self._mark_checked(checked_at)
+                return
+
+            if texts:
+                logger.info(f"Generating embeddings for {len(texts)} new or changed tutorial summaries and sections")
+                embeddings = self._embed_texts(texts)
+            else:
+                embeddings = np.empty((0, 0), dtype=np.float32)
+            self._apply_plans(plans, embeddings, rebuild)
+            logger.info(f"Updated tutorial index: {len(texts)} summaries and sections embedded, {num_removed} removed")
 
-        for tool_name in tools:
-            logger.info(f"Processing tool: {tool_name}")
+    def _mark_checked(self, checked_at: float) -> None:
+        with contextlib.suppress(OSError):
+            if self.db_path.stat().st_mtime < checked_at:
+                os.utime(self.db_path, (checked_at, checked_at))
+
+    def needs_update(self) -> bool:
+        """
+        Whether the tutorials may have changed since the index was saved, from modification times only.
 
-            # Initialize tool dictionaries
-            if tool_name not in self.indices:
-                self.indices[tool_name] = {}
-                self.metadata[tool_name] = {}
+        The database is compared with the tool catalog and the tutorial folders and files, which are
+        stat-ed but not read. Added, removed or edited tutorials and tools update these times;
+        update_indices then finds what actually changed.
 
-            # Build indices for both tutorial types
-            for tutorial_type in ["tutorials", "condensed_tutorials"]:
+        Returns:
+            True if there is no index, sections of another size are wanted or a tutorial is newer than the index
+        """
+        with self._lock:
+            if self.index is None or self._conn is None:
+                return True
+            info = dict(self._conn.execute("SELECT key, value FROM info"))
+        if self.chunk_size and info.get("chunk_size") != str(self.chunk_size):
+            return True
+
+        saved_mtime = self.db_path.stat().st_mtime
+        if self.registry.catalog_path.stat().st_mtime > saved_mtime:
+            return True
+        for tool_name in self.registry.list_tools():
+            for tutorial_type in TUTORIAL_TYPES:
                 try:
-                    index, metadata = self._build_tool_index(tool_name, tutorial_type)
+                    folder = self.registry.get_tool_tutorials_folder(
+                        tool_name, condensed=tutorial_type == "condensed_tutorials"
+                    )
+                except FileNotFoundError:
+                    continue
+                for dir_path, _, file_names in os.walk(folder):
+                    if os.stat(dir_path).st_mtime > saved_mtime:
+                        return True
+                    for file_name in file_names:
+                        if (
+                            file_name.endswith(".md")
+                            and os.stat(os.path.join(dir_path, file_name)).st_mtime > saved_mtime
+                        ):
+                            return True
+        return False
 
-                    if index is not None:
-                        self.indices[tool_name][tutorial_type] = index
-                        self.metadata[tool_name][tutorial_type] = metadata
-                        logger.info(f"Successfully built {tutorial_type} index for {tool_name}")
-                    else:
-                        logger.warning(f"Failed to build {tutorial_type} index for {tool_name}")
+    def build_indices(self, tools: Optional[List[str]] = None) -> None:
+        """
+        Build FAISS indices for all tools or specified tools.
 
-                except Exception as e:
-                    logger.error(f"Error building {tutorial_type} index for {tool_name}: {e}")
-                    continue
+        Only summaries that are new or changed since the index was saved are embedded.
+
+        Args:
+            tools: List of tool names to index. If None, index all tools.
+        """
+        logger.info(f"Building indices for tools: {tools if tools is not None else 'all'}")
+        self.update_indices(tools)
 
     def save_indices(self) -> None:
         """Save all indices and metadata to disk."""
-        logger.info("Saving indices to disk")
+        # update_indices saves every change as it is applied
+        logger.info(f"Tutorial index is saved in {self.index_dir}")
 
-        for tool_name, tool_indices in self.indices.items():
-            tool_dir = self.index_dir / tool_name
-            tool_dir.mkdir(exist_ok=True)
-
-            for tutorial_type, index in tool_indices.items():
-                # Save FAISS index
-                index_file = tool_dir / f"{tutorial_type}.index"
-                faiss.write_index(index, str(index_file))
-
-                # Save metadata
-                metadata_file = tool_dir / f"{tutorial_type}.metadata"
-                with open(metadata_file, "wb") as f:
-                    pickle.dump(self.metadata[tool_name][tutorial_type], f)
+    def load_indices(self) -> bool:
+        """
+        Open the tutorial index and its metadata database.
 
-                logger.info(f"Saved {tool_name} {tutorial_type} index and metadata")
+        The index is memory-mapped and the metadata is queried on demand, so this reads almost nothing.
 
-    def load_indices(self) -> None:
-        """Load all indices and metadata from disk."""
+        Returns:
+            Whether an index for the embedding model was found
+        """
         logger.info("Loading indices from disk")
 
-        self.indices = {}
-        self.metadata = {}
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn, self.index, self.index_file, self.groups = None, None, None, {}
+            self.ann_indices = {}
 
-        # Check if index_dir is empty
-        if not any(self.index_dir.iterdir()):
+        if not self.db_path.exists():
             logger.warning(f"No index exists at {self.index_dir}")
             return False
 
-        for tool_dir in self.index_dir.iterdir():
-            if tool_dir.is_dir():
-                tool_name = tool_dir.name
-                self.indices[tool_name] = {}
-                self.metadata[tool_name] = {}
-
-                for tutorial_type in ["tutorials", "condensed_tutorials"]:
-                    index_file = tool_dir / f"{tutorial_type}.index"
-                    metadata_file = tool_dir / f"{tutorial_type}.metadata"
-
-                    if index_file.exists() and metadata_file.exists():
-                        try:
-                            # Load FAISS index
-                            index = faiss.read_index(str(index_file))
-                            self.indices[tool_name][tutorial_type] = index
-
-                            # Load metadata
-                            with open(metadata_file, "rb") as f:
-                                metadata = pickle.load(f)
-                            self.metadata[tool_name][tutorial_type] = metadata
-
-                            logger.info(f"Loaded {tool_name} {tutorial_type} index with {index.ntotal} vectors")
-
-                        except Exception as e:
-                            logger.error(f"Error loading {tool_name} {tutorial_type} index: {e}")
-                            return False
-                    else:
-                        logger.error(f"There is no {index_file} or {metadata_file}.")
-                        return False
+        try:
+            with contextlib.closing(sqlite3.connect(str(self.db_path))) as conn:
+                info = dict(conn.execute("SELECT key, value FROM info"))
+            if (
+                info.get("format_version") != str(INDEX_FORMAT_VERSION)
+                or info.get("embedding_model") != self.embedding_model_name
+                or info.get("embedding_backend", "torch") != self.embedding_backend
+            ):
+                logger.warning(
+                    f"Index at {self.index_dir} was built with another format, model or backend, it will be rebuilt"
+                )
+                return False
+            self._open(info["index_file"])
+        except (sqlite3.Error, RuntimeError, KeyError) as e:
+            logger.error(f"Error loading the tutorial index: {e}")
+            return False
+
+        if self.index.ntotal != int(info["num_vectors"]):
+            logger.error(f"Tutorial index has {self.index.ntotal} vectors instead of {info['num_vectors']}")
+            self.index = None
+            return False
+        logger.info(f"Loaded tutorial index with {self.index.ntotal} vectors")
         return True
 
-    def search(self, query: str, tool_name: str, condensed: bool = False, top_k: int = 5) -> List[Dict]:
+    def get_query_embedding(self, query: str, encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None):
+        """
+        Embed a search query, reusing the embedding of the same normalized query.
+
+        Args:
+            query: Search query
+            encode_fn: Function embedding a list of texts, encode if None
+
+        Returns:
+            L2-normalized float32 query embedding
+        """
+        return self.get_query_embeddings([query], encode_fn)[0]
+
+    def get_query_embeddings(
+        self, queries: List[str], encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Embed search queries in one batch, reusing the embeddings of already seen normalized queries.
+
+        Args:
+            queries: Search queries
+            encode_fn: Function embedding a list of texts, encode if None
+
+        Returns:
+            L2-normalized float32 query embeddings, one row per query
+        """
+        keys = [_normalize_query(query) for query in queries]
+        embeddings = {key: self._query_embedding_cache.get(key) for key in keys}
+        missing = {key: query for key, query in zip(keys, queries) if embeddings[key] is None}
+        if missing:
+            for key, embedding in zip(missing, (encode_fn or self.encode)(list(missing.values()))):
+                self._query_embedding_cache.put(key, embedding)
+                embeddings[key] = embedding
+        return np.vstack([embeddings[key] for key in keys])
+
+    def search(
+        self,
+        query: str,
+        tool_name: str,
+        condensed: bool = False,
+        top_k: int = 5,
+        encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
         """
         Search for relevant tutorials based on query.
 
@@ -306,68 +1000,411 @@ class TutorialIndexer:
             tool_name: Name of the tool to search in
             condensed: Whether to search in condensed tutorials
             top_k: Number of top results to return
+            encode_fn: Function embedding a list of texts, encode if None
+            hybrid: Whether to fuse the dense ranking with a BM25 ranking over the titles, summaries and
+                API names of the tutorials, by reciprocal rank fusion
+            rrf_k: Rank offset of the reciprocal rank fusion
+            chunked: Whether to also rank the tutorials by their best matching sections and return only
+                these sections as content. Requires an index built with a chunk size; tutorials without
+                a matching section are returned whole.
+            chunk_neighbours: Number of sections before and after each matching section added as context
+            max_sections: Maximum number of matching sections returned per tutorial
 
         Returns:
-            List of dictionaries containing tutorial information and content
+            List of dictionaries containing tutorial information and content. With hybrid or chunked, the
+            score is the fused score and dense_score, bm25_score and chunk_score hold the scores of each
+            ranking (None if the tutorial is not in it). Chunked results also have the indices of the
+            returned sections.
         """
-        self._load_embedding_model()
-
         tutorial_type = "condensed_tutorials" if condensed else "tutorials"
+        # The index file changes with every index update, which invalidates the cached results
+        key = (
+            _normalize_query(query),
+            tool_name,
+            tutorial_type,
+            top_k,
+            hybrid,
+            rrf_k,
+            (chunk_neighbours, max_sections) if chunked else None,
+            self.index_file,
+        )
+        hits = self._result_cache.get(key)
+        if hits is None:
+            query_embedding = self.get_query_embedding(query, encode_fn)
+            if hybrid or chunked:
+                num_candidates = max(top_k, HYBRID_CANDIDATES)
+                rankings = {
+                    "dense_score": self._search_hits(query_embedding, tool_name, tutorial_type, num_candidates)
+                }
+                if hybrid:
+                    rankings["bm25_score"] = self._lexical_hits(query, tool_name, tutorial_type, num_candidates)
+                if chunked:
+                    rankings["chunk_score"] = self._chunk_hits(query_embedding, tool_name, tutorial_type)
+                hits = self._fuse_rankings(rankings, top_k, rrf_k)
+                if chunked:
+                    hits = [self._with_sections(hit, chunk_neighbours, max_sections) for hit in hits]
+            else:
+                hits = self._search_hits(query_embedding, tool_name, tutorial_type, top_k)
+            self._result_cache.put(key, hits)
+        else:
+            logger.info(f"Reusing cached search results for {tool_name} {tutorial_type}")
+        return self._with_contents(hits)
+
+    def search_many(
+        self,
+        queries: List[str],
+        tools: List[str],
+        condensed: bool = False,
+        top_k: int = 5,
+        encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+        chunked: bool = False,
+        chunk_neighbours: int = 1,
+        max_sections: int = 3,
+    ) -> List[Dict]:
+        """
+        Search the tutorials of several tools with several queries (e.g. query expansions) at once.
 
-        # Check if index exists
-        if tool_name not in self.indices or tutorial_type not in self.indices[tool_name]:
-            logger.warning(f"No index found for {tool_name} {tutorial_type}")
-            return []
+        The queries are embedded in one batch and the index of each tool is searched once with all
+        of them. For each query, the tutorials of all tools are ranked together (as in search); the
+        rankings of the queries are then fused by reciprocal rank fusion, so that tutorials found
+        by several queries come first and each tutorial is returned once.
 
-        index = self.indices[tool_name][tutorial_type]
-        metadata = self.metadata[tool_name][tutorial_type]
+        Args:
+            queries: Search queries
+            tools: Names of the tools to search in
+            condensed: Whether to search in condensed tutorials
+            top_k: Number of top results to return
+            encode_fn: Function embedding a list of texts, encode if None
+            hybrid: Whether to fuse the dense ranking of each query with a BM25 ranking, see search
+            rrf_k: Rank offset of the reciprocal rank fusions
+            chunked: Whether to also rank the tutorials by their best matching sections, see search
+            chunk_neighbours: Number of sections before and after each matching section added as context
+            max_sections: Maximum number of matching sections returned per tutorial
 
-        if index.ntotal == 0:
-            logger.warning(f"Empty index for {tool_name} {tutorial_type}")
+        Returns:
+            List of dictionaries containing tutorial information and content, as returned by search.
+            With several queries, the score is the fused score, matched_queries holds the indices of
+            the queries that found the tutorial and the other scores are the ones of its best ranking.
+        """
+        queries = list({_normalize_query(query): query for query in queries if query.strip()}.values())
+        tools = list(dict.fromkeys(tools))
+        if not queries or not tools:
             return []
+        tutorial_type = "condensed_tutorials" if condensed else "tutorials"
+        key = (
+            tuple(_normalize_query(query) for query in queries),
+            tuple(tools),
+            tutorial_type,
+            top_k,
+            hybrid,
+            rrf_k,
+            (chunk_neighbours, max_sections) if chunked else None,
+            self.index_file,
+        )
+        hits = self._result_cache.get(key)
+        if hits is None:
+            query_embeddings = self.get_query_embeddings(queries, encode_fn)
+            fused = hybrid or chunked or len(queries) > 1
+            num_candidates = max(top_k, HYBRID_CANDIDATES) if fused else top_k
+            # {score name: [ranking of each query]}, over the tutorials of all tools
+            rankings = {"dense_score": [[] for _ in queries]}
+            if hybrid:
+                rankings["bm25_score"] = [[] for _ in queries]
+            if chunked:
+                rankings["chunk_score"] = [[] for _ in queries]
+            for tool_name in tools:
+                tool_rankings = {
+                    "dense_score": self._search_hits_many(query_embeddings, tool_name, tutorial_type, num_candidates)
+                }
+                if hybrid:
+                    tool_rankings["bm25_score"] = [
+                        self._lexical_hits(query, tool_name, tutorial_type, num_candidates) for query in queries
+                    ]
+                if chunked:
+                    tool_rankings["chunk_score"] = self._chunk_hits_many(query_embeddings, tool_name, tutorial_type)
+                for score_name, query_hits in tool_rankings.items():
+                    for ranking, hits_of_tool in zip(rankings[score_name], query_hits):
+                        ranking.extend(hits_of_tool)
+
+            query_rankings = []
+            for query_index in range(len(queries)):
+                query_ranking = {
+                    score_name: sorted(ranking[query_index], key=lambda hit: hit["score"], reverse=True)[
+                        :num_candidates
+                    ]
+                    for score_name, ranking in rankings.items()
+                }
+                if fused:
+                    query_rankings.append(self._fuse_rankings(query_ranking, num_candidates, rrf_k))
+                else:
+                    query_rankings.append(query_ranking["dense_score"])
+            if len(query_rankings) == 1:
+                hits = query_rankings[0][:top_k]
+            else:
+                hits = self._fuse_queries(query_rankings, top_k, rrf_k)
+            if chunked:
+                hits = [self._with_sections(hit, chunk_neighbours, max_sections) for hit in hits]
+            self._result_cache.put(key, hits)
+        else:
+            logger.info(f"Reusing cached search results for {len(queries)} queries over {len(tools)} tools")
+        return self._with_contents(hits)
+
+    @staticmethod
+    def _fuse_queries(query_rankings: List[List[Dict]], top_k: int, rrf_k: int) -> List[Dict]:
+        """Fuse the rankings of several queries by reciprocal rank fusion, returning each tutorial once."""
+        fused: Dict[str, Dict] = {}
+        best_ranks: Dict[str, int] = {}
+        for query_index, ranking in enumerate(query_rankings):
+            for rank, hit in enumerate(ranking):
+                file_path = hit["file_path"]
+                entry = fused.setdefault(file_path, {"score": 0.0, "matched_queries": []})
+                if rank < best_ranks.get(file_path, len(ranking)):
+                    # The other scores are the ones of the query that ranks the tutorial highest
+                    best_ranks[file_path] = rank
+                    entry.update(
+                        {key: value for key, value in hit.items() if key not in ("score", "matched_sections")}
+                    )
+                if hit.get("matched_sections"):
+                    # The sections matching any of the queries are returned
+                    matched = (entry.get("matched_sections") or []) + hit["matched_sections"]
+                    entry["matched_sections"] = list(dict.fromkeys(matched))
+                entry["score"] += 1.0 / (rrf_k + rank + 1)
+                entry["matched_queries"].append(query_index)
+        return sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)[:top_k]
+
+    def _lexical_index(self, tool_name: str, tutorial_type: str) -> Tuple[BM25Index, List[Dict]]:
+        """The BM25 index of the tutorials of a tool, built from the current index version."""
+        key = (tool_name, tutorial_type, self.index_file)
+        lexical_index = self._lexical_indices.get(key)
+        if lexical_index is not None:
+            return lexical_index
+
+        hits = self.get_all_summaries(tool_name, condensed=tutorial_type == "condensed_tutorials")
+        documents = []
+        for hit in hits:
+            try:
+                content = self._read_tutorial(hit["file_path"])
+            except OSError:
+                content = ""
+            text = " ".join([extract_title(content), hit["summary"], " ".join(extract_api_names(content))])
+            documents.append(tokenize(text))
+        lexical_index = (BM25Index(documents), hits)
+        # Indices of previous versions are dropped
+        self._lexical_indices = {
+            other_key: value for other_key, value in self._lexical_indices.items() if other_key[2] == self.index_file
+        }
+        self._lexical_indices[key] = lexical_index
+        return lexical_index
+
+    def _lexical_hits(self, query: str, tool_name: str, tutorial_type: str, top_k: int) -> List[Dict]:
+        """The BM25 ranking of the tutorials of a tool."""
+        bm25_index, documents = self._lexical_index(tool_name, tutorial_type)
+        return [{**documents[index], "score": score} for index, score in bm25_index.search(tokenize(query), top_k)]
+
+    @staticmethod
+    def _fuse_rankings(rankings: Dict[str, List[Dict]], top_k: int, rrf_k: int) -> List[Dict]:
+        """Fuse rankings of tutorials by reciprocal rank fusion, keeping the score of each ranking."""
+        fused: Dict[str, Dict] = {}
+        for score_name, ranking in rankings.items():
+            for rank, hit in enumerate(ranking):
+                entry = fused.setdefault(hit["file_path"], {**dict.fromkeys(rankings, None), "score": 0.0})
+                for key, value in hit.items():
+                    if key != "score":
+                        entry.setdefault(key, value)
+                entry[score_name] = hit["score"]
+                entry["score"] += 1.0 / (rrf_k + rank + 1)
+        return sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)[:top_k]
+
+    def _chunk_hits(self, query_embedding: np.ndarray, tool_name: str, tutorial_type: str) -> List[Dict]:
+        """Rank the tutorials of a tool by their best matching section, with the matching sections."""
+        return self._chunk_hits_many(query_embedding, tool_name, tutorial_type)[0]
+
+    def _chunk_hits_many(self, query_embeddings: np.ndarray, tool_name: str, tutorial_type: str) -> List[List[Dict]]:
+        """Section rankings of the tutorials of a tool for each query, from one search of the section index."""
+        query_embeddings = np.atleast_2d(query_embeddings)
+        result = self._search_group(query_embeddings, tool_name, tutorial_type + CHUNK_TYPE_SUFFIX, CHUNK_CANDIDATES)
+        if result is None:
+            logger.warning(f"No section index found for {tool_name} {tutorial_type}, returning whole tutorials")
+            return [[] for _ in query_embeddings]
+
+        scores, indices = result
+        chunk_ids = sorted({int(idx) for row in indices for idx in row if idx != -1})
+        if not chunk_ids:
+            return [[] for _ in query_embeddings]
+        with self._lock:
+            chunks = {
+                chunk_id: (parent_id, chunk_index)
+                for chunk_id, parent_id, chunk_index in self._conn.execute(
+                    f"SELECT id, parent_id, chunk_index FROM chunks WHERE id IN ({', '.join('?' * len(chunk_ids))})",
+                    chunk_ids,
+                )
+            }
+
+        rankings = []
+        for row_scores, row_ids in zip(scores, indices):
+            # Sections are in decreasing score order, so the first section of a tutorial is its best
+            parents: Dict[int, Dict] = {}
+            for score, chunk_id in zip(row_scores, row_ids):
+                parent_id, chunk_index = chunks.get(int(chunk_id), (None, None))
+                if parent_id is None:
+                    continue
+                parent = parents.setdefault(parent_id, {"score": float(score), "matched_sections": []})
+                parent["matched_sections"].append(chunk_index)
+            rankings.append(parents)
+        metadata = self._fetch_metadata(sorted({parent_id for parents in rankings for parent_id in parents}))
+        return [
+            [{**metadata[parent_id], **parent} for parent_id, parent in parents.items() if parent_id in metadata]
+            for parents in rankings
+        ]
+
+    def _with_sections(self, hit: Dict, chunk_neighbours: int, max_sections: int) -> Dict:
+        """Assemble the matching sections of a tutorial and their neighbours as its content."""
+        matched = (hit.pop("matched_sections", None) or [])[:max_sections]
+        if not matched:
+            return hit
+        wanted = sorted(
+            {
+                chunk_index
+                for match in matched
+                for chunk_index in range(match - chunk_neighbours, match + chunk_neighbours + 1)
+                if chunk_index >= 0
+            }
+        )
+        # The first section is read for the title of the tutorial
+        chunk_indices = sorted(set(wanted) | {0})
+        with self._lock:
+            texts = dict(
+                self._conn.execute(
+                    "SELECT c.chunk_index, c.text FROM chunks c JOIN groups g USING (group_id) "
+                    "WHERE g.tool_name = ? AND g.tutorial_type = ? AND c.relative_path = ? "
+                    f"AND c.chunk_index IN ({', '.join('?' * len(chunk_indices))})",
+                    (hit["tool_name"], hit["tutorial_type"] + CHUNK_TYPE_SUFFIX, hit["relative_path"], *chunk_indices),
+                )
+            )
+        wanted = [chunk_index for chunk_index in wanted if chunk_index in texts]
+        if not wanted:
+            return hit
+
+        parts = []
+        if wanted[0] != 0:
+            # Keep the title and summary lines that the retriever and reranker read
+            parts += [f"# {extract_title(texts.get(0, ''))}\nSummary: {hit['summary']}", "[...]"]
+        for position, chunk_index in enumerate(wanted):
+            if position and chunk_index != wanted[position - 1] + 1:
+                parts.append("[...]")
+            parts.append(texts[chunk_index])
+        return {**hit, "content": "\n\n".join(parts), "sections": wanted}
+
+    def _fetch_metadata(self, vector_ids: List[int]) -> Dict[int, Dict]:
+        if not vector_ids:
+            return {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT t.id, g.tool_name, g.tutorial_type, t.file_path, t.relative_path, t.summary "
+                "FROM tutorials t JOIN groups g USING (group_id) "
+                f"WHERE t.id IN ({', '.join('?' * len(vector_ids))})",
+                vector_ids,
+            )
+            rows = cursor.fetchall()
+        return {
+            row[0]: dict(zip(("tool_name", "tutorial_type", "file_path", "relative_path", "summary"), row[1:]))
+            for row in rows
+        }
+
+    def search_by_embedding(
+        self, query_embedding: np.ndarray, tool_name: str, condensed: bool = False, top_k: int = 5
+    ) -> List[Dict]:
+        """
+        Search for relevant tutorials with an already encoded query.
 
-        # Generate query embedding
-        query_embedding = self.__silent_encode([query])
-
-        # Ensure proper data type and memory layout
-        if not isinstance(query_embedding, np.ndarray):
-            query_embedding = np.array(query_embedding)
-        query_embedding = np.ascontiguousarray(query_embedding.astype(np.float32))
-
-        # Normalize query embedding
-        faiss.normalize_L2(query_embedding)
+        Args:
+            query_embedding: L2-normalized query embedding, as returned by encode
+            tool_name: Name of the tool to search in
+            condensed: Whether to search in condensed tutorials
+            top_k: Number of top results to return
 
-        # Search
-        scores, indices = index.search(query_embedding, top_k)
+        Returns:
+            List of dictionaries containing tutorial information and content
+        """
+        tutorial_type = "condensed_tutorials" if condensed else "tutorials"
+        return self._with_contents(self._search_hits(query_embedding, tool_name, tutorial_type, top_k))
+
+    def _search_group(
+        self, query_embeddings: np.ndarray, tool_name: str, tutorial_type: str, k: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Search the vectors of a tool and tutorial type with one or more queries, None without index."""
+        with self._lock:
+            index, group_id = self.index, self.groups.get((tool_name, tutorial_type))
+            ann = self.ann_indices.get(group_id)
+        if index is None or group_id is None:
+            return None
 
+        query_embeddings = np.ascontiguousarray(np.asarray(query_embeddings, dtype=np.float32).reshape(-1, index.d))
+        if ann is not None:
+            return self._search_ann(ann, index, query_embeddings, k)
+        # Search only the ID range of the tool and tutorial type
+        selector = faiss.IDSelectorRange(group_id << GROUP_ID_SHIFT, (group_id + 1) << GROUP_ID_SHIFT)
+        return index.search(query_embeddings, k, params=faiss.SearchParameters(sel=selector))
+
+    def _search_hits(self, query_embedding: np.ndarray, tool_name: str, tutorial_type: str, top_k: int) -> List[Dict]:
+        """Search the index, returning the metadata and score of the hits."""
+        return self._search_hits_many(query_embedding, tool_name, tutorial_type, top_k)[0]
+
+    def _search_hits_many(
+        self, query_embeddings: np.ndarray, tool_name: str, tutorial_type: str, top_k: int
+    ) -> List[List[Dict]]:
+        """Search the index with several queries at once, returning the hits of each query."""
+        query_embeddings = np.atleast_2d(query_embeddings)
+        result = self._search_group(query_embeddings, tool_name, tutorial_type, top_k)
+        # Check if index exists
+        if result is None:
+            logger.warning(f"No index found for {tool_name} {tutorial_type}")
+            return [[] for _ in query_embeddings]
+
+        scores, indices = result
+        metadata = self._fetch_metadata(sorted({int(idx) for row in indices for idx in row if idx != -1}))
+
+        rankings = []
+        for row_scores, row_ids in zip(scores, indices):
+            hits = []
+            for score, idx in zip(row_scores, row_ids):
+                if idx == -1:  # No more results
+                    break
+                meta = metadata.get(int(idx))
+                if meta is not None:
+                    hits.append({**meta, "score": float(score)})
+            rankings.append(hits)
+        return rankings
+
+    def _read_tutorial(self, file_path: str) -> str:
+        """Read a tutorial, from memory unless the file changed since it was last read."""
+        stat = os.stat(file_path)
+        cached = self._content_cache.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        self._content_cache.put(file_path, (stat.st_mtime_ns, stat.st_size, content))
+        return content
+
+    def _with_contents(self, hits: List[Dict]) -> List[Dict]:
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx == -1:  # No more results
-                break
-
-            meta = metadata[idx]
-
+        for hit in hits:
+            if "content" in hit:
+                # Sections assembled by a chunked search
+                results.append(hit)
+                continue
             # Load full content from file
             try:
-                with open(meta["file_path"], "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                result = {
-                    "tool_name": meta["tool_name"],
-                    "tutorial_type": meta["tutorial_type"],
-                    "file_path": meta["file_path"],
-                    "relative_path": meta["relative_path"],
-                    "summary": meta["summary"],
-                    "content": content,
-                    "score": float(score),
-                }
-                results.append(result)
-
+                results.append({**hit, "content": self._read_tutorial(hit["file_path"])})
             except Exception as e:
-                logger.error(f"Error loading content from {meta['file_path']}: {e}")
+                logger.error(f"Error loading content from {hit['file_path']}: {e}")
                 continue
 
-        logger.info(f"Found {len(results)} results for query: {query}")
+        if hits:
+            logger.info(f"Found {len(results)} results for {hits[0]['tool_name']} {hits[0]['tutorial_type']}")
         return results
 
     def get_all_summaries(self, tool_name: str, condensed: bool = False) -> List[Dict]:
@@ -383,20 +1420,35 @@ class TutorialIndexer:
         """
         tutorial_type = "condensed_tutorials" if condensed else "tutorials"
 
-        if tool_name not in self.metadata or tutorial_type not in self.metadata[tool_name]:
-            return []
-
-        return self.metadata[tool_name][tutorial_type]
-
-    def rebuild_tool_index(self, tool_name: str) -> None:
+        with self._lock:
+            if self._conn is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT t.file_path, t.relative_path, t.summary FROM tutorials t JOIN groups g USING (group_id) "
+                "WHERE g.tool_name = ? AND g.tutorial_type = ? ORDER BY t.id",
+                (tool_name, tutorial_type),
+            ).fetchall()
+        return [
+            {
+                "tool_name": tool_name,
+                "tutorial_type": tutorial_type,
+                "file_path": file_path,
+                "relative_path": relative_path,
+                "summary": summary,
+            }
+            for file_path, relative_path, summary in rows
+        ]
+
+    def rebuild_tool_index(self, tool_name: str, force: bool = False) -> None:
         """
         Rebuild indices for a specific tool.
 
         Args:
             tool_name: Name of the tool to rebuild
+            force: Whether to re-embed all summaries instead of only the new or changed ones
         """
         logger.info(f"Rebuilding indices for tool: {tool_name}")
-        self.build_indices([tool_name])
+        self.update_indices([tool_name], force=force)
 
     def delete_tool_indices(self, tool_name: str) -> None:
         """
@@ -405,18 +1457,25 @@ class TutorialIndexer:
         Args:
             tool_name: Name of the tool to delete
         """
-        # Remove from memory
-        if tool_name in self.indices:
-            del self.indices[tool_name]
-        if tool_name in self.metadata:
-            del self.metadata[tool_name]
-
-        # Remove from disk
-        tool_dir = self.index_dir / tool_name
-        if tool_dir.exists():
-            import shutil
-
-            shutil.rmtree(tool_dir)
+        with self._write_lock():
+            self._delete_tool_rows(tool_name)
+
+    def _delete_tool_rows(self, tool_name: str) -> None:
+        indexed = self._read_rows()
+        plans = {
+            (tool_name, tutorial_type): {
+                "entries": [],
+                "to_embed": [],
+                "to_remove": [
+                    vector_id
+                    for vector_ids, _ in indexed.get((tool_name, tutorial_type), {}).values()
+                    for vector_id in vector_ids
+                ],
+            }
+            for tutorial_type in TUTORIAL_TYPES + [t + CHUNK_TYPE_SUFFIX for t in TUTORIAL_TYPES]
+        }
+        if any(plan["to_remove"] for plan in plans.values()):
+            self._apply_plans(plans, np.empty((0, 0), dtype=np.float32), rebuild=False)
             logger.info(f"Deleted indices for tool: {tool_name}")
 
     def get_index_stats(self) -> Dict[str, Dict[str, int]]:
@@ -427,10 +1486,17 @@ class TutorialIndexer:
             Dictionary with index statistics
         """
         stats = {}
-        for tool_name, tool_indices in self.indices.items():
-            stats[tool_name] = {}
-            for tutorial_type, index in tool_indices.items():
-                stats[tool_name][tutorial_type] = index.ntotal
+        with self._lock:
+            if self._conn is None:
+                return stats
+            rows = []
+            for table in ("tutorials", "chunks"):
+                rows += self._conn.execute(
+                    f"SELECT g.tool_name, g.tutorial_type, COUNT(*) FROM {table} t JOIN groups g USING (group_id) "
+                    "GROUP BY g.tool_name, g.tutorial_type"
+                ).fetchall()
+        for tool_name, tutorial_type, count in rows:
+            stats.setdefault(tool_name, {})[tutorial_type] = count
         return stats
 
     def __enter__(self):
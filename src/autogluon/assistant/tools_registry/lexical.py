@@ -0,0 +1,93 @@
+"""
+Lexical (BM25) scoring of tutorials.
+
+Dense retrieval misses exact identifiers, e.g. a query mentioning `TimeSeriesPredictor` or
+`time_limit`. Tutorials are indexed by their title, summary and the API names appearing in their
+code, and scored with Okapi BM25; TutorialIndexer fuses these scores with the dense ones.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+# Dotted calls (predictor.fit(, TabularPredictor.load() and CamelCase class names
+_API_PATTERN = re.compile(r"\b[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+(?=\s*\()|\b[A-Z][a-z0-9]+(?:[A-Z][A-Za-z0-9]*)+\b")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, snake_case names are also split into their parts."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        token = token.lower()
+        tokens.append(token)
+        if "_" in token.strip("_"):
+            tokens.extend(part for part in token.split("_") if part)
+    return tokens
+
+
+def extract_title(content: str) -> str:
+    """The first markdown heading of a tutorial."""
+    for line in content.split("\n"):
+        if line.strip().startswith("#"):
+            return line.lstrip("#").strip()
+    return ""
+
+
+def extract_api_names(content: str, limit: int = 100) -> List[str]:
+    """Distinct API names (dotted calls and class names) in order of appearance."""
+    return list(dict.fromkeys(_API_PATTERN.findall(content)))[:limit]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of tokenized documents."""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Index the documents.
+
+        Args:
+            documents: Tokens of each document
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_frequencies = [Counter(tokens) for tokens in documents]
+        self.lengths = [len(tokens) for tokens in documents]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+        document_frequencies: Dict[str, int] = Counter()
+        for frequencies in self.term_frequencies:
+            document_frequencies.update(frequencies.keys())
+        num_documents = len(documents)
+        self.idf = {
+            term: math.log(1 + (num_documents - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequencies.items()
+        }
+
+    def search(self, query_tokens: List[str], top_k: int) -> List[Tuple[int, float]]:
+        """
+        Score the documents against a query.
+
+        Args:
+            query_tokens: Tokens of the query
+            top_k: Number of top documents to return
+
+        Returns:
+            List of (document index, score) of the documents matching any query term, best first
+        """
+        query_terms = [term for term in dict.fromkeys(query_tokens) if term in self.idf]
+        scores = []
+        for index, frequencies in enumerate(self.term_frequencies):
+            length_norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.average_length or 1.0))
+            score = 0.0
+            for term in query_terms:
+                frequency = frequencies.get(term, 0)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + length_norm)
+            if score > 0:
+                scores.append((index, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
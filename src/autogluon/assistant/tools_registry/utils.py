@@ -30,6 +30,11 @@ def split_markdown_into_chunks(content: str, max_chunk_size: int = 4000) -> List
     for section in sections:
         # If a single section is larger than max_chunk_size, split it into smaller pieces
         if len(section) > max_chunk_size:
+            # Emit the pending sections first, so that chunks stay in document order
+            if current_chunk:
+                chunks.append("\n\n".join(current_chunk))
+                current_chunk = []
+                current_size = 0
             sub_chunks = _split_large_section(section, max_chunk_size)
             for sub_chunk in sub_chunks:
                 chunks.append(sub_chunk)
@@ -31,6 +31,7 @@ from autogluon.assistant.constants import (
     SUCCESS_MESSAGE,
     VERBOSITY_MAP,
 )
+from autogluon.assistant.managers.artifact_store import ArtifactReader
 from autogluon.assistant.prompts import (
     BashCoderPrompt,
     DescriptionFileRetrieverPrompt,
@@ -1256,7 +1257,7 @@ class TaskManager:
         # File paths
         exec_script_path = iter_dir / "execution_script.sh"
         gen_code_path = iter_dir / "generated_code.py"
-        stderr_path = iter_dir / "states" / "stderr"
+        states_reader = ArtifactReader(iter_dir / "states")
 
         # Create tabs for the files
         tabs = st.tabs(["🔧 Execution Script", "🐍 Generated Code", "❌ Stderr"])
@@ -1276,15 +1277,14 @@ class TaskManager:
                 st.info("Generated code not found")
 
         with tabs[2]:
-            if stderr_path.exists():
-                with open(stderr_path, "r") as f:
-                    content = f.read()
-                    if content.strip():
-                        # Clean markup tags from stderr content
-                        cleaned_content = re.sub(r"\[/?bold\s*(green|red)\]", "", content)
-                        st.code(cleaned_content, language="text")
-                    else:
-                        st.info("No error logs")
+            content = states_reader.read("stderr")
+            if content is not None:
+                if content.strip():
+                    # Clean markup tags from stderr content
+                    cleaned_content = re.sub(r"\[/?bold\s*(green|red)\]", "", content)
+                    st.code(cleaned_content, language="text")
+                else:
+                    st.info("No error logs")
             else:
                 st.info("Error log not found")
 
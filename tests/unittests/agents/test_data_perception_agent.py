@@ -0,0 +1,106 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from autogluon.assistant.agents import data_perception_agent
+from autogluon.assistant.agents.data_perception_agent import DataPerceptionAgent
+
+
+class FakePrompt:
+    def maybe_apply_meta_prompting(self):
+        pass
+
+    def build_with_profile(self, **kwargs):
+        return f"read {kwargs['file_path']}", None
+
+    def parse(self, response):
+        return response
+
+
+class FakeExecuter:
+    """Executer returning the code it was given as stdout and recording the timeouts"""
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self.executer_prompt = FakePrompt()
+        self.timeouts = []
+
+    def __call__(self, code_to_execute, code_to_analyze, execution_task, execution_data, timeout):
+        self.timeouts.append(timeout)
+        return "FINISH", None, None, None, "", code_to_execute
+
+
+class TestReadFiles:
+
+    @pytest.fixture
+    def agent(self):
+        """Data perception agent without LLMs, whose file reads are replaced per test"""
+        agent = DataPerceptionAgent.__new__(DataPerceptionAgent)
+        agent.python_reader_prompt = FakePrompt()
+        agent.executer = FakeExecuter()
+        agent.max_concurrent_file_reads = 3
+        agent.max_chars_per_file = 100
+        agent.file_read_timeout = 600
+        agent.use_native_readers = False
+        agent.reader_llm_config = SimpleNamespace(multi_turn=True)
+        agent.reader_llm = None
+        return agent
+
+    def test_files_are_read_concurrently(self, agent):
+        """Test that up to max_concurrent_file_reads files are read at the same time"""
+        active, max_active = [0], [0]
+        lock = threading.Lock()
+
+        def read_file(file_path, max_chars, deadline):
+            with lock:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+            return f"content of {file_path}"
+
+        agent.read_file = read_file
+        file_paths = [f"file_{i}.csv" for i in range(6)]
+        contents = agent._read_files(file_paths + file_paths[:2])
+
+        assert contents == {file_path: f"content of {file_path}" for file_path in file_paths}
+        assert max_active[0] == 3
+
+    def test_failing_and_slow_files_are_reported(self, agent):
+        """Test that a failing read and a read past file_read_timeout give errors without blocking the others"""
+        agent.file_read_timeout = 0.5
+        release = threading.Event()
+
+        def read_file(file_path, max_chars, deadline):
+            if file_path == "slow.csv":
+                release.wait(10)
+            if file_path == "broken.csv":
+                raise ValueError("unsupported format")
+            return "ok"
+
+        agent.read_file = read_file
+        try:
+            start_time = time.monotonic()
+            contents = agent._read_files(["slow.csv", "broken.csv", "good.csv"])
+            assert time.monotonic() - start_time < 5
+        finally:
+            release.set()
+
+        assert contents["good.csv"] == "ok"
+        assert contents["broken.csv"] == "Error reading file: unsupported format"
+        assert contents["slow.csv"] == "Error reading file: timed out after 0.5 seconds"
+
+    def test_reader_code_gets_the_time_left(self, agent, monkeypatch):
+        """Test that the generated code is executed with the time left before the deadline"""
+        monkeypatch.setattr(data_perception_agent, "query_llm", lambda llm, prompt, *args, **kwargs: "code")
+
+        result = agent.read_file("train.csv", max_chars=100, deadline=time.monotonic() + 5)
+        assert result == "code"
+        assert 0 < agent.executer.timeouts[0] <= 5
+
+        result = agent.read_file("train.csv", max_chars=100, deadline=time.monotonic() - 1)
+        assert result == "Error reading file: timed out after 600 seconds"
+        assert len(agent.executer.timeouts) == 1
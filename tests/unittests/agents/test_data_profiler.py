@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from autogluon.assistant.agents import data_profiler
+from autogluon.assistant.agents.data_profiler import DataProfiler, HyperLogLog, TDigest
+
+
+class TestSketches:
+
+    def test_hyperloglog_estimate(self):
+        """Test that the cardinality estimate is within a few percent and merging equals a single sketch"""
+        hashes = pd.util.hash_pandas_object(pd.Series(np.arange(100000)), index=False).to_numpy()
+        whole, first, second = HyperLogLog(12), HyperLogLog(12), HyperLogLog(12)
+        whole.add_hashes(hashes)
+        first.add_hashes(hashes[:50000])
+        second.add_hashes(hashes[40000:])
+        first.merge(second)
+
+        assert abs(whole.estimate() - 100000) / 100000 < 0.05
+        assert first.estimate() == whole.estimate()
+
+    def test_hyperloglog_small_cardinality(self):
+        """Test that small cardinalities are counted almost exactly"""
+        sketch = HyperLogLog(12)
+        sketch.add_hashes(pd.util.hash_pandas_object(pd.Series(np.arange(50).repeat(10)), index=False).to_numpy())
+        assert round(sketch.estimate()) == 50
+
+    def test_tdigest_quantiles(self):
+        """Test the quantiles of merged t-digests against the exact quantiles"""
+        values = np.random.default_rng(0).normal(size=200000)
+        digest = TDigest(200)
+        for chunk in np.array_split(values, 8):
+            chunk_digest = TDigest(200)
+            chunk_digest.update(chunk)
+            digest.merge(chunk_digest)
+
+        assert digest.min == values.min() and digest.max == values.max()
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            assert abs(digest.quantile(q) - np.quantile(values, q)) < 0.02
+        assert len(digest.means) < 1000
+
+
+class TestDataProfiler:
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """CSV file with a numeric column, a label column and missing values"""
+        df = pd.DataFrame(
+            {
+                "value": np.arange(1000, dtype=np.float64),
+                "label": ["cat", "dog", "bird", "fish"] * 250,
+            }
+        )
+        df.loc[::10, "value"] = np.nan
+        path = tmp_path / "train.csv"
+        df.to_csv(path, index=False)
+        return str(path)
+
+    @pytest.fixture
+    def profiler(self, tmp_path):
+        return DataProfiler(chunk_rows=128, max_workers=2, cache_dir=tmp_path / "cache")
+
+    def test_pandas_profile(self, profiler, csv_file, monkeypatch):
+        """Test the profile computed from pandas chunks when pyarrow is not available"""
+        monkeypatch.setattr(data_profiler, "pa_csv", None)
+        result = profiler.profile(csv_file)
+
+        lines = result.splitlines()
+        assert lines[:2] == ["Rows: 1000", "Columns (2):"]
+        assert "value: float64 | nulls 10.0% | distinct 900 | min 1, " in lines[2]
+        assert "max 999" in lines[2]
+        # The string dtype name depends on the pandas version
+        assert lines[3].startswith("  label: ")
+        assert "| nulls 0.0% | distinct 4 | values: 'cat' 25.0%, 'dog' 25.0%" in lines[3]
+
+    def test_profile_is_cached(self, profiler, csv_file, monkeypatch):
+        """Test that the profile of an unchanged file is read from the cache"""
+        monkeypatch.setattr(data_profiler, "pa_csv", None)
+        result = profiler.profile(csv_file)
+
+        monkeypatch.setattr(profiler, "_profile_chunks", lambda chunks: pytest.fail("profiled again"))
+        assert profiler.profile(csv_file) == result
+
+    def test_arrow_failure_continues_with_pandas(self, profiler, tmp_path):
+        """Test that rows after a block the streaming reader cannot parse are profiled with pandas"""
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "mixed.csv"
+        rows = [str(i) for i in range(200000)] + ["not a number"] + [str(i) for i in range(99)]
+        path.write_text("value\n" + "\n".join(rows) + "\n")
+
+        assert profiler.profile(str(path)).splitlines()[0] == "Rows: 200100"
+
+    def test_non_tabular_and_unreadable_files(self, profiler, tmp_path):
+        """Test that files that are not tabular or cannot be parsed are not profiled"""
+        text_file = tmp_path / "notes.txt"
+        text_file.write_text("notes")
+        broken = tmp_path / "broken.parquet"
+        broken.write_text("not parquet")
+
+        assert profiler.profile(str(text_file)) is None
+        assert profiler.profile(str(broken)) is None
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from autogluon.assistant.agents.directory_scanner import WILDCARD, scan_file_groups
+
+
+def touch(root, *rel_paths):
+    for rel_path in rel_paths:
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("x")
+
+
+class TestScanFileGroups:
+
+    @pytest.fixture
+    def folder(self, tmp_path):
+        """Folder with a CSV file, 30 training images and 3 test images"""
+        touch(tmp_path, "train.csv")
+        touch(tmp_path, *[f"train/{i}.jpg" for i in range(30)])
+        touch(tmp_path, *[f"test/{i}.jpg" for i in range(3)])
+        return str(tmp_path)
+
+    def groups_by_pattern(self, scan):
+        return {group.pattern: group for group in scan.groups}
+
+    def test_groups_by_folder_and_extension(self, folder):
+        """Test that files are grouped by folder and extension with exact counts"""
+        scan = scan_file_groups(folder, sample_size=5, seed=0)
+        groups = self.groups_by_pattern(scan)
+
+        assert scan.num_files == 34
+        assert not scan.stopped_early
+        assert groups[(".csv",)].count == 1
+        assert groups[("train", ".jpg")].count == 30
+        assert groups[("test", ".jpg")].count == 3
+
+    def test_samples_are_bounded(self, folder):
+        """Test that a group keeps at most sample_size files, and all files of a small group"""
+        groups = self.groups_by_pattern(scan_file_groups(folder, sample_size=5, seed=0))
+
+        assert len(groups[("train", ".jpg")].samples) == 5
+        assert sorted(rel_path for rel_path, _ in groups[("test", ".jpg")].samples) == [
+            os.path.join("test", f"{i}.jpg") for i in range(3)
+        ]
+
+    def test_many_folders_use_wildcard(self, tmp_path):
+        """Test that a depth with more distinct folders than max_unique_folders is collapsed"""
+        touch(tmp_path, *[f"class_{i}/image.png" for i in range(4)])
+        scan = scan_file_groups(str(tmp_path), sample_size=2, max_unique_folders=3, seed=0)
+
+        assert [(group.pattern, group.count) for group in scan.groups] == [((WILDCARD, ".png"), 4)]
+        assert len(scan.groups[0].samples) == 2
+
+    def test_early_stop_keeps_finding_new_groups(self, folder):
+        """Test that an early stop still finds the groups of folders listed afterwards"""
+        scan = scan_file_groups(folder, sample_size=5, stop_after_stable_files=5, seed=0)
+        groups = self.groups_by_pattern(scan)
+
+        assert scan.stopped_early
+        assert set(groups) == {(".csv",), ("train", ".jpg"), ("test", ".jpg")}
+        assert groups[("train", ".jpg")].count < 30
+        assert scan.num_files < 34
+
+    def test_early_stop_counts_small_groups_completely(self, folder):
+        """Test that groups are counted past an early stop until they exceed min_counted_files"""
+        scan = scan_file_groups(folder, sample_size=5, stop_after_stable_files=2, min_counted_files=3, seed=0)
+        groups = self.groups_by_pattern(scan)
+
+        assert scan.stopped_early
+        assert groups[("test", ".jpg")].count == 3
+        assert groups[("train", ".jpg")].count > 3
@@ -0,0 +1,41 @@
+import math
+
+from autogluon.assistant.llm.metrics import LatencyHistogram, summarize_latencies
+
+
+class TestLatencyHistogram:
+
+    def test_exact_percentiles_within_sample_bound(self):
+        """Test nearest-rank percentiles, buckets, sum and max when every latency is kept"""
+        histogram = LatencyHistogram()
+        for value in [3.0, 0.1, 2.0, 1.0, 0.7]:
+            histogram.observe(value)
+
+        assert histogram.summary() == {"count": 5, "mean": 6.8 / 5, "p50": 1.0, "p95": 3.0, "p99": 3.0, "max": 3.0}
+        assert histogram.bucket_counts[:4] == [1, 2, 1, 1]
+
+    def test_samples_are_bounded(self):
+        """Test that the reservoir stays bounded while counts, sum and max cover all observations"""
+        histogram = LatencyHistogram(max_samples=100)
+        for value in range(1, 10001):
+            histogram.observe(value / 1000)
+
+        assert len(histogram.samples) == 100
+        assert histogram.count == 10000
+        assert math.isclose(histogram.sum, 10000 * 10001 / 2000)
+        assert histogram.max == 10.0
+        assert sum(histogram.bucket_counts) == 10000
+        # The median of a uniform sample of 100 values out of 0.001..10 is close to 5
+        assert 3.5 < histogram.percentile(50) < 6.5
+
+    def test_empty_summary(self):
+        """Test the summary of a histogram without observations"""
+        assert summarize_latencies([]) == {
+            "count": 0,
+            "total": 0.0,
+            "mean": None,
+            "p50": None,
+            "p95": None,
+            "p99": None,
+            "max": None,
+        }
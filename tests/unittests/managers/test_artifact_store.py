@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from autogluon.assistant.managers.artifact_store import (
+    ARTIFACT_INDEX_NAME,
+    ARTIFACT_LOG_NAME,
+    ArtifactReader,
+    ArtifactStore,
+    read_index,
+)
+
+
+class TestArtifactStore:
+
+    @pytest.fixture
+    def store(self):
+        store = ArtifactStore()
+        yield store
+        store.close()
+
+    def test_round_trip(self, store, tmp_path):
+        """Test that queued artifacts are written to the log and read back after a flush"""
+        states_dir = str(tmp_path / "states")
+        store.put(states_dir, "prompt.txt", "the prompt")
+        store.put(states_dir, "response.txt", "the response")
+        store.flush()
+
+        assert sorted(os.listdir(states_dir)) == sorted([ARTIFACT_LOG_NAME, ARTIFACT_INDEX_NAME])
+        reader = ArtifactReader(states_dir)
+        assert reader.list() == ["prompt.txt", "response.txt"]
+        assert reader.read("prompt.txt") == "the prompt"
+        assert reader.read("response.txt") == "the response"
+        assert reader.read("missing.txt") is None
+
+    def test_identical_contents_are_stored_once(self, store, tmp_path):
+        """Test that an identical content is written once and shared by the index entries"""
+        states_dir = str(tmp_path)
+        store.put(states_dir, "a.txt", "same content")
+        store.put(states_dir, "b.txt", "same content")
+        store.flush()
+
+        entries = read_index(states_dir)
+        assert len(entries) == 2
+        assert entries[0]["offset"] == entries[1]["offset"]
+        assert os.path.getsize(os.path.join(states_dir, ARTIFACT_LOG_NAME)) == entries[0]["length"]
+
+    def test_latest_version_wins(self, store, tmp_path):
+        """Test that rewriting an artifact returns its latest content"""
+        states_dir = str(tmp_path)
+        store.put(states_dir, "stdout.txt", "first")
+        store.flush()
+        store.put(states_dir, "stdout.txt", "second")
+        store.flush()
+
+        assert ArtifactReader(states_dir).read("stdout.txt") == "second"
+
+    def test_resumed_log_is_appended(self, store, tmp_path):
+        """Test that a new store appends to the log of an earlier one and reuses its blobs"""
+        states_dir = str(tmp_path)
+        store.put(states_dir, "a.txt", "content")
+        store.close()
+
+        resumed = ArtifactStore()
+        resumed.put(states_dir, "b.txt", "content")
+        resumed.put(states_dir, "c.txt", "other content")
+        resumed.close()
+
+        entries = read_index(states_dir)
+        assert entries[0]["offset"] == entries[1]["offset"]
+        reader = ArtifactReader(states_dir)
+        assert [reader.read(name) for name in ("a.txt", "b.txt", "c.txt")] == ["content", "content", "other content"]
+
+    def test_put_after_close_fails(self, store, tmp_path):
+        """Test that a closed store rejects new artifacts"""
+        store.close()
+        with pytest.raises(RuntimeError):
+            store.put(str(tmp_path), "a.txt", "content")
+
+
+class TestArtifactReader:
+
+    def test_falls_back_to_plain_files(self, tmp_path):
+        """Test that plain files of the directory are listed and read like stored artifacts"""
+        (tmp_path / "legacy.txt").write_text("legacy content")
+        reader = ArtifactReader(str(tmp_path))
+
+        assert reader.list() == ["legacy.txt"]
+        assert reader.exists("legacy.txt")
+        assert reader.read("legacy.txt") == "legacy content"
+
+    def test_partial_index_line_is_ignored(self, tmp_path):
+        """Test that a partially written last index line does not break reading"""
+        store = ArtifactStore()
+        store.put(str(tmp_path), "a.txt", "content")
+        store.close()
+        with open(tmp_path / ARTIFACT_INDEX_NAME, "a", encoding="utf-8") as f:
+            f.write('{"name": "b.txt", "sha')
+
+        assert ArtifactReader(str(tmp_path)).list() == ["a.txt"]
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from autogluon.assistant.managers.error_memory import ErrorMemory
+from autogluon.assistant.prompts.token_counter import TokenCounter
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+# Cosine similarities: oom_a / oom_b 0.95, oom_a / key 0.8
+EMBEDDINGS = {
+    "oom_a": unit(1.0, 0.0, 0.0),
+    "oom_b": unit(0.95, np.sqrt(1 - 0.95**2), 0.0),
+    "key": unit(0.8, 0.0, 0.6),
+}
+
+
+class TestErrorMemory:
+
+    @pytest.fixture
+    def counter(self):
+        counter = TokenCounter()
+        counter.encoding = None
+        return counter
+
+    @pytest.fixture
+    def memory(self, counter):
+        """Error memory with fixed embeddings and a 0.9 cosine threshold"""
+        return ErrorMemory(
+            embed_fn=lambda texts: np.stack([EMBEDDINGS[text] for text in texts]),
+            similarity_threshold=0.9,
+            token_counter=counter,
+        )
+
+    def test_similar_analyses_are_clustered(self, memory):
+        """Test that analyses above the cosine threshold join a cluster and the others do not"""
+        memory.add("oom_a", 1)
+        memory.add("oom_b", 2)
+        memory.add("key", 3)
+
+        assert len(memory) == 3
+        assert [cluster.count for cluster in memory.clusters] == [2, 1]
+        assert memory.clusters[0].time_steps == [1, 2]
+
+    def test_stricter_threshold_separates_close_analyses(self, counter):
+        """Test that a stricter threshold keeps close analyses apart"""
+        memory = ErrorMemory(
+            embed_fn=lambda texts: np.stack([EMBEDDINGS[text] for text in texts]),
+            similarity_threshold=0.99,
+            token_counter=counter,
+        )
+        memory.add("oom_a", 1)
+        memory.add("oom_b", 2)
+
+        assert len(memory.clusters) == 2
+
+    def test_lexical_fallback_without_embedder(self, counter):
+        """Test token-set Jaccard clustering when no embedder is available"""
+        memory = ErrorMemory(embed_fn=None, token_counter=counter)
+        memory.add("CUDA out of memory in training loop", 1)
+        memory.add("CUDA out of memory in the training loop", 2)
+        memory.add("KeyError: label column not found", 3)
+
+        assert [cluster.count for cluster in memory.clusters] == [2, 1]
+
+    def test_embedding_failure_falls_back_to_lexical(self, counter):
+        """Test that a failing embedder switches the memory to lexical similarity"""
+
+        def failing_embed(texts):
+            raise RuntimeError("model unavailable")
+
+        memory = ErrorMemory(embed_fn=failing_embed, token_counter=counter)
+        memory.add("CUDA out of memory in training loop", 1)
+        memory.add("CUDA out of memory in training loop", 2)
+
+        assert memory.embed_fn is None
+        assert [cluster.count for cluster in memory.clusters] == [2]
+
+    def test_representative_prefers_lineage(self, memory):
+        """Test that the rendered analysis of a cluster is the latest one of the current lineage"""
+        memory.add("oom_a", 1)
+        memory.add("oom_b", 2)
+
+        assert "oom_a" in memory.render(lineage_steps={1})
+        assert "oom_b" not in memory.render(lineage_steps={1})
+        assert "oom_b" in memory.render(lineage_steps=set())
+        assert memory.render().startswith("[Seen 2 times, in steps 1, 2]")
+
+    def test_budget_keeps_lineage_clusters_first(self, counter):
+        """Test that clusters of the lineage are kept over more recent ones when the budget is tight"""
+        memory = ErrorMemory(embed_fn=None, max_tokens=10, token_counter=counter)
+        memory.add("lineage error " + "a" * 20, 1)
+        memory.add("recent error " + "b" * 20, 2)
+
+        rendered = memory.render(lineage_steps={1})
+        assert "lineage error" in rendered
+        assert "recent error" not in rendered
+        assert rendered.endswith("(1 other distinct errors omitted.)")
+
+        rendered = memory.render(lineage_steps=set())
+        assert "recent error" in rendered
+        assert "lineage error" not in rendered
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from autogluon.assistant.managers.perception_cache import PerceptionCache, fingerprint_file, fingerprint_folder
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestFingerprint:
+
+    @pytest.fixture
+    def folder(self, tmp_path):
+        """Input folder with a CSV file and three images"""
+        folder = tmp_path / "data"
+        write(folder / "train.csv", "a,b\n1,2\n")
+        for i in range(3):
+            write(folder / "images" / f"{i}.png", f"image {i}")
+        return folder
+
+    def test_unchanged_folder_has_same_fingerprint(self, folder):
+        """Test that fingerprinting twice gives the same result"""
+        assert fingerprint_folder(str(folder)) == fingerprint_folder(str(folder))
+
+    def test_content_change_keeping_size_and_mtime(self, folder):
+        """Test that a hashed file changed without changing its size and mtime changes the fingerprint"""
+        path = folder / "train.csv"
+        stat = os.stat(path)
+        fingerprint, _ = fingerprint_folder(str(folder))
+
+        path.write_text("a,b\n3,4\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert fingerprint_folder(str(folder))[0] != fingerprint
+
+    def test_only_first_files_of_a_group_are_hashed(self, folder):
+        """Test that files past hashed_files_per_group in their group are fingerprinted by size and mtime"""
+        _, file_fingerprints = fingerprint_folder(str(folder), hashed_files_per_group=2)
+        images = [str(folder / "images" / f"{i}.png") for i in range(3)]
+
+        assert [len(file_fingerprints[image]) for image in images] == [3, 3, 2]
+        assert len(file_fingerprints[str(folder / "train.csv")]) == 3
+
+    def test_renamed_file_changes_fingerprint(self, folder):
+        """Test that the relative paths are part of the folder fingerprint"""
+        fingerprint, _ = fingerprint_folder(str(folder))
+        os.rename(folder / "train.csv", folder / "test.csv")
+        assert fingerprint_folder(str(folder))[0] != fingerprint
+
+    def test_fingerprint_file_without_content(self, folder):
+        """Test that a file fingerprint without content hash only has its size and mtime"""
+        stat = os.stat(folder / "train.csv")
+        assert fingerprint_file(str(folder / "train.csv"), hash_content=False) == [stat.st_size, stat.st_mtime_ns]
+
+
+class TestPerceptionCache:
+
+    @pytest.fixture
+    def folder(self, tmp_path):
+        folder = tmp_path / "data"
+        write(folder / "train.csv", "a,b\n1,2\n")
+        write(folder / "test.csv", "a\n1\n")
+        return folder
+
+    def make_cache(self, folder, tmp_path, context="task", reader_context="reader"):
+        return PerceptionCache(str(folder), context, reader_context, cache_dir=tmp_path / "cache")
+
+    def test_outputs_are_reused(self, folder, tmp_path):
+        """Test that outputs stored for an unchanged folder and context are returned by a new cache"""
+        self.make_cache(folder, tmp_path).put_outputs({"data_prompt": "prompt"})
+        assert self.make_cache(folder, tmp_path).get_outputs() == {"data_prompt": "prompt"}
+
+    def test_outputs_invalidated_by_context_or_folder_change(self, folder, tmp_path):
+        """Test that outputs are not reused when the context or a file changes"""
+        self.make_cache(folder, tmp_path).put_outputs({"data_prompt": "prompt"})
+        assert self.make_cache(folder, tmp_path, context="other task").get_outputs() is None
+
+        write(folder / "train.csv", "a,b\n1,2\n3,4\n")
+        assert self.make_cache(folder, tmp_path).get_outputs() is None
+
+    def test_summaries_of_unchanged_files_are_reused(self, folder, tmp_path):
+        """Test that only the summaries of changed files are dropped"""
+        train, test = str(folder / "train.csv"), str(folder / "test.csv")
+        self.make_cache(folder, tmp_path).put_file_summaries({train: "train summary", test: "test summary"})
+
+        write(folder / "test.csv", "a\n1\n2\n")
+        cache = self.make_cache(folder, tmp_path)
+        assert cache.get_file_summaries([train, test]) == {train: "train summary"}
+
+    def test_summaries_invalidated_by_reader_context(self, folder, tmp_path):
+        """Test that summaries written with another reader configuration are not reused"""
+        train = str(folder / "train.csv")
+        self.make_cache(folder, tmp_path).put_file_summaries({train: "train summary"})
+        assert self.make_cache(folder, tmp_path, reader_context="other reader").get_file_summaries([train]) == {}
+
+    def test_unreadable_cache_is_ignored(self, folder, tmp_path):
+        """Test that a corrupted cache file is treated as empty"""
+        cache = self.make_cache(folder, tmp_path)
+        cache.cache_path.parent.mkdir(parents=True)
+        cache.cache_path.write_text("{not json")
+        assert self.make_cache(folder, tmp_path).get_outputs() is None
@@ -0,0 +1,49 @@
+import pytest
+
+from autogluon.assistant.prompts.token_counter import DEFAULT_CHARS_PER_TOKEN, TokenCounter
+
+
+class TestTokenCounterFallback:
+
+    @pytest.fixture
+    def counter(self):
+        """Token counter without a tokenizer, which estimates tokens from characters"""
+        counter = TokenCounter()
+        counter.encoding = None
+        return counter
+
+    def test_count_estimates_four_chars_per_token(self, counter):
+        """Test the characters / 4 estimate, rounded up"""
+        assert DEFAULT_CHARS_PER_TOKEN == 4.0
+        assert counter.count("") == 0
+        assert counter.count("abcd") == 1
+        assert counter.count("abcde") == 2
+        assert counter.count("x" * 4000) == 1000
+
+    def test_truncate_keeps_short_text(self, counter):
+        """Test that a text within the budget is returned as is"""
+        text = "x" * 40
+        assert counter.truncate(text, 10) == text
+
+    def test_truncate_end_keeps_beginning(self, counter):
+        """Test truncation of the end of a text"""
+        text = "a" * 200 + "b" * 200
+        result = counter.truncate(text, 50, mode="end")
+        assert result.startswith("a" * 200)
+        assert "b" not in result.split("[...TRUNCATED")[0]
+        assert "TRUNCATED (50 tokens)" in result
+
+    def test_truncate_start_keeps_end(self, counter):
+        """Test truncation of the start of a text"""
+        text = "a" * 200 + "b" * 200
+        result = counter.truncate(text, 50, mode="start")
+        assert result.endswith("b" * 200)
+        assert "a" not in result.split("...]")[-1]
+
+    def test_truncate_mid_keeps_both_ends(self, counter):
+        """Test truncation of the middle of a text"""
+        text = "a" * 200 + "m" * 400 + "b" * 200
+        result = counter.truncate(text, 100, mode="mid")
+        head, tail = result.split("[...TRUNCATED (100 tokens)...]")
+        assert head.strip("\n") == "a" * 200
+        assert tail.strip("\n") == "b" * 200
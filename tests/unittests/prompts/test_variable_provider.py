@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from autogluon.assistant.prompts.token_counter import TokenCounter
+from autogluon.assistant.prompts.variable_provider import (
+    SMALL_VARIABLE_TOKENS,
+    TRUNCATION_MARKER_TOKENS,
+    VariableProvider,
+    compile_template,
+)
+
+TEMPLATE = "A {high} B {low}"
+FIXED_TOKENS = 2  # "A  B " is 5 characters
+
+
+class TestPackValues:
+
+    @pytest.fixture
+    def counter(self):
+        """Token counter estimating 4 characters per token, so that budgets are exact"""
+        counter = TokenCounter()
+        counter.encoding = None
+        return counter
+
+    @pytest.fixture
+    def provider(self):
+        """Variable provider with fixed (priority, min_share, truncate_mode) per variable"""
+        provider = VariableProvider(manager=None)
+        specs = {"high": (90, 0.1, "end"), "low": (10, 0.2, "start"), "name": (100, 0.5, "mid")}
+        provider._get_budget_spec = lambda var_name: specs[var_name]
+        return provider
+
+    def pack(self, provider, counter, values, token_budget, template=TEMPLATE):
+        return provider._pack_values(compile_template(template), values, token_budget, counter)
+
+    def test_values_within_budget_are_unchanged(self, provider, counter):
+        """Test that nothing is truncated when the values fit"""
+        values = {"high": "x" * 4000, "low": "y" * 4000}
+        assert self.pack(provider, counter, values, 2000 + FIXED_TOKENS) == values
+
+    def test_priority_gets_remaining_budget(self, provider, counter):
+        """Test that the budget left after the minimum shares goes to the higher priority variable"""
+        values = {"high": "x" * 4000, "low": "y" * 4000}
+        packed = self.pack(provider, counter, values, 1000 + FIXED_TOKENS)
+
+        # Minimum shares: 100 tokens for high and 200 for low, the remaining 700 go to high
+        assert 800 - TRUNCATION_MARKER_TOKENS - 10 <= counter.count(packed["high"]) <= 800
+        assert counter.count(packed["low"]) <= 200
+        assert counter.count(packed["high"]) + counter.count(packed["low"]) <= 1000
+
+    def test_min_share_is_reserved_for_low_priority(self, provider, counter):
+        """Test that a low priority variable keeps its minimum share of the budget"""
+        values = {"high": "x" * 40000, "low": "y" * 4000}
+        packed = self.pack(provider, counter, values, 1000 + FIXED_TOKENS)
+
+        assert counter.count(packed["low"]) >= 200 - TRUNCATION_MARKER_TOKENS - 10
+        assert "y" in packed["low"]
+
+    def test_truncation_modes(self, provider, counter):
+        """Test that each variable is truncated with its own mode"""
+        values = {"high": "h" * 2000 + "x" * 2000, "low": "y" * 2000 + "l" * 2000}
+        packed = self.pack(provider, counter, values, 1000 + FIXED_TOKENS)
+
+        # high is truncated at the end, low at the start
+        assert packed["high"].startswith("h") and packed["high"].rstrip().endswith("...]")
+        assert packed["low"].endswith("l") and packed["low"].lstrip().startswith("[...TRUNCATED")
+
+    def test_truncation_directive_overrides_mode(self, provider, counter):
+        """Test that the mode of a truncation directive in the template takes precedence"""
+        template = "A {high_truncate_start_100} B {low}"
+        values = {"high_truncate_start_100": "h" * 2000 + "x" * 2000, "low": "y" * 4000}
+        packed = self.pack(provider, counter, values, 1000 + FIXED_TOKENS, template=template)
+
+        assert packed["high_truncate_start_100"].endswith("x")
+
+    def test_small_variables_are_never_truncated(self, provider, counter):
+        """Test that variables up to SMALL_VARIABLE_TOKENS are kept whole, even over the budget"""
+        name = "n" * (SMALL_VARIABLE_TOKENS * 4)
+        values = {"name": name, "high": "x" * 4000}
+        packed = self.pack(provider, counter, values, 500, template="{name} {high}")
+
+        assert packed["name"] == name
+        assert counter.count(packed["high"]) <= 500 - SMALL_VARIABLE_TOKENS
+
+
+class TestValueMemo:
+
+    class Manager:
+        time_step = 0
+        current_node = None
+        state_version = 0
+
+    @pytest.fixture
+    def provider(self):
+        """Variable provider counting the resolutions of each variable"""
+        provider = VariableProvider(manager=self.Manager())
+        provider.resolved = []
+
+        def resolve(var_name):
+            provider.resolved.append(var_name)
+            return f"{var_name}@{provider.manager.state_version}"
+
+        provider._resolve_value = resolve
+        return provider
+
+    def test_values_are_memoized_per_state(self, provider):
+        """Test that a value is resolved once per state version"""
+        assert provider.get_value("a") == "a@0"
+        assert provider.get_value("a") == "a@0"
+        provider.manager.state_version += 1
+        assert provider.get_value("a") == "a@1"
+        assert provider.resolved == ["a", "a"]
+
+    def test_value_resolved_during_state_change_is_not_memoized(self, provider):
+        """Test that a value is not cached for a state that changed while it was resolved"""
+
+        def resolve(var_name):
+            provider.resolved.append(var_name)
+            provider.manager.state_version += 1
+            return "stale"
+
+        provider._resolve_value = resolve
+        assert provider.get_value("a") == "stale"
+        assert provider._value_cache == {}
+
+    def test_concurrent_reads_during_state_changes(self, provider):
+        """Test that concurrent reads do not fail while another thread bumps the state version"""
+        errors = []
+
+        def read():
+            try:
+                for _ in range(500):
+                    provider.get_value("a")
+            except Exception as e:
+                errors.append(e)
+
+        def bump():
+            for _ in range(500):
+                provider.manager.state_version += 1
+
+        threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=bump)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
@@ -0,0 +1,86 @@
+import pytest
+
+from autogluon.assistant.tools_registry.indexing import TutorialIndexer
+
+
+def hit(file_path, score, **extra):
+    return {"file_path": file_path, "score": score, **extra}
+
+
+class TestFuseRankings:
+
+    def test_reciprocal_rank_fusion(self):
+        """Test that fused scores are the sums of 1 / (rrf_k + rank) over the rankings"""
+        rankings = {
+            "dense_score": [hit("a.md", 0.9), hit("b.md", 0.8)],
+            "bm25_score": [hit("b.md", 12.0), hit("c.md", 3.0)],
+        }
+        fused = TutorialIndexer._fuse_rankings(rankings, top_k=3, rrf_k=60)
+
+        assert [h["file_path"] for h in fused] == ["b.md", "a.md", "c.md"]
+        assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused[1]["score"] == 1 / 61
+        assert fused[2]["score"] == 1 / 62
+
+    def test_keeps_the_score_of_each_ranking(self):
+        """Test that each fused hit has the score of every ranking, None if it is not in it"""
+        rankings = {
+            "dense_score": [hit("a.md", 0.9, summary="A")],
+            "bm25_score": [hit("b.md", 12.0, summary="B")],
+        }
+        fused = {h["file_path"]: h for h in TutorialIndexer._fuse_rankings(rankings, top_k=2, rrf_k=60)}
+
+        assert fused["a.md"]["dense_score"] == 0.9 and fused["a.md"]["bm25_score"] is None
+        assert fused["b.md"]["dense_score"] is None and fused["b.md"]["bm25_score"] == 12.0
+        assert fused["b.md"]["summary"] == "B"
+
+    def test_top_k(self):
+        """Test that only the top_k fused hits are returned, each tutorial once"""
+        rankings = {"dense_score": [hit(f"{i}.md", 1.0 - i / 10) for i in range(5)]}
+        fused = TutorialIndexer._fuse_rankings(rankings, top_k=2, rrf_k=60)
+
+        assert [h["file_path"] for h in fused] == ["0.md", "1.md"]
+
+
+class TestFuseQueries:
+
+    def test_tutorials_found_by_several_queries_rank_first(self):
+        """Test that each tutorial is returned once, with the fused score and the queries matching it"""
+        query_rankings = [
+            [hit("a.md", 0.9), hit("b.md", 0.8)],
+            [hit("c.md", 0.7), hit("b.md", 0.6)],
+        ]
+        fused = TutorialIndexer._fuse_queries(query_rankings, top_k=5, rrf_k=60)
+
+        assert [h["file_path"] for h in fused] == ["b.md", "a.md", "c.md"]
+        assert fused[0]["score"] == pytest.approx(2 / 62)
+        assert fused[0]["matched_queries"] == [0, 1]
+        assert fused[1]["matched_queries"] == [0]
+
+    def test_keeps_the_scores_of_the_best_ranking_query(self):
+        """Test that the other scores of a tutorial are the ones of the query ranking it highest"""
+        query_rankings = [
+            [hit("x.md", 0.5, dense_score=0.5), hit("a.md", 0.4, dense_score=0.4)],
+            [hit("a.md", 0.8, dense_score=0.8)],
+        ]
+        fused = {h["file_path"]: h for h in TutorialIndexer._fuse_queries(query_rankings, top_k=5, rrf_k=60)}
+
+        assert fused["a.md"]["dense_score"] == 0.8
+
+    def test_unions_matched_sections(self):
+        """Test that the sections matching any of the queries are returned, once each"""
+        query_rankings = [
+            [hit("a.md", 0.9, matched_sections=[0, 2])],
+            [hit("a.md", 0.8, matched_sections=[2, 5])],
+        ]
+        fused = TutorialIndexer._fuse_queries(query_rankings, top_k=5, rrf_k=60)
+
+        assert len(fused) == 1
+        assert fused[0]["matched_sections"] == [0, 2, 5]
+
+    def test_top_k(self):
+        """Test that only the top_k fused tutorials are returned"""
+        query_rankings = [[hit(f"{i}.md", 1.0) for i in range(4)], [hit("3.md", 1.0)]]
+        fused = TutorialIndexer._fuse_queries(query_rankings, top_k=2, rrf_k=60)
+
+        assert [h["file_path"] for h in fused] == ["3.md", "0.md"]
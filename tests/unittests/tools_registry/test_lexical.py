@@ -0,0 +1,58 @@
+from autogluon.assistant.tools_registry.lexical import BM25Index, extract_api_names, extract_title, tokenize
+
+
+class TestTokenize:
+
+    def test_lower_cases_and_splits_snake_case(self):
+        """Test that snake_case names are kept whole and split into their parts"""
+        assert tokenize("Set time_limit=60") == ["set", "time_limit", "time", "limit", "60"]
+
+    def test_keeps_leading_underscores_whole(self):
+        """Test that dunder names are not split"""
+        assert tokenize("__init__") == ["__init__"]
+
+    def test_extract_title_and_api_names(self):
+        """Test the title and API names indexed with the summaries"""
+        content = "Intro\n## Forecasting\npredictor = TimeSeriesPredictor()\npredictor.fit(train_data)\n"
+        assert extract_title(content) == "Forecasting"
+        assert extract_api_names(content) == ["TimeSeriesPredictor", "predictor.fit"]
+
+
+class TestBM25Index:
+
+    def test_exact_identifier_ranks_first(self):
+        """Test that the document mentioning a rare identifier ranks first"""
+        index = BM25Index(
+            [
+                tokenize("tabular classification with TabularPredictor"),
+                tokenize("forecasting with TimeSeriesPredictor and time_limit"),
+                tokenize("image classification with MultiModalPredictor"),
+            ]
+        )
+        results = index.search(tokenize("time_limit forecasting"), top_k=3)
+        assert [document for document, _ in results] == [1]
+
+    def test_rare_terms_weigh_more(self):
+        """Test that a term appearing in fewer documents contributes more to the score"""
+        index = BM25Index([["common", "rare"], ["common"], ["common"], ["other"]])
+        assert index.idf["rare"] > index.idf["common"]
+        results = dict(index.search(["common", "rare"], top_k=4))
+        assert results[0] > results[1] == results[2]
+        assert 3 not in results
+
+    def test_longer_documents_are_normalized(self):
+        """Test that the same term frequency scores lower in a longer document"""
+        index = BM25Index([["fit"], ["fit"] + ["padding"] * 20, ["other"]])
+        results = index.search(["fit"], top_k=2)
+        assert [document for document, _ in results] == [0, 1]
+        assert results[0][1] > results[1][1]
+
+    def test_top_k_and_unknown_terms(self):
+        """Test that results are limited to top_k and unknown query terms are ignored"""
+        index = BM25Index([["a"], ["a", "a"], ["a", "b"]])
+        assert len(index.search(["a"], top_k=2)) == 2
+        assert index.search(["unknown"], top_k=3) == []
+
+    def test_empty_index(self):
+        """Test searching an index without documents"""
+        assert BM25Index([]).search(["a"], top_k=5) == []
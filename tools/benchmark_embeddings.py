@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Embedding backend benchmark
+Compares the embedding backends of the tutorial indexer (torch and onnx_int8) on the tutorial
+summaries of the registered tools: model load and first-call latency, encode throughput, and
+recall@k of each backend's nearest summaries against the torch baseline, with tutorial titles
+(or the given queries) as queries.
+
+Usage:
+    python tools/benchmark_embeddings.py [--backends torch onnx_int8] [--num-threads 4] [--queries queries.txt]
+"""
+
+import argparse
+import resource
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from autogluon.assistant.tools_registry import get_tool_tutorials_folder, list_tools
+from autogluon.assistant.tools_registry.indexing import EMBEDDING_BACKENDS, TutorialIndexer
+from autogluon.assistant.tools_registry.lexical import extract_title
+
+
+def collect_tutorials(condensed: bool) -> Tuple[List[str], List[str]]:
+    """Summaries and titles of the tutorials of all tools."""
+    summaries, titles = [], []
+    for tool_name in list_tools():
+        try:
+            folder = get_tool_tutorials_folder(tool_name, condensed=condensed)
+        except FileNotFoundError:
+            continue
+        for md_file in sorted(folder.rglob("*.md")):
+            content = md_file.read_text(encoding="utf-8")
+            summary = next(
+                (line.strip()[9:] for line in content.split("\n") if line.strip().startswith("Summary: ")), ""
+            )
+            if summary.strip():
+                summaries.append(summary)
+                titles.append(extract_title(content) or md_file.stem)
+    return summaries, titles
+
+
+def run_backend(backend: str, num_threads: int, summaries: List[str], queries: List[str], batch_size: int) -> Dict:
+    indexer = TutorialIndexer(embedding_backend=backend, num_threads=num_threads)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    first_call_seconds = indexer.warmup()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    documents = np.vstack(
+        [indexer.encode(summaries[i : i + batch_size]) for i in range(0, len(summaries), batch_size)]
+    )
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    query_embeddings = np.vstack([indexer.encode([query]) for query in queries])
+    query_seconds = time.perf_counter() - start
+    indexer.cleanup()
+
+    return {
+        "backend": backend,
+        "first_call_seconds": first_call_seconds,
+        # ru_maxrss is in KB on Linux; the peak only grows, so later backends may report less
+        "peak_rss_increase_mb": (rss_after - rss_before) / 1024,
+        "texts_per_second": len(summaries) / encode_seconds,
+        "query_latency_ms": 1000 * query_seconds / max(len(queries), 1),
+        "documents": documents,
+        "queries": query_embeddings,
+    }
+
+
+def top_k(queries: np.ndarray, documents: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ documents.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the embedding backends of the tutorial indexer")
+    parser.add_argument("--backends", nargs="+", default=EMBEDDING_BACKENDS, choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--num-threads", type=int, default=None, help="Threads of the embedding model")
+    parser.add_argument("--queries", help="Text file with one query per line (tutorial titles if omitted)")
+    parser.add_argument("--condensed", action="store_true", help="Use the condensed tutorials")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    summaries, titles = collect_tutorials(args.condensed)
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = titles
+    print(f"{len(summaries)} tutorial summaries, {len(queries)} queries")
+
+    results = [run_backend(b, args.num_threads, summaries, queries, args.batch_size) for b in args.backends]
+    baseline = next((r for r in results if r["backend"] == "torch"), results[0])
+
+    header = f"{'backend':<10} {'first call':>10} {'peak RSS +':>10} {'texts/s':>8} {'query ms':>8}"
+    header += "".join(f" {'recall@' + str(k):>9}" for k in args.k) + f" {'cosine':>7}"
+    print(header)
+    for result in results:
+        recalls = []
+        for k in args.k:
+            expected = top_k(baseline["queries"], baseline["documents"], k)
+            found = top_k(result["queries"], result["documents"], k)
+            recalls.append(np.mean([len(set(e) & set(f)) / k for e, f in zip(expected, found)]))
+        # Embeddings are L2-normalized, so the row-wise dot product is the cosine similarity
+        cosine = float(np.mean(np.sum(result["documents"] * baseline["documents"], axis=1)))
+        line = (
+            f"{result['backend']:<10} {result['first_call_seconds']:>9.1f}s {result['peak_rss_increase_mb']:>8.0f}MB "
+            f"{result['texts_per_second']:>8.1f} {result['query_latency_ms']:>8.1f}"
+        )
+        line += "".join(f" {recall:>9.3f}" for recall in recalls) + f" {cosine:>7.4f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Reranker benchmark
+Compares the local cross-encoder reranker (reranker.mode: local) with the LLM reranker: for each
+case, the tutorials of the tool are retrieved as in a run and selected by both rerankers, and the
+latency of each and the overlap of their selections are reported.
+
+Each line of the cases file is a JSON object with "tool" and "query" (the tutorial search query),
+and optionally "task_description", "user_input" and "error_analysis".
+
+Usage:
+    python tools/benchmark_reranker.py --cases cases.jsonl [--config my_config.yaml] [--backend onnx]
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from omegaconf import OmegaConf
+
+from autogluon.assistant.agents.reranker_agent import RerankerAgent
+from autogluon.assistant.constants import DEFAULT_CONFIG_PATH
+from autogluon.assistant.tools_registry import TutorialInfo
+from autogluon.assistant.tools_registry.embedding_service import get_embedding_service
+from autogluon.assistant.tools_registry.lexical import extract_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASES = [
+    {
+        "tool": "autogluon.tabular",
+        "query": "binary classification on a CSV with missing values, optimize ROC AUC",
+        "task_description": "Predict whether a customer churns from tabular features. Metric: roc_auc.",
+    },
+    {
+        "tool": "autogluon.timeseries",
+        "query": "forecast daily sales 14 days ahead with TimeSeriesPredictor",
+        "task_description": "Forecast the next 14 days of sales for each store. Metric: MASE.",
+    },
+    {
+        "tool": "autogluon.multimodal",
+        "query": "image classification from a folder of images and a label CSV",
+        "task_description": "Classify product images into 10 categories. Metric: accuracy.",
+        "error_analysis": "The image paths in the CSV are relative and were not found.",
+    },
+]
+
+
+class BenchmarkManager:
+    """The manager state read by the reranker prompt and the cross-encoder query."""
+
+    def __init__(self, config, case: Dict, tutorial_retrieval: List[TutorialInfo]):
+        self.config = config
+        self.selected_tool = case["tool"]
+        self.task_description = case.get("task_description", case["query"])
+        self.user_input = case.get("user_input", "")
+        self.error_analysis = case.get("error_analysis", "")
+        self.all_previous_error_analyses = self.error_analysis
+        self.data_prompt = case.get("data_prompt", "")
+        self.tutorial_retrieval = tutorial_retrieval
+        self.enable_meta_prompting = False
+        self.time_step = 0
+
+    def save_and_log_states(self, content, save_name, per_iteration=False, add_uuid=False):
+        pass
+
+    def log_agent_start(self, message: str):
+        logger.info(message)
+
+    def log_agent_end(self, message: str):
+        logger.info(message)
+
+
+def retrieve(service, config, case: Dict) -> List[TutorialInfo]:
+    hybrid_config = config.get("hybrid_retrieval", {})
+    results = service.search(
+        case["query"],
+        case["tool"],
+        condensed=config.condense_tutorials,
+        top_k=config.num_tutorial_retrievals,
+        hybrid=hybrid_config.get("enabled", True),
+        rrf_k=hybrid_config.get("rrf_k", 60),
+    )
+    return [
+        TutorialInfo(
+            path=result["file_path"],
+            title=extract_title(result["content"]) or result["relative_path"],
+            summary=result.get("summary", ""),
+            score=result["score"],
+            content=result["content"],
+        )
+        for result in results
+    ]
+
+
+def timed_selection(agent: RerankerAgent, candidates: List[TutorialInfo], mode: str):
+    start = time.perf_counter()
+    selected = agent.select_tutorials(candidates, mode=mode)
+    return selected, time.perf_counter() - start
+
+
+def summarize(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    return f"mean {statistics.mean(values):.2f}s, median {statistics.median(values):.2f}s, max {max(values):.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the local cross-encoder reranker with the LLM reranker")
+    parser.add_argument("--cases", help="JSON lines file of benchmark cases (built-in cases if omitted)")
+    parser.add_argument("--config", help="Config merged into the default config")
+    parser.add_argument("--backend", choices=["torch", "onnx"], help="Override reranker.local.backend")
+    parser.add_argument("--output", help="Write the per-case results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    config = OmegaConf.load(DEFAULT_CONFIG_PATH)
+    if args.config:
+        config = OmegaConf.merge(config, OmegaConf.load(args.config))
+    if args.backend:
+        config.reranker.local.backend = args.backend
+
+    if args.cases:
+        with open(args.cases) as f:
+            cases = [json.loads(line) for line in f if line.strip()]
+    else:
+        cases = DEFAULT_CASES
+
+    service = get_embedding_service(socket_path=config.get("embedding_service", {}).get("socket_path", None))
+    results = []
+    for case in cases:
+        candidates = retrieve(service, config, case)
+        if not candidates:
+            print(f"No tutorials retrieved for {case['tool']}, skipping: {case['query']}")
+            continue
+        manager = BenchmarkManager(config, case, candidates)
+        agent = RerankerAgent(config=config, manager=manager, llm_config=config.reranker, prompt_template=None)
+        if not results:
+            # Load the cross-encoder before timing
+            agent.select_tutorials(candidates, mode="local")
+
+        llm_selected, llm_latency = timed_selection(agent, candidates, mode="llm")
+        local_selected, local_latency = timed_selection(agent, candidates, mode="local")
+        llm_paths = [str(t.path) for t in llm_selected]
+        local_paths = [str(t.path) for t in local_selected]
+        overlap = len(set(llm_paths) & set(local_paths)) / max(len(llm_paths), 1)
+
+        results.append(
+            {
+                "tool": case["tool"],
+                "query": case["query"],
+                "num_candidates": len(candidates),
+                "llm_latency_seconds": llm_latency,
+                "local_latency_seconds": local_latency,
+                "overlap": overlap,
+                "same_top1": bool(llm_paths and local_paths and llm_paths[0] == local_paths[0]),
+                "llm_selection": llm_paths,
+                "local_selection": local_paths,
+            }
+        )
+        print(
+            f"[{case['tool']}] {case['query'][:60]}: llm {llm_latency:.2f}s, local {local_latency:.2f}s, "
+            f"overlap {overlap:.0%}"
+        )
+
+    if not results:
+        return
+    print(f"\nCases: {len(results)}, backend: {config.reranker.local.backend}")
+    print(f"LLM reranker latency:   {summarize([r['llm_latency_seconds'] for r in results])}")
+    print(f"Local reranker latency: {summarize([r['local_latency_seconds'] for r in results])}")
+    print(f"Mean selection overlap: {statistics.mean(r['overlap'] for r in results):.0%}")
+    print(f"Same top tutorial:      {sum(r['same_top1'] for r in results)}/{len(results)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
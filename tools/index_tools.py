@@ -4,12 +4,9 @@ if __name__ == "__main__":
     # Initialize indexer
     indexer = TutorialIndexer()
 
-    loaded_successfully = indexer.load_indices()
-    if not loaded_successfully:
-        # Build indices for all tools
-        indexer.build_indices()
-        # Save to disk
-        indexer.save_indices()
+    indexer.load_indices()
+    # Embed the tutorials added or changed since the indices were saved (all of them on the first run)
+    indexer.update_indices()
 
     # Search for tutorials
     results = indexer.search(